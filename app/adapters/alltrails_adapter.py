@@ -1,4 +1,6 @@
-from typing import Dict, Any, List
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional
 from app.models import TrailSummary, TrailReview
 
 def parse_trail_data(trail_json: Dict[str, Any], park_code: str) -> TrailSummary:
@@ -37,3 +39,156 @@ def parse_trail_data(trail_json: Dict[str, Any], park_code: str) -> TrailSummary
         surface_types=trail_json.get("surface_types", []),
         recent_reviews=reviews
     )
+
+
+# --- Review pre-extraction from scraped AllTrails markdown ---
+# AllTrails renders each review as: member link, "Date·Activity", a run-together line of
+# condition tags, the review text, "Key:Value" details, photo links, "[Show activity](...)".
+# Parsing that structure directly makes most review scrapes LLM-free; when it doesn't
+# parse, the review section alone is a fraction of the page for the LLM.
+
+MAX_PAGE_REVIEWS = 10
+
+REVIEW_SECTION_RE = re.compile(r"^##\s+Reviews\s*$", re.MULTILINE)
+SECTION_HEADING_RE = re.compile(r"^##\s+\S", re.MULTILINE)
+MEMBER_LINE_RE = re.compile(r"^\[([^\]]+)\]\(https?://(?:www\.)?alltrails\.com/members/[^)]*\)\s*$", re.MULTILINE)
+DATE_LINE_RE = re.compile(
+    r"^(?P<date>[A-Z][a-z]{2,8}\.? \d{1,2}, \d{4}|Today|Yesterday|\d+ (?:hours?|days?|weeks?) ago)(?:\s*·\s*(?P<activity>.+))?$"
+)
+IMAGE_RE = re.compile(r"!\[[^\]]*\]\((https?://[^)\s]+)\)")
+DETAIL_LINE_RE = re.compile(r"^[A-Z][a-z]+(?: [a-z]+)*:\S")
+RATING_RE = re.compile(r"(?:Rated|Rating:?)\s*([1-5])(?:\.0)?(?:\s*(?:/|out of)\s*5)?|\b([1-5]) stars?\b|(★{1,5})", re.IGNORECASE)
+PAGE_RATING_RE = re.compile(r"^(\d(?:\.\d)?)\s*\n+\s*\(?([\d,]+) reviews", re.MULTILINE)
+TAG_SPLIT_RE = re.compile(r"(?<=[a-z])(?=[A-Z])")
+
+# AllTrails' fixed set of review condition tags
+CONDITION_TAGS = {
+    tag.lower() for tag in [
+        "Great views", "Good views", "Great conditions", "Good conditions", "Bathrooms available",
+        "No bathrooms", "Not crowded", "Crowded", "Easy to park", "Hard to park", "Muddy", "No bugs",
+        "Bugs", "Icy", "Snow", "Snowy", "Rocky", "Overgrown", "Washed out", "Flooded", "Blowdown",
+        "Bridge out", "Closed", "Fee", "No shade", "Great for kids", "Off trail", "Private property",
+        "Scramble", "Hot", "Slippery", "Windy", "Fall colors", "Wildflowers", "Wildlife", "Dog friendly",
+    ]
+}
+
+
+def _review_date_key(date_text: str, today: date) -> date:
+    """Sort key for AllTrails review dates (absolute or relative); unknown dates sort last."""
+    if date_text == "Today":
+        return today
+    if date_text == "Yesterday":
+        return today - timedelta(days=1)
+    m = re.match(r"(\d+) (hour|day|week)s? ago", date_text)
+    if m:
+        n, unit = int(m.group(1)), m.group(2)
+        return today - timedelta(days=0 if unit == "hour" else n * (7 if unit == "week" else 1))
+    for fmt in ("%b %d, %Y", "%B %d, %Y", "%b. %d, %Y"):
+        try:
+            return datetime.strptime(date_text, fmt).date()
+        except ValueError:
+            continue
+    return date.min
+
+
+def _parse_condition_tags(line: str) -> Optional[List[str]]:
+    """Splits a run-together tag line ("Not crowdedGreat views"); None if it isn't one."""
+    parts = [p.strip() for p in TAG_SPLIT_RE.split(line) if p.strip()]
+    if parts and all(p.lower() in CONDITION_TAGS for p in parts):
+        return parts
+    return None
+
+
+def extract_review_section(markdown: str) -> str:
+    """The "## Reviews" section of an AllTrails page (up to the next "## " heading), or ""."""
+    m = REVIEW_SECTION_RE.search(markdown)
+    if m:
+        end = SECTION_HEADING_RE.search(markdown, m.end())
+        return markdown[m.start():end.start() if end else len(markdown)]
+    first_member = MEMBER_LINE_RE.search(markdown)
+    return markdown[first_member.start():] if first_member else ""
+
+
+def parse_review_block(block: str) -> Optional[TrailReview]:
+    """
+    Parses one review block (starting at its member link line).
+    Returns None when the block doesn't have the expected shape or no star rating of its own.
+    """
+    lines = [line.strip() for line in block.splitlines() if line.strip()]
+    member = MEMBER_LINE_RE.match(lines[0]) if lines else None
+    if not member or len(lines) < 2:
+        return None
+    date_match = DATE_LINE_RE.match(lines[1])
+    if not date_match:
+        return None
+
+    tags: List[str] = []
+    text_lines: List[str] = []
+    images: List[str] = []
+    rating = None
+    for i, line in enumerate(lines[2:]):
+        line_images = IMAGE_RE.findall(line)
+        if line_images:
+            images.extend(line_images)
+            continue
+        if line.startswith("[Show activity]") or DETAIL_LINE_RE.match(line):
+            continue
+        rating_match = RATING_RE.fullmatch(line)
+        if rating_match:
+            stars = rating_match.group(3)
+            rating = len(stars) if stars else int(rating_match.group(1) or rating_match.group(2))
+            continue
+        if i == 0 or (i == 1 and rating is not None):
+            parsed_tags = _parse_condition_tags(line)
+            if parsed_tags:
+                tags = parsed_tags
+                continue
+        text_lines.append(line)
+
+    if rating is None or not (text_lines or tags or images):
+        return None
+    return TrailReview(
+        author=member.group(1).strip(),
+        rating=rating,
+        date=date_match.group("date"),
+        text="\n\n".join(text_lines),
+        condition_tags=tags,
+        visible_image_urls=images
+    )
+
+
+def parse_review_markdown(markdown: str, max_reviews: int = MAX_PAGE_REVIEWS, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Deterministic review extraction from a scraped AllTrails page.
+
+    A review without an explicit rating doesn't parse (the page's overall rating says
+    nothing about it), so its page is left to the LLM.
+
+    Returns:
+        {"reviews": most recent TrailReviews first,
+         "complete": True when every review block parsed (safe to skip the LLM),
+         "average_rating": page rating or None, "total_reviews": page review count or None,
+         "section": the review section text (what to send an LLM when not complete)}
+    """
+    today = today or date.today()
+    average_rating, total_reviews = None, None
+    page_rating = PAGE_RATING_RE.search(markdown)
+    if page_rating:
+        average_rating = float(page_rating.group(1))
+        total_reviews = int(page_rating.group(2).replace(",", ""))
+
+    section = extract_review_section(markdown)
+    starts = [m.start() for m in MEMBER_LINE_RE.finditer(section)]
+    blocks = [section[s:e] for s, e in zip(starts, starts[1:] + [len(section)])]
+
+    reviews = [parse_review_block(block) for block in blocks]
+    parsed = [r for r in reviews if r is not None]
+    parsed.sort(key=lambda r: _review_date_key(r.date, today), reverse=True)
+
+    return {
+        "reviews": parsed[:max_reviews],
+        "complete": bool(blocks) and len(parsed) == len(blocks),
+        "average_rating": average_rating,
+        "total_reviews": total_reviews,
+        "section": section,
+    }
@@ -4,6 +4,8 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from typing import Optional, Dict, Any
 
+from app.utils.rate_limiter import throttle
+
 # Configure a module-level logger
 logger = logging.getLogger(__name__)
 
@@ -11,6 +13,9 @@ class BaseClient:
     """
     A robust HTTP base client with built-in retry logic and timeout handling.
     """
+    # Name used for per-API throttling and call counts (see app.utils.rate_limiter.throttle)
+    API_NAME = "http"
+    
     def __init__(self, base_url: str, timeout: int = 10, retries: int = 3):
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
@@ -35,6 +40,7 @@ class BaseClient:
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         
         try:
+            throttle(self.API_NAME)
             response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
             response.raise_for_status()
             return response.json()
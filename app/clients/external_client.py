@@ -1,18 +1,57 @@
 import os
 import logging
 import json
-from typing import List, Dict, Any, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Union, Optional, Tuple
 
 from app.clients.base_client import BaseClient
+from app.utils.rate_limiter import AdaptiveRateLimiter, is_rate_limit_error, throttle
 from app.models import Amenity
 from app.adapters.external_adapter import parse_serper_amenities
 
 logger = logging.getLogger(__name__)
 
+# Bulk search: bounded in-flight Serper requests, paced by an adaptive rate limiter
+SERPER_MAX_IN_FLIGHT = int(os.getenv("SERPER_MAX_IN_FLIGHT", "6"))
+SERPER_START_RPS = float(os.getenv("SERPER_START_RPS", "5"))
+SERPER_MAX_RPS = float(os.getenv("SERPER_MAX_RPS", "20"))
+MAX_RATE_LIMIT_RETRIES = 4
+
+# A maps search: (query, lat, lon, zoom)
+MapsSearch = Tuple[str, float, float, str]
+
+
+def place_key(amenity: Union[Amenity, Dict[str, Any]]) -> str:
+    """
+    Identity of a place across searches: Google place id, else name + rounded coordinates.
+    Accepts an Amenity or its dict form (as stored in the amenity fixtures).
+    """
+    data = amenity if isinstance(amenity, dict) else amenity.__dict__
+    if data.get("google_maps_url"):
+        return data["google_maps_url"]
+    lat = round(float(data["latitude"]), 4) if data.get("latitude") is not None else None
+    lon = round(float(data["longitude"]), 4) if data.get("longitude") is not None else None
+    return f"{(data.get('name') or '').strip().lower()}|{lat}|{lon}"
+
+
+def dedupe_amenities(amenities: List[Amenity]) -> List[Amenity]:
+    """Drops repeated places, keeping the first occurrence (Serper's ranking order)."""
+    seen = set()
+    unique = []
+    for amenity in amenities:
+        key = place_key(amenity)
+        if key not in seen:
+            seen.add(key)
+            unique.append(amenity)
+    return unique
+
+
 class ExternalClient(BaseClient):
     """
     Client for External APIs (Serper, etc.).
     """
+    API_NAME = "serper"
+    
     def __init__(self, serper_key: str = None):
         self.serper_key = serper_key or os.getenv("SERPER_API_KEY")
         if not self.serper_key:
@@ -20,6 +59,31 @@ class ExternalClient(BaseClient):
         
         super().__init__(base_url="https://google.serper.dev")
 
+    @staticmethod
+    def _ll_param(lat: float, lon: float, zoom: str) -> str:
+        # Construct 'll' parameter with 4 decimal precision
+        # Format: @37.4535,-113.2254,11z
+        return f"@{round(lat, 4)},{round(lon, 4)},{zoom}"
+
+    def _post_maps(self, query: str, lat: float, lon: float, zoom: str) -> List[Amenity]:
+        """Single Serper Maps request; raises on HTTP errors."""
+        headers = {
+            "X-API-KEY": self.serper_key,
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "q": query,
+            "ll": self._ll_param(lat, lon, zoom),
+            "num": 20
+        }
+
+        throttle(self.API_NAME)
+        response = self.session.post(f"{self.base_url}/maps", headers=headers, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+        # Use existing adapter (maps endpoint returns 'places' array similar to places endpoint)
+        return dedupe_amenities(parse_serper_amenities(response.json()))
+
     def search_maps(self, query: str, lat: float, lon: float, zoom: str = "11z") -> List[Amenity]:
         """
         Queries the Serper Maps endpoint using the 'll' parameter (@lat,lon,zoom).
@@ -27,44 +91,69 @@ class ExternalClient(BaseClient):
         if not self.serper_key:
             return []
 
-        headers = {
-            "X-API-KEY": self.serper_key,
-            "Content-Type": "application/json"
-        }
-        url = f"{self.base_url}/maps"
-
         try:
-            # Construct 'll' parameter with 4 decimal precision
-            # Format: @37.4535,-113.2254,11z
-            ll_param = f"@{round(lat, 4)},{round(lon, 4)},{zoom}"
-            
-            payload = {
-                "q": query,
-                "ll": ll_param,
-                "num": 20
-            }
-            
-            # logger.info(f"Serper Maps Request: {payload}")
-
-            response = self.session.post(url, headers=headers, json=payload, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Use existing adapter (maps endpoint returns 'places' array similar to places endpoint)
-            return parse_serper_amenities(data)
-            
+            return self._post_maps(query, lat, lon, zoom)
         except Exception as e:
             logger.error(f"Failed to fetch maps amenities for '{query}': {e}")
             return []
 
+    def _search_with_backoff(self, search: MapsSearch, limiter: AdaptiveRateLimiter) -> List[Amenity]:
+        query, lat, lon, zoom = search
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            limiter.acquire()
+            try:
+                amenities = self._post_maps(query, lat, lon, zoom)
+                limiter.on_success()
+                return amenities
+            except Exception as e:
+                if is_rate_limit_error(e) and attempt < MAX_RATE_LIMIT_RETRIES:
+                    limiter.on_rate_limited()
+                    continue
+                logger.error(f"Failed to fetch maps amenities for '{query}' at {self._ll_param(lat, lon, zoom)}: {e}")
+                return []
+        return []
+
+    def search_maps_bulk(
+        self,
+        searches: List[MapsSearch],
+        max_workers: int = SERPER_MAX_IN_FLIGHT,
+        limiter: Optional[AdaptiveRateLimiter] = None
+    ) -> List[List[Amenity]]:
+        """
+        Runs many maps searches concurrently under one Serper rate limit.
+
+        Searches that resolve to the same request (same query, rounded 'll' and zoom,
+        e.g. two hubs at one trailhead) are sent once and share the result.
+
+        Returns:
+            One amenity list per search, in input order (empty list on failure)
+        """
+        if not self.serper_key or not searches:
+            return [[] for _ in searches]
+
+        request_keys = [(query, self._ll_param(lat, lon, zoom)) for query, lat, lon, zoom in searches]
+        unique: Dict[Tuple[str, str], MapsSearch] = {}
+        for key, search in zip(request_keys, searches):
+            unique.setdefault(key, search)
+
+        limiter = limiter or AdaptiveRateLimiter(
+            rate_per_sec=SERPER_START_RPS, max_rate=SERPER_MAX_RPS, name="Serper"
+        )
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique)))) as executor:
+            futures = {key: executor.submit(self._search_with_backoff, search, limiter) for key, search in unique.items()}
+            responses = {key: future.result() for key, future in futures.items()}
+
+        logger.info(f"🔎 Serper bulk search: {len(searches)} searches, {len(unique)} requests")
+        return [list(responses[key]) for key in request_keys]
+
     def get_amenities(self, query: Union[str, List[str]], location_lat: float, location_lon: float) -> List[Amenity]:
         """
         Legacy/Default wrapper. Iterates if query is a list.
         Defaults to 11z for general amenity searches.
         """
         queries = [query] if isinstance(query, str) else query
-        combined = []
-        for q in queries:
-            combined.extend(self.search_maps(q, location_lat, location_lon, "11z"))
-        return combined
+        if len(queries) == 1:
+            return self.search_maps(queries[0], location_lat, location_lon, "11z")
+        results = self.search_maps_bulk([(q, location_lat, location_lon, "11z") for q in queries])
+        # Overlapping queries (e.g. "restaurant" and "food") return the same places
+        return dedupe_amenities([a for amenities in results for a in amenities])
@@ -21,6 +21,7 @@ class NPSClient(BaseClient):
     Client for the National Park Service (NPS) API.
     Fetch park details, alerts, events, and extended amenities.
     """
+    API_NAME = "nps"
     
     def __init__(self, api_key: Optional[str] = None):
         # Use env var if not passed explicitly
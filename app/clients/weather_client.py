@@ -12,6 +12,7 @@ class WeatherClient(BaseClient):
     """
     Client for WeatherAPI.com.
     """
+    API_NAME = "weather"
     
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("WEATHER_API_KEY")
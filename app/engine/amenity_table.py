@@ -0,0 +1,183 @@
+from typing import List, Dict, Any, Optional, Set, Tuple, NamedTuple
+
+import numpy as np
+
+from app.models import Amenity
+from app.clients.external_client import place_key
+from app.utils.geospatial import haversine_miles
+
+# Category holding each hub's own location (first item of a hub's list on the map/list views)
+ENTRANCE_CATEGORY = "Park Entrance"
+
+# Closest places per (hub, category) passed to the chat context
+CHAT_ITEMS_PER_HUB_CATEGORY = 5
+
+
+class AmenityRow(NamedTuple):
+    hub: str
+    category: str
+    distance_miles: Optional[float]  # from the hub
+    amenity: Amenity
+
+
+def _entrance_item(hub_name: str, lat: float, lon: float) -> Dict[str, Any]:
+    return {
+        "name": hub_name,
+        "type": "entrance",
+        "address": "N/A",
+        "latitude": lat,
+        "longitude": lon,
+        "rating": None,
+        "rating_count": None,
+        "google_maps_url": f"https://www.google.com/maps/search/?api=1&query={lat},{lon}"
+    }
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class AmenityTable:
+    """
+    Immutable, flat view of a park's hub amenities.
+
+    Built once per park from amenities_consolidated.json (and amenity_index.json when
+    present): one row per unique place and category at its nearest hub, plus a row per
+    hub entrance, each with a ready Amenity. Category and radius lookups run over
+    precomputed NumPy columns; the per-hub view used by the Essentials page is kept
+    as frozen tuples and handed out in fresh containers, so callers can't alter it.
+    """
+    def __init__(
+        self,
+        park_code: str,
+        hubs: Dict[str, Tuple[Optional[float], Optional[float]]],
+        hub_items: Dict[str, Dict[str, List[Dict[str, Any]]]],
+        index_rows: Optional[List[Dict[str, Any]]] = None
+    ):
+        self.park_code = park_code.upper()
+        self.hubs = dict(hubs)
+
+        # 1. Per-hub view (consolidated top N per category + the hub's entrance last)
+        view = {}
+        for hub_name, categories in hub_items.items():
+            cats = {category: tuple(items) for category, items in categories.items()}
+            lat, lon = self.hubs.get(hub_name, (None, None))
+            if lat is not None and lon is not None:
+                cats[ENTRANCE_CATEGORY] = (_entrance_item(hub_name, lat, lon),) + cats.get(ENTRANCE_CATEGORY, ())
+            view[hub_name] = cats
+        self._hub_view = view
+
+        # 2. Flat rows: the consolidation index, or (older fixtures) the per-hub lists deduped
+        if index_rows is None:
+            located = {name for name, (lat, lon) in self.hubs.items() if lat is not None and lon is not None}
+            index_rows = self._rows_from_hub_items(hub_items, located)
+        rows = []
+        for hub_name, (lat, lon) in self.hubs.items():
+            if lat is not None and lon is not None:
+                rows.append(AmenityRow(hub_name, ENTRANCE_CATEGORY, 0.0, Amenity(**_entrance_item(hub_name, lat, lon))))
+        for row in index_rows:
+            try:
+                amenity = Amenity(**row)
+            except Exception:
+                continue
+            rows.append(AmenityRow(row.get("hub"), row.get("category"), row.get("distance_miles"), amenity))
+        self.rows: Tuple[AmenityRow, ...] = tuple(rows)
+
+        # 3. Columns for lookups
+        self.category = np.array([r.category or "" for r in self.rows], dtype=object)
+        self.distance = np.fromiter(
+            (r.distance_miles if r.distance_miles is not None else np.nan for r in self.rows),
+            dtype=np.float64, count=len(self.rows)
+        )
+        self.lat = np.fromiter((_to_float(r.amenity.latitude) for r in self.rows), dtype=np.float64, count=len(self.rows))
+        self.lon = np.fromiter((_to_float(r.amenity.longitude) for r in self.rows), dtype=np.float64, count=len(self.rows))
+        self._category_masks: Dict[str, np.ndarray] = {}
+        for category in set(self.category.tolist()):
+            key = category.lower()
+            self._category_masks[key] = self._category_masks.get(key, np.zeros(len(self.rows), dtype=bool)) | (self.category == category)
+
+        # 4. Chat context: closest places per (hub, category), every place once
+        per_group: Dict[Tuple[str, str], int] = {}
+        chat = []
+        for i in np.argsort(np.nan_to_num(self.distance, nan=np.inf), kind="stable").tolist():
+            key = (self.rows[i].hub, self.rows[i].category)
+            if per_group.get(key, 0) < CHAT_ITEMS_PER_HUB_CATEGORY:
+                per_group[key] = per_group.get(key, 0) + 1
+                chat.append(self.rows[i].amenity)
+        self.chat_amenities: Tuple[Amenity, ...] = tuple(chat)
+
+    @staticmethod
+    def _rows_from_hub_items(hub_items: Dict[str, Dict[str, List[Dict[str, Any]]]],
+                             located: Set[str]) -> List[Dict[str, Any]]:
+        best: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for hub_name, categories in hub_items.items():
+            for category, items in categories.items():
+                for item in items:
+                    key = (category, place_key(item))
+                    # Consolidated files store 0.0 for hubs without coordinates: treat as unknown
+                    distance = item.get("distance_miles") if hub_name in located else None
+                    current = best.get(key)
+                    if current is None or (distance is not None and
+                                           (current["distance_miles"] is None or distance < current["distance_miles"])):
+                        best[key] = {**item, "category": category, "hub": hub_name, "distance_miles": distance}
+        return sorted(best.values(), key=lambda r: r["distance_miles"] if r["distance_miles"] is not None else float("inf"))
+
+    @classmethod
+    def from_consolidated(
+        cls,
+        park_code: str,
+        consolidated: Dict[str, Any],
+        index: Optional[Dict[str, Any]] = None
+    ) -> "AmenityTable":
+        """
+        Args:
+            consolidated: amenities_consolidated.json contents ({"hubs": {name: {"location", "amenities"}}})
+            index: amenity_index.json contents, if the park has one
+        """
+        hubs, hub_items = {}, {}
+        for hub_name, hub_data in (consolidated.get("hubs") or {}).items():
+            loc = hub_data.get("location") or {}
+            hubs[hub_name] = (loc.get("lat"), loc.get("lon"))
+            hub_items[hub_name] = hub_data.get("amenities") or {}
+        return cls(park_code, hubs, hub_items, index.get("rows") if index else None)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def categories(self) -> List[str]:
+        return list(dict.fromkeys(r.category for r in self.rows))
+
+    def _category_mask(self, category: Optional[str]) -> np.ndarray:
+        if not category:
+            return np.ones(len(self.rows), dtype=bool)
+        mask = self._category_masks.get(category.lower())
+        return mask.copy() if mask is not None else np.zeros(len(self.rows), dtype=bool)
+
+    def lookup(self, category: Optional[str] = None, max_distance_miles: Optional[float] = None) -> List[AmenityRow]:
+        """Rows in a category (case-insensitive) and/or within a distance of their hub, nearest first."""
+        mask = self._category_mask(category)
+        if max_distance_miles is not None:
+            mask &= self.distance <= max_distance_miles
+        idx = np.flatnonzero(mask)
+        idx = idx[np.argsort(self.distance[idx], kind="stable")]
+        return [self.rows[i] for i in idx.tolist()]
+
+    def within(self, lat: float, lon: float, radius_miles: float, category: Optional[str] = None) -> List[Tuple[AmenityRow, float]]:
+        """(row, distance_miles) for places within radius of a point, nearest first."""
+        if not self.rows:
+            return []
+        with np.errstate(invalid="ignore"):
+            dist = haversine_miles(lat, lon, self.lat, self.lon)
+            mask = (dist <= radius_miles) & self._category_mask(category)
+        idx = np.flatnonzero(mask)
+        idx = idx[np.argsort(dist[idx], kind="stable")]
+        return [(self.rows[i], float(dist[i])) for i in idx.tolist()]
+
+    def hub_view(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        {hub: {category: [place dicts]}} in fresh containers (the place dicts are shared; read-only).
+        """
+        return {hub: {category: list(items) for category, items in cats.items()} for hub, cats in self._hub_view.items()}
@@ -1,7 +1,13 @@
+import heapq
 import logging
 from typing import List, Optional, Dict, Any
+
+import numpy as np
 from pydantic import BaseModel
-from app.models import TrailSummary, WeatherSummary, Alert
+
+from app.models import TrailSummary, WeatherSummary, Alert, ZonalForecast
+from app.engine.trail_index import TrailIndex
+from app.utils.alert_matcher import get_alert_index
 
 logger = logging.getLogger(__name__)
 
@@ -17,66 +23,163 @@ class SafetyStatus(BaseModel):
     status: str
     reason: List[str] = []
 
+class SearchWeights(BaseModel):
+    """
+    Relative weight of each ranking criterion in search_trails.
+    Positive weights reward, weather/alerts are applied as penalties.
+    A negative elevation weight prefers flatter trails.
+    """
+    rating: float = 0.4
+    popularity: float = 0.3
+    length: float = 0.2
+    elevation: float = 0.0
+    weather: float = 0.3
+    alerts: float = 0.5
+
+class TrailMatch(BaseModel):
+    trail: TrailSummary
+    score: float
+
+# Zone conditions that make a trail less attractive (severity 0-1)
+SEVERE_WEATHER_TERMS = ["snow", "blizzard", "storm", "thunder"]
+MILD_WEATHER_TERMS = ["rain", "shower", "sleet", "drizzle", "fog"]
+
 class ConstraintEngine:
     def __init__(self):
-        pass
+        # Columnar trail indexes, one per park, built when the park's trails load
+        self._trail_indexes: Dict[str, TrailIndex] = {}
+
+    def index_trails(self, park_code: str, trails: List[TrailSummary]) -> TrailIndex:
+        """
+        Builds (and caches) the columnar index for a park's freshly loaded trails.
+        Subsequent filter_trails calls on the same list reuse it instead of rescanning.
+        """
+        index = TrailIndex(trails)
+        self._trail_indexes[park_code.lower()] = index
+        return index
+
+    def _get_index(self, trails: List[TrailSummary]) -> TrailIndex:
+        # Reuse a cached index only if it was built from this exact list object
+        for index in self._trail_indexes.values():
+            if index.source is trails and len(index) == len(trails):
+                return index
+        return TrailIndex(trails)
 
     def filter_trails(self, trails: List[TrailSummary], prefs: UserPreference) -> List[TrailSummary]:
-        filtered = []
-        
-        # Difficulty Mapping: easy=1, moderate=2, hard=3
-        difficulty_rank = {"easy": 1, "moderate": 2, "hard": 3}
-        user_diff_rank = difficulty_rank.get(prefs.max_difficulty.lower(), 3)
-
-        for trail in trails:
-            # 1. Difficulty Check
-            trail_diff_rank = difficulty_rank.get(trail.difficulty.lower(), 3)
-            if trail_diff_rank > user_diff_rank:
-                continue
-
-            # 2. Length Check
-            if trail.length_miles > prefs.max_length_miles:
-                continue
-
-            # 3. Rating Check
-            if trail.average_rating < prefs.min_rating:
-                continue
-
-            # 4. Feature Checks
-            features_lower = [f.lower() for f in trail.features]
-            
-            if prefs.dog_friendly:
-                # A. Explicit Reject
-                if any("no dog" in f for f in features_lower):
-                    continue
-                
-                # B. Explicit Accept (must contain 'dog' and NOT be the 'no dog' tag)
-                # Since we already filtered 'no dog' tags in step A? 
-                # No, step A skips the TRAIL if it has 'no dog'. 
-                # But a trail might have NO dog tags at all. We should skip those too? 
-                # Yes, strict mode: only show trails KNOWN to be dog friendly.
-                
-                is_friendly = False
-                for f in features_lower:
-                    if "dog" in f and "no dog" not in f:
-                        is_friendly = True
-                        break
-                
-                if not is_friendly:
-                    continue
-            
-            if prefs.kid_friendly:
-                if not any("kid" in f for f in features_lower):
-                    continue
-                    
-            if prefs.wheelchair_accessible:
-                if not any("wheelchair" in f or "ada" in f for f in features_lower):
-                    continue
-
-            filtered.append(trail)
-        
-        return filtered
+        """
+        Returns the trails satisfying prefs (difficulty, length, rating, feature tags),
+        in their original order.
+        """
+        if not trails:
+            return []
+        return self._get_index(trails).filter(prefs)
+
+
+    def search_trails(
+        self,
+        trails: List[TrailSummary],
+        prefs: Optional[UserPreference] = None,
+        weights: Optional[SearchWeights] = None,
+        target_length_miles: Optional[float] = None,
+        zone_weather: Optional[Dict[str, Any]] = None,
+        base_zone_name: Optional[str] = None,
+        alerts: Optional[List[Alert]] = None,
+        top_k: int = 10
+    ) -> List[TrailMatch]:
+        """
+        Ranks trails by weighted criteria and returns the top_k best matches (best first).
+
+        Args:
+            trails: Candidate trails (usually a park's full list).
+            prefs: Hard constraints applied before ranking. None skips filtering.
+            weights: Criterion weights (defaults to SearchWeights()).
+            target_length_miles: Preferred length; trails closer to it score higher.
+            zone_weather: Dict of zone_name -> ZonalForecast (or raw dict) for weather penalties.
+            base_zone_name: Zone used for trails without their own weather_zone.
+            alerts: Active alerts; trails named in an alert are penalized.
+            top_k: Number of results to return.
+
+        Returns:
+            List of TrailMatch, ordered by score (ties keep the original trail order).
+        """
+        if not trails or top_k <= 0:
+            return []
+
+        weights = weights or SearchWeights()
+        index = self._get_index(trails)
+        scores = self.score_trails(index, weights, target_length_miles, zone_weather, base_zone_name, alerts)
+
+        candidates = np.flatnonzero(index.mask(prefs)) if prefs else np.arange(len(index))
+        best = heapq.nlargest(top_k, candidates.tolist(), key=lambda i: (scores[i], -i))
+        return [TrailMatch(trail=index.trails[i], score=round(float(scores[i]), 4)) for i in best]
+
+    def score_trails(
+        self,
+        index: TrailIndex,
+        weights: SearchWeights,
+        target_length_miles: Optional[float] = None,
+        zone_weather: Optional[Dict[str, Any]] = None,
+        base_zone_name: Optional[str] = None,
+        alerts: Optional[List[Alert]] = None
+    ) -> np.ndarray:
+        """Computes the weighted score of every trail in the index (vectorized)."""
+        n = len(index)
+        scores = np.zeros(n, dtype=np.float64)
+        if n == 0:
+            return scores
+
+        # 1. Rating (0-5 stars -> 0-1)
+        scores += weights.rating * np.clip(index.rating / 5.0, 0.0, 1.0)
+
+        # 2. Popularity (rank 1 -> 1.0, worst rank -> ~0, unranked -> 0)
+        ranked = ~np.isnan(index.popularity_rank)
+        if ranked.any():
+            worst = index.popularity_rank[ranked].max()
+            pop = np.zeros(n)
+            pop[ranked] = 1.0 - (index.popularity_rank[ranked] - 1.0) / worst
+            scores += weights.popularity * pop
+
+        # 3. Length closeness (1.0 at the target, decaying with relative distance)
+        if target_length_miles and target_length_miles > 0:
+            closeness = 1.0 / (1.0 + np.abs(index.length - target_length_miles) / target_length_miles)
+            scores += weights.length * closeness
+
+        # 4. Elevation gain (normalized to the steepest trail in the set)
+        max_gain = index.elevation.max()
+        if max_gain > 0:
+            scores += weights.elevation * (index.elevation / max_gain)
+
+        # 5. Weather zone conditions
+        if zone_weather:
+            severity_by_zone = {name: self._weather_severity(z) for name, z in zone_weather.items()}
+            severity = np.array(
+                [severity_by_zone.get(zone or base_zone_name, 0.0) for zone in index.weather_zone],
+                dtype=np.float64
+            )
+            scores -= weights.weather * severity
+
+        # 6. Active alerts naming the trail
+        if alerts:
+            alert_index = get_alert_index(alerts)
+            hits = np.array([alert_index.match(t.name) is not None for t in index.trails], dtype=np.float64)
+            scores -= weights.alerts * hits
+
+        return scores
 
+    @staticmethod
+    def _weather_severity(zone: Any) -> float:
+        if isinstance(zone, ZonalForecast):
+            cond = zone.current_condition
+        elif isinstance(zone, dict):
+            cond = zone.get("current_condition", "")
+        else:
+            cond = ""
+        cond = (cond or "").lower()
+        if any(term in cond for term in SEVERE_WEATHER_TERMS):
+            return 1.0
+        if any(term in cond for term in MILD_WEATHER_TERMS):
+            return 0.5
+        return 0.0
 
     def analyze_safety(self, weather: Optional[WeatherSummary], alerts: List[Alert]) -> SafetyStatus:
         reasons = []
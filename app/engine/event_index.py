@@ -0,0 +1,142 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from app.models import Event
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[date, datetime, str, None]
+
+
+def parse_event_date(value: DateLike) -> Optional[date]:
+    """'YYYY-MM-DD' (or an ISO datetime / date object) -> date, None if unparseable."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        return None
+
+
+def dedupe_events(events: Iterable[Any]) -> List[Event]:
+    """
+    Merges recurring NPS event instances (same title) into one Event each, in first-seen
+    order: dates are unioned and sorted, and the first instance with images supplies them.
+    Inputs are not modified.
+    """
+    merged: Dict[str, Event] = {}
+    for e in events or []:
+        if isinstance(e, dict):
+            try:
+                e = Event(**e)
+            except Exception as err:
+                logger.warning(f"Skipping invalid event: {err}")
+                continue
+        current = merged.get(e.title)
+        if current is None:
+            merged[e.title] = e.model_copy(update={"dates": sorted(set(e.dates))})
+            continue
+        update = {"dates": sorted(set(current.dates) | set(e.dates))}
+        if not current.images and e.images:
+            update["images"] = e.images
+        merged[e.title] = current.model_copy(update=update)
+    return list(merged.values())
+
+
+class EventIndex:
+    """
+    Calendar index over a park's events, built once per daily events cache.
+
+    Recurring instances are merged into one event per title (the event id). Each event
+    contributes one interval per specific date, or its date_start..date_end range when
+    it lists no dates; intervals are kept sorted by start, so "what's on between my visit
+    dates" is a binary search plus a vectorized overlap test.
+
+    Attributes:
+        events: Deduplicated events, first-seen order
+        dates_by_event: {title: sorted specific dates}
+        events_by_date: {date: [events occurring on that specific date]}
+    """
+    def __init__(self, events: Iterable[Any]):
+        self.events: List[Event] = dedupe_events(events)
+        self.dates_by_event: Dict[str, List[date]] = {}
+        self.events_by_date: Dict[date, List[Event]] = {}
+
+        starts, ends, owners = [], [], []
+        for i, event in enumerate(self.events):
+            days = sorted({d for d in map(parse_event_date, event.dates) if d})
+            self.dates_by_event[event.title] = days
+            for day in days:
+                self.events_by_date.setdefault(day, []).append(event)
+                starts.append(day.toordinal())
+                ends.append(day.toordinal())
+                owners.append(i)
+            if not days:
+                start = parse_event_date(event.date_start)
+                if start is None:
+                    continue
+                end = parse_event_date(event.date_end) or start
+                starts.append(start.toordinal())
+                ends.append(max(start, end).toordinal())
+                owners.append(i)
+
+        order = np.argsort(np.asarray(starts, dtype=np.int64), kind="stable")
+        self._start = np.asarray(starts, dtype=np.int64)[order]
+        self._end = np.asarray(ends, dtype=np.int64)[order]
+        self._owner = np.asarray(owners, dtype=np.int64)[order]
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def between(self, start: DateLike, end: DateLike = None) -> List[Event]:
+        """
+        Events occurring on any day in [start, end] (end defaults to start), ordered by
+        their first occurrence in that window. An unparseable start returns [].
+        """
+        start_date = parse_event_date(start)
+        if start_date is None:
+            return []
+        end_date = parse_event_date(end) or start_date
+        lo, hi = start_date.toordinal(), max(start_date, end_date).toordinal()
+
+        # Intervals starting after the window can't overlap it
+        n = int(np.searchsorted(self._start, hi, side="right"))
+        idx = np.flatnonzero(self._end[:n] >= lo)
+        if not idx.size:
+            return []
+
+        first_day = np.maximum(self._start[idx], lo)
+        owners = self._owner[idx]
+        seen = set()
+        result = []
+        for i in np.lexsort((owners, first_day)).tolist():
+            owner = int(owners[i])
+            if owner not in seen:
+                seen.add(owner)
+                result.append(self.events[owner])
+        return result
+
+    def on(self, day: DateLike) -> List[Event]:
+        """Events occurring on a single day."""
+        return self.between(day, day)
+
+    def for_visit(self, target_date: DateLike, duration_days: int = 1) -> List[Event]:
+        """Events overlapping a trip of duration_days starting on target_date."""
+        start = parse_event_date(target_date)
+        if start is None:
+            return []
+        return self.between(start, start + timedelta(days=max(duration_days, 1) - 1))
+
+    def upcoming(self, from_date: DateLike = None) -> List[Event]:
+        """Events with an occurrence on or after from_date (default today)."""
+        start = parse_event_date(from_date) or date.today()
+        if not self._end.size:
+            return []
+        return self.between(start, date.fromordinal(int(max(self._end.max(), start.toordinal()))))
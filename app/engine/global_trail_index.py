@@ -0,0 +1,166 @@
+import logging
+import os
+import threading
+from typing import List, Optional, Dict, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.models import TrailSummary
+from app.engine.trail_index import TrailIndex
+from app.services.data_manager import DataManager
+from app.utils.geospatial import haversine_miles
+
+logger = logging.getLogger(__name__)
+
+TRAILS_FILENAME = "trails_v2.json"
+
+
+class GlobalTrailHit(BaseModel):
+    park_code: str
+    trail: TrailSummary
+    distance_miles: Optional[float] = None
+
+
+class _ParkTrails:
+    """One park's slice of the global index, tagged with the file signature it was built from."""
+    def __init__(self, park_code: str, signature: Tuple[int, int], trails: List[TrailSummary]):
+        self.park_code = park_code
+        self.signature = signature
+        self.index = TrailIndex(trails)
+        # Lowercased name + description for keyword matching
+        self.text = [f"{t.name} {t.description or ''}".lower() for t in trails]
+
+
+class GlobalTrailIndex:
+    """
+    Cross-park trail index over every park directory in the fixture store.
+
+    Each park's trails_v2.json is indexed separately and only rebuilt when the file
+    changes (mtime/size), so refresh() is a handful of stat calls in the steady state.
+    """
+    def __init__(self, data_manager: Optional[DataManager] = None):
+        self.data_manager = data_manager or DataManager()
+        self._parks: Dict[str, _ParkTrails] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def park_codes(self) -> List[str]:
+        return sorted(self._parks)
+
+    def __len__(self) -> int:
+        return sum(len(p.index) for p in self._parks.values())
+
+    def refresh(self) -> List[str]:
+        """
+        Re-indexes parks whose trails file was added or changed and drops removed parks.
+
+        Returns:
+            Park codes that were (re)built.
+        """
+        base_dir = self.data_manager.base_dir
+        if not os.path.isdir(base_dir):
+            return []
+
+        rebuilt = []
+        with self._lock:
+            seen = set()
+            for entry in sorted(os.listdir(base_dir)):
+                path = os.path.join(base_dir, entry, TRAILS_FILENAME)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                park_code = entry.lower()
+                seen.add(park_code)
+                signature = (stat.st_mtime_ns, stat.st_size)
+                current = self._parks.get(park_code)
+                if current and current.signature == signature:
+                    continue
+
+                trails = self._load_trails(park_code)
+                self._parks[park_code] = _ParkTrails(park_code, signature, trails)
+                rebuilt.append(park_code)
+
+            for park_code in set(self._parks) - seen:
+                del self._parks[park_code]
+
+        if rebuilt:
+            logger.info(f"🗺️ Global trail index rebuilt for {rebuilt} ({len(self)} trails across {len(self._parks)} parks)")
+        return rebuilt
+
+    def _load_trails(self, park_code: str) -> List[TrailSummary]:
+        raw_list = self.data_manager.load_fixture(park_code, TRAILS_FILENAME) or []
+        trails = []
+        for item in raw_list:
+            try:
+                t = TrailSummary(**item)
+            except Exception:
+                continue
+            if not t.parkCode:
+                t.parkCode = park_code
+            # Same self-heal as the orchestrator: derive a rating from cached reviews
+            if t.average_rating == 0 and t.recent_reviews:
+                t.average_rating = round(sum(r.rating for r in t.recent_reviews) / len(t.recent_reviews), 1)
+                t.total_reviews = len(t.recent_reviews)
+            trails.append(t)
+        return trails
+
+    def search(
+        self,
+        prefs=None,
+        keywords: Optional[List[str]] = None,
+        center: Optional[Tuple[float, float]] = None,
+        radius_miles: Optional[float] = None,
+        park_codes: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[GlobalTrailHit]:
+        """
+        Finds trails across all indexed parks.
+
+        Args:
+            prefs: UserPreference hard constraints (None = no constraint filtering).
+            keywords: Any-of terms matched against trail name/description.
+            center: (lat, lon) for distance calculation and radius filtering.
+            radius_miles: Only keep trails within this distance of center.
+            park_codes: Restrict to these parks.
+            limit: Max number of hits.
+
+        Returns:
+            Hits sorted by distance when a center is given, otherwise by park then file order.
+        """
+        terms = [k.lower() for k in (keywords or []) if k]
+        wanted = {p.lower() for p in park_codes} if park_codes else None
+
+        hits: List[GlobalTrailHit] = []
+        for park_code in self.park_codes:
+            if wanted and park_code not in wanted:
+                continue
+            park = self._parks[park_code]
+            index = park.index
+            if len(index) == 0:
+                continue
+
+            mask = index.mask(prefs) if prefs else np.ones(len(index), dtype=bool)
+            if terms:
+                mask &= np.array([any(term in text for term in terms) for text in park.text], dtype=bool)
+
+            distances = None
+            if center:
+                distances = haversine_miles(center[0], center[1], index.lat, index.lon)
+                if radius_miles is not None:
+                    # NaN (no coordinates) compares False, so unlocated trails drop out
+                    mask &= distances <= radius_miles
+
+            for i in np.flatnonzero(mask):
+                dist = None
+                if distances is not None and not np.isnan(distances[i]):
+                    dist = round(float(distances[i]), 2)
+                hits.append(GlobalTrailHit(park_code=park_code, trail=index.trails[i], distance_miles=dist))
+
+        if center:
+            hits.sort(key=lambda h: h.distance_miles if h.distance_miles is not None else float("inf"))
+        if limit is not None:
+            hits = hits[:limit]
+        return hits
@@ -0,0 +1,260 @@
+import math
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.utils.keyword_classifier import classify_essentials
+
+# Coordinates are rounded to 5 decimals (~1 m), which trims the payload sent to the browser
+COORD_PRECISION = 5
+
+# Layer files written per park (DataManager.save_geojson_layer)
+HUB_SERVICES_LAYER = "hub_services"
+IN_PARK_LAYER = "in_park_services"
+TRAILS_LAYER = "trails"
+
+# In-park categories (app.utils.keyword_classifier.ESSENTIALS_CATEGORIES) as drawn on the
+# map, each with a small (lat, lon) offset (~0.0004 deg) so a place in several categories
+# doesn't stack its markers
+IN_PARK_CATEGORIES = {
+    "Restroom": {"color": "darkblue", "icon": "restroom", "offset": (0.0000, 0.0000)},
+    "Water": {"color": "blue", "icon": "tint", "offset": (0.0004, 0.0000)},
+    "Food": {"color": "orange", "icon": "utensils", "offset": (-0.0004, 0.0000)},
+    "Picnic": {"color": "green", "icon": "tree", "offset": (0.0000, 0.0004)},
+    "Medical": {"color": "red", "icon": "medkit", "offset": (0.0000, -0.0004)},
+    "Shuttle": {"color": "purple", "icon": "bus", "offset": (0.0004, 0.0004)},
+}
+CAMPING_CATEGORY = {"color": "green", "icon": "campground", "offset": (-0.0004, -0.0004)}
+
+# Trail map layers, in display order
+DIFFICULTY_LAYERS = ["Easy", "Moderate", "Strenuous", "Unknown"]
+
+
+def get_category_icon(category: str) -> Tuple[str, str]:
+    """Hub amenity category -> (marker color, Font Awesome icon)."""
+    cat_lower = str(category).lower()
+    if "gas" in cat_lower or "station" in cat_lower: return "blue", "gas-pump"
+    if "ev" in cat_lower: return "green", "charging-station"
+    if "entrance" in cat_lower: return "darkblue", "star"
+    if "food" in cat_lower: return "orange", "utensils"
+    if "lodging" in cat_lower: return "purple", "bed"
+    if "camping" in cat_lower: return "darkgreen", "campground"
+    if "store" in cat_lower or "supplies" in cat_lower: return "red", "shopping-cart"
+    if "medical" in cat_lower: return "darkred", "medkit"
+    return "gray", "info-circle"
+
+
+def get_difficulty_color(diff: str) -> str:
+    if not diff or diff.lower() == "unknown": return "gray"
+    d = diff.lower()
+    if "easy" in d: return "green"
+    if "moderate" in d: return "orange"
+    if "hard" in d or "strenuous" in d: return "red"
+    return "gray"
+
+
+def get_layer_key(diff_str: str) -> str:
+    """Difficulty -> map layer (Easy / Moderate / Strenuous / Unknown)."""
+    if not diff_str or diff_str.lower() == "unknown": return "Unknown"
+    d = diff_str.lower()
+    if "easy" in d: return "Easy"
+    if "hard" in d or "strenuous" in d: return "Strenuous"
+    if "moderate" in d: return "Moderate"
+    return "Unknown"
+
+
+def _get_attr(obj, attr, default=None):
+    return obj.get(attr, default) if isinstance(obj, dict) else getattr(obj, attr, default)
+
+
+def _present(value) -> bool:
+    """False for None, NaN and empty strings (trail-frame cells)."""
+    if value is None or value == "":
+        return False
+    return not (isinstance(value, float) and math.isnan(value))
+
+
+def point_feature(lat: float, lon: float, properties: Dict[str, Any]) -> Dict[str, Any]:
+    """GeoJSON Point feature (GeoJSON order is [lon, lat])."""
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(lon, COORD_PRECISION), round(lat, COORD_PRECISION)]},
+        "properties": properties
+    }
+
+
+def feature_collection(features: List[Dict[str, Any]], **meta) -> Dict[str, Any]:
+    return {"type": "FeatureCollection", **meta, "features": features}
+
+
+def split_by(collection: Dict[str, Any], prop: str, order: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    {value: FeatureCollection} grouping a collection's features by one property,
+    in `order` first, then first-seen order.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {key: [] for key in (order or [])}
+    for feature in collection.get("features", []):
+        groups.setdefault(feature["properties"].get(prop), []).append(feature)
+    return {key: feature_collection(features) for key, features in groups.items() if features}
+
+
+# --- Layer Builders ---
+
+def hub_services_features(amenities_data: Dict[str, Dict[str, List[Any]]]) -> Dict[str, Any]:
+    """
+    Hub amenities ({hub: {category: [place dicts or Amenity]}}) as one FeatureCollection.
+    Properties: name, category, hub, color, icon, popup, tooltip.
+    """
+    features = []
+    for hub_name, categories in (amenities_data or {}).items():
+        for category, items in categories.items():
+            color, icon_name = get_category_icon(category)
+            for item in items:
+                lat, lon = _get_attr(item, "latitude"), _get_attr(item, "longitude")
+                if not lat or not lon:
+                    continue
+                name = _get_attr(item, "name")
+                address = _get_attr(item, "address")
+                gmaps = f"https://www.google.com/maps/search/?api=1&query={lat},{lon}"
+                # Show address with embedded link, fallback to coordinates link
+                if address and address.lower() != "n/a":
+                    addr_link = f'<a href="{gmaps}" target="_blank">{address} ↗</a>'
+                else:
+                    addr_link = f'<a href="{gmaps}" target="_blank">View on Maps ↗</a>'
+                features.append(point_feature(lat, lon, {
+                    "name": name,
+                    "category": category,
+                    "hub": hub_name,
+                    "color": color,
+                    "icon": icon_name,
+                    "popup": f"""<div style="width:180px"><b>{name}</b><br>{addr_link}</div>""",
+                    "tooltip": name
+                }))
+    return feature_collection(features, layer=HUB_SERVICES_LAYER)
+
+
+def place_categories(place: Any) -> List[str]:
+    """A place's essentials categories: the precomputed column, else classified now (raw dicts)."""
+    categories = _get_attr(place, "essentials_categories")
+    if categories is None:
+        categories = classify_essentials(_get_attr(place, "amenities", []) or [])
+    return categories
+
+
+def in_park_features(places: List[Any], campgrounds: List[Any]) -> Dict[str, Any]:
+    """
+    Campgrounds ("Camping") and NPS places in each of their essentials categories,
+    as one FeatureCollection with offsets already applied.
+    Properties: name, category, color, icon, popup, tooltip.
+    """
+    features = []
+
+    # 1. Campgrounds (Category: Camping)
+    for camp in campgrounds or []:
+        loc = _get_attr(camp, "location")
+        lat, lon = _get_attr(loc, "lat"), _get_attr(loc, "lon")
+        if not lat or not lon:
+            continue
+        off_lat, off_lon = CAMPING_CATEGORY["offset"]
+        name = _get_attr(camp, "name")
+        desc = (_get_attr(camp, "description") or "")[:100] + "..."
+        features.append(point_feature(lat + off_lat, lon + off_lon, {
+            "name": name,
+            "category": "Camping",
+            "color": CAMPING_CATEGORY["color"],
+            "icon": CAMPING_CATEGORY["icon"],
+            "popup": f"""<div style="width:180px"><b>{name}</b><br><span style="font-size:12px">{desc}</span></div>""",
+            "tooltip": name
+        }))
+
+    # 2. Places, once per matching category
+    for place in places or []:
+        loc = _get_attr(place, "location")
+        lat, lon = _get_attr(loc, "lat"), _get_attr(loc, "lon")
+        if not lat or not lon:
+            continue
+        title = _get_attr(place, "title")
+        place_url = _get_attr(place, "url")
+        url_html = ""
+        if place_url:
+            url_html = f'<br><a href="{place_url}" target="_blank" style="color:blue; text-decoration:none;">Website &rarr;</a>'
+
+        for cat_name in place_categories(place):
+            info = IN_PARK_CATEGORIES.get(cat_name)
+            if not info:
+                continue
+            off_lat, off_lon = info["offset"]
+            features.append(point_feature(lat + off_lat, lon + off_lon, {
+                "name": title,
+                "category": cat_name,
+                "color": info["color"],
+                "icon": info["icon"],
+                "popup": f"""<div style="width:160px"><b>{title}</b><br><span style="color:gray">{cat_name}</span>{url_html}</div>""",
+                "tooltip": f"{title} ({cat_name})"
+            }))
+    return feature_collection(features, layer=IN_PARK_LAYER)
+
+
+def trail_features(rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Trail Browser rows (app.ui.trail_table) with coordinates as one FeatureCollection.
+    The popup includes the weather badge when the row has one.
+    Properties: name, difficulty, layer, length_miles, color, icon, popup, tooltip.
+    """
+    features = []
+    for row in rows:
+        if not _present(row.get("lat")) or not row.get("lat") or not _present(row.get("lon")):
+            continue
+        rating, reviews, url_at = row.get("rating"), row.get("reviews"), row.get("url_at")
+
+        # Build rating string with optional reviews link
+        if _present(rating) and _present(reviews) and _present(url_at):
+            rating_str = f"{rating} ⭐ <a href='{url_at}?reviews=true' target='_blank'>Latest Reviews ({int(reviews)})</a>"
+        elif _present(rating) and _present(reviews):
+            rating_str = f"{rating} ⭐ ({int(reviews)} Latest Reviews)"
+        elif _present(rating):
+            rating_str = f"{rating} ⭐"
+        else:
+            rating_str = "N/A"
+
+        # Trail name links to NPS, else AllTrails
+        trail_url = row.get("url_nps") if _present(row.get("url_nps")) else url_at if _present(url_at) else None
+        if trail_url:
+            trail_name_html = f"<a href='{trail_url}' target='_blank' style='text-decoration:none;color:#1a73e8;'><b>{row['name']}</b></a>"
+        else:
+            trail_name_html = f"<b>{row['name']}</b>"
+
+        wx = row.get("weather")
+        wx_html = f"<br>🌡️ {wx['temp']:.0f}°F ({wx['condition']})" if isinstance(wx, dict) and wx else ""
+
+        length = row.get("length") if _present(row.get("length")) else None
+        popup_html = f"""
+        {trail_name_html}<br>
+        {row['difficulty']} | {length or '?'} mi{wx_html}<br>
+        Rating: {rating_str}
+        """
+        features.append(point_feature(row["lat"], row["lon"], {
+            "name": row["name"],
+            "difficulty": row["difficulty"],
+            "layer": get_layer_key(row["difficulty"]),
+            "length_miles": length,
+            "color": get_difficulty_color(row["difficulty"]),
+            "icon": "person-hiking",
+            "popup": popup_html,
+            "tooltip": row["name"]
+        }))
+    return feature_collection(features, layer=TRAILS_LAYER)
+
+
+# --- Exported Layers ---
+
+def layers_version(data_manager, park_code: str) -> str:
+    """Digest of the park's fixture files, stored with exported layers as source_version."""
+    return hashlib.sha1(repr(data_manager.fixtures_signature(park_code)).encode("utf-8")).hexdigest()[:12]
+
+
+def load_park_layer(data_manager, park_code: str, name: str) -> Optional[Dict[str, Any]]:
+    """An exported layer, or None when missing or exported from older fixtures."""
+    collection = data_manager.load_geojson_layer(park_code, name)
+    if collection and collection.get("source_version") == layers_version(data_manager, park_code):
+        return collection
+    return None
@@ -0,0 +1,107 @@
+from typing import List, Optional
+
+import numpy as np
+
+from app.models import TrailSummary
+
+# Difficulty Mapping: easy=1, moderate=2, hard=3 (anything unknown ranks as hard)
+DIFFICULTY_RANK = {"easy": 1, "moderate": 2, "hard": 3}
+DEFAULT_DIFFICULTY_RANK = 3
+
+# Feature bitmask flags (precomputed once per trail from the free-text feature tags)
+FLAG_DOG = 1         # some feature mentions "dog" (and is not itself a "no dog" tag)
+FLAG_NO_DOG = 2      # some feature mentions "no dog" (explicit reject)
+FLAG_KID = 4         # some feature mentions "kid"
+FLAG_WHEELCHAIR = 8  # some feature mentions "wheelchair" or "ada"
+
+
+def difficulty_rank(difficulty: Optional[str]) -> int:
+    return DIFFICULTY_RANK.get((difficulty or "").lower(), DEFAULT_DIFFICULTY_RANK)
+
+
+def feature_flags(features: List[str]) -> int:
+    """Collapses a trail's feature tags into a bitmask of the flags the engine filters on."""
+    flags = 0
+    for f in features or []:
+        f = f.lower()
+        if "no dog" in f:
+            flags |= FLAG_NO_DOG
+        elif "dog" in f:
+            flags |= FLAG_DOG
+        if "kid" in f:
+            flags |= FLAG_KID
+        if "wheelchair" in f or "ada" in f:
+            flags |= FLAG_WHEELCHAIR
+    return flags
+
+
+class TrailIndex:
+    """
+    Columnar view over a list of TrailSummary objects.
+    Built once when a park's trails load; filters then run as vectorized NumPy masks
+    instead of per-trail Python loops.
+    """
+    def __init__(self, trails: List[TrailSummary]):
+        self.source = trails
+        self.trails = list(trails)
+
+        self.difficulty_rank = np.fromiter(
+            (difficulty_rank(t.difficulty) for t in self.trails), dtype=np.int8, count=len(self.trails)
+        )
+        self.length = np.fromiter(
+            (t.length_miles or 0.0 for t in self.trails), dtype=np.float64, count=len(self.trails)
+        )
+        self.rating = np.fromiter(
+            (t.average_rating or 0.0 for t in self.trails), dtype=np.float64, count=len(self.trails)
+        )
+        self.flags = np.fromiter(
+            (feature_flags(t.features) for t in self.trails), dtype=np.uint8, count=len(self.trails)
+        )
+        self.elevation = np.fromiter(
+            (t.elevation_gain_ft or 0 for t in self.trails), dtype=np.float64, count=len(self.trails)
+        )
+        # Unranked trails are NaN so scoring can tell them apart from rank 1
+        self.popularity_rank = np.fromiter(
+            (t.popularity_rank if t.popularity_rank else np.nan for t in self.trails),
+            dtype=np.float64, count=len(self.trails)
+        )
+        self.weather_zone = [t.weather_zone for t in self.trails]
+        # Trailhead coordinates (NaN when unknown) for radius queries
+        self.lat = np.fromiter(
+            (t.location.lat if t.location else np.nan for t in self.trails), dtype=np.float64, count=len(self.trails)
+        )
+        self.lon = np.fromiter(
+            (t.location.lon if t.location else np.nan for t in self.trails), dtype=np.float64, count=len(self.trails)
+        )
+
+    def __len__(self) -> int:
+        return len(self.trails)
+
+    def mask(self, prefs) -> np.ndarray:
+        """
+        Boolean mask of trails satisfying a UserPreference.
+        Mirrors the original per-trail checks: difficulty, length, rating, then feature tags.
+        """
+        user_rank = DIFFICULTY_RANK.get(prefs.max_difficulty.lower(), DEFAULT_DIFFICULTY_RANK)
+
+        m = self.difficulty_rank <= user_rank
+        m &= self.length <= prefs.max_length_miles
+        m &= self.rating >= prefs.min_rating
+
+        if prefs.dog_friendly:
+            # Strict mode: only trails KNOWN to be dog friendly, and never an explicit "no dog"
+            m &= (self.flags & FLAG_DOG).astype(bool)
+            m &= ~(self.flags & FLAG_NO_DOG).astype(bool)
+        if prefs.kid_friendly:
+            m &= (self.flags & FLAG_KID).astype(bool)
+        if prefs.wheelchair_accessible:
+            m &= (self.flags & FLAG_WHEELCHAIR).astype(bool)
+
+        return m
+
+    def select(self, mask: np.ndarray) -> List[TrailSummary]:
+        """Returns the trails where mask is True, preserving the original order."""
+        return [self.trails[i] for i in np.flatnonzero(mask)]
+
+    def filter(self, prefs) -> List[TrailSummary]:
+        return self.select(self.mask(prefs))
@@ -1,6 +1,8 @@
 from typing import List, Optional, Dict, Any
 import re
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.utils.keyword_classifier import classify_essentials
 
 # --- Common Enums/Types ---
 class GeoLocation(BaseModel):
@@ -77,6 +79,7 @@ class Place(BaseModel):
     isOpenToPublic: bool = True
     isManagedByNps: bool = True
     url: Optional[str] = None
+    essentials_categories: List[str] = []  # In-park essentials (Restroom, Water, ...), from amenities
 
     @model_validator(mode='after')
     def extract_url_from_body(self):
@@ -87,6 +90,12 @@ class Place(BaseModel):
                 self.url = match.group(1)
         return self
 
+    @model_validator(mode='after')
+    def categorize_essentials(self):
+        # Classified once when the place is loaded or fetched (always from the current amenities)
+        self.essentials_categories = classify_essentials(self.amenities)
+        return self
+
 class ThingToDo(BaseModel):
     id: str
     title: str
@@ -228,6 +237,9 @@ class TrailSummary(BaseModel):
     surface_types: List[str] = []
     recent_reviews: List[TrailReview] = []
     images: List[ParkImage] = []  # NEW: Trail images from NPS data
+    popularity_rank: Optional[int] = None  # AllTrails ranking (1 = most popular)
+    weather_zone: Optional[str] = None  # Zone name for zonal weather lookups
+    location: Optional[GeoLocation] = None  # Trailhead coordinates
     
     # Fields for URL support
     nps_url: Optional[str] = None
@@ -238,6 +250,14 @@ class TrailSummary(BaseModel):
         """Returns the best available URL for the LLM context."""
         return self.nps_url or self.alltrails_url
 
+    @field_validator('location', mode='before')
+    @classmethod
+    def drop_incomplete_location(cls, v):
+        # Trails without usable coordinates keep loading, just without a location
+        if isinstance(v, dict) and (v.get("lat") is None or v.get("lon") is None):
+            return None
+        return v
+
     @model_validator(mode='after')
     def set_defaults(self):
         if not self.difficulty:
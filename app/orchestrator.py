@@ -8,16 +8,43 @@ from app.clients.nps_client import NPSClient
 from app.clients.weather_client import WeatherClient
 from app.clients.external_client import ExternalClient
 from app.engine.constraints import ConstraintEngine, SafetyStatus, UserPreference
+from app.engine.global_trail_index import GlobalTrailIndex
+from app.engine.amenity_table import AmenityTable
+from app.engine.event_index import EventIndex, parse_event_date
 from app.models import TrailSummary, ParkContext, ThingToDo, Event, Campground, VisitorCenter, Webcam, Amenity, Alert, PhotoSpot, ScenicDrive
 from app.services.llm_service import LLMService, LLMResponse, LLMParsedIntent
-from app.utils.geospatial import mine_entrances 
+from app.utils.geospatial import mine_entrances, SpatialIndex, item_coords
 from app.services.data_manager import DataManager
 from app.services.review_scraper import ReviewScraper
 from app.services.park_data_fetcher import ParkDataFetcher
-from app.utils.fuzzy_match import fuzzy_match_trail_name
+from app.utils.fuzzy_match import TrailNameIndex
+from app.utils.alert_matcher import get_alert_matches
 
 logger = logging.getLogger(__name__)
 
+# Max trails passed to the LLM per turn (review targets are always kept on top of this)
+MAX_LLM_TRAILS = 25
+
+# "Anywhere" queries are answered from the cross-park trail index
+CROSS_PARK_PHRASES = ["any park", "all parks", "every park", "anywhere", "across parks", "which park", "which parks"]
+CROSS_PARK_THEMES = {
+    "waterfall": ["waterfall", "falls"],
+    "lake": ["lake"],
+    "canyon": ["canyon"],
+    "arch": ["arch"],
+    "summit": ["summit", "peak"],
+    "river": ["river", "creek"],
+    "meadow": ["meadow"],
+    "overlook": ["overlook", "viewpoint", "point"],
+    "forest": ["forest", "grove", "sequoia"],
+}
+MAX_CROSS_PARK_RESULTS = 15
+
+# "What's near X" questions are answered with a per-park spatial index
+NEARBY_PHRASES = ["near ", "nearby", "close to", "closest", "nearest", "within"]
+DEFAULT_NEARBY_RADIUS_MILES = 5.0
+MAX_NEARBY_RESULTS = 15
+
 class SessionContext(BaseModel):
     current_park_code: Optional[str] = None
     current_user_prefs: UserPreference = Field(default_factory=UserPreference)
@@ -43,61 +70,55 @@ class OutdoorConciergeOrchestrator:
         nps_client: NPSClient,
         weather_client: WeatherClient,
         external_client: ExternalClient, 
-        # DataManager doesn't need to be injected if it's stateless config, 
-        # but good practice to initialize it here.
+        # Shared instances come from the ServiceRegistry; built here when not injected
+        data_manager: Optional[DataManager] = None,
+        review_scraper: Optional[ReviewScraper] = None,
+        park_fetcher: Optional[ParkDataFetcher] = None,
     ):
         self.llm = llm_service
         self.nps = nps_client
         self.weather = weather_client
         self.external = external_client
         self.engine = ConstraintEngine()
-        self.data_manager = DataManager()
-        self.review_scraper = ReviewScraper(self.llm)
-        self.park_fetcher = ParkDataFetcher(nps_client=self.nps, data_manager=self.data_manager)
+        self.data_manager = data_manager or DataManager()
+        self.review_scraper = review_scraper or ReviewScraper(self.llm, data_manager=self.data_manager)
+        self.park_fetcher = park_fetcher or ParkDataFetcher(
+            nps_client=self.nps, data_manager=self.data_manager, external_client=self.external
+        )
+        self.global_trails = GlobalTrailIndex(self.data_manager)
+        self._spatial_indexes: Dict[str, Any] = {}  # park_code -> (signature, SpatialIndex)
+        self._amenity_tables: Dict[str, Any] = {}  # park_code -> (file signature, AmenityTable)
+        self._trail_name_indexes: Dict[Any, Any] = {}  # (park_code, kind) -> (names, TrailNameIndex)
+        self._event_indexes: Dict[str, Any] = {}  # park_code -> (events cache signature, EventIndex)
 
-    def get_park_amenities(self, park_code: str) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    def get_amenity_table(self, park_code: str) -> AmenityTable:
         """
-        Retrieves amenities from the STATIC CACHE (File System).
-        Does NOT trigger live API calls.
-        
-        Returns:
-            {
-                "Entrance Name": {
-                    "gas station...": [ {...}, ... ],
-                    "urgent care...": [ ... ]
-                }
-            }
+        The park's precomputed AmenityTable, cached in memory until the consolidated
+        amenity files change on disk.
         """
-        if self.data_manager:
-            consolidated = self.data_manager.load_consolidated_amenities(park_code)
-            if consolidated and "hubs" in consolidated:
-                logger.debug(f"Loaded consolidated amenities for {park_code}")
-                results = {}
-                for hub_name, hub_data in consolidated["hubs"].items():
-                    # 1. Prepare Amenities
-                    amenities = hub_data.get("amenities", {})
-                    
-                    # 2. Inject Park Entrance (Hub Location)
-                    loc = hub_data.get("location", {})
-                    if "lat" in loc and "lon" in loc:
-                         if "Park Entrance" not in amenities:
-                             amenities["Park Entrance"] = []
-                         
-                         amenities["Park Entrance"].insert(0, {
-                            "name": hub_name,
-                            "type": "entrance",
-                            "address": "N/A",
-                            "latitude": loc["lat"],
-                            "longitude": loc["lon"],
-                            "rating": None,
-                            "rating_count": None,
-                            "google_maps_url": f"https://www.google.com/maps/search/?api=1&query={loc['lat']},{loc['lon']}"
-                         })
-                    
-                    results[hub_name] = amenities
-                return results
+        park_code = park_code.upper()
+        signature = self.data_manager.amenity_files_signature(park_code)
+        cached = self._amenity_tables.get(park_code)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        consolidated = self.data_manager.load_consolidated_amenities(park_code)
+        if consolidated and "hubs" in consolidated:
+            logger.debug(f"Loaded consolidated amenities for {park_code}")
+            index = self.data_manager.load_amenity_index(park_code)
+        else:
+            consolidated, index = self._load_hub_amenities_fallback(park_code), None
 
-        # Fallback to legacy mine_entrances logic if no consolidated file
+        table = AmenityTable.from_consolidated(park_code, consolidated, index)
+        self._amenity_tables[park_code] = (signature, table)
+        logger.info(f"🏪 Amenity table for {park_code}: {len(table)} rows")
+        return table
+
+    def _load_hub_amenities_fallback(self, park_code: str) -> Dict[str, Any]:
+        """
+        Legacy path for parks without a consolidated file: mines hubs from NPS places and
+        reads the per-hub amenity files. Returns the consolidated file's shape.
+        """
         logger.info(f"Loading cached amenities for {park_code} (FALLBACK)...")
         
         # 1. Fetch raw candidates (NPS Live or Cached - keeping live for now as it's cheap)
@@ -110,36 +131,63 @@ class OutdoorConciergeOrchestrator:
         
         entrances = mine_entrances(park_code, places_dicts, vc_dicts)
         
-        # 3. Load from Disk
-        results = {}
+        # 3. Load from Disk (READ ONLY operation)
+        hubs = {}
         for ent in entrances:
-            name = ent["name"]
-            
-            # READ ONLY operation
-            data = self.data_manager.load_amenities(park_code, name) or {}
-            
-            # ALWAYS inject the Entrance itself as an amenity so it appears on map/list
-            # Use a special category "Park Entrance"
-            if "Park Entrance" not in data:
-                data["Park Entrance"] = []
-            
-            # Check if we already have it (unlikely if empty) or just append
-            # Create Amenity for the Hub itself
-            hub_amenity = {
-                "name": name,
-                "type": "entrance",
-                "address": "N/A",
-                "latitude": ent["lat"],
-                "longitude": ent["lon"],
-                "rating": None,
-                "rating_count": None,
-                "google_maps_url": f"https://www.google.com/maps/search/?api=1&query={ent['lat']},{ent['lon']}"
+            hubs[ent["name"]] = {
+                "location": {"lat": ent["lat"], "lon": ent["lon"]},
+                "amenities": self.data_manager.load_amenities(park_code, ent["name"]) or {}
             }
-            data["Park Entrance"].insert(0, hub_amenity)
+        return {"park_code": park_code, "hubs": hubs}
+
+    def _events_cache_signature(self, park_code: str):
+        for name, mtime, size in self.data_manager.daily_cache_signature(park_code):
+            if name == "events.json":
+                return (mtime, size)
+        return None
+
+    def get_event_index(self, park_code: str) -> EventIndex:
+        """
+        The park's EventIndex over today's events cache (fetched and cached on a miss),
+        kept in memory until the cache file changes.
+        """
+        park_code = park_code.upper()
+        signature = self._events_cache_signature(park_code)
+        cached = self._event_indexes.get(park_code)
+        if cached and signature is not None and cached[0] == signature:
+            return cached[1]
+
+        events_data = self.data_manager.load_daily_cache(park_code, "events")
+        if events_data is not None:
+            logger.info(f"Using cached events for {park_code}")
+            index = EventIndex(events_data)
+        else:
+            index = EventIndex(self.nps.get_events(park_code))
+            # Cached deduplicated, so every reader gets one event per title
+            self.data_manager.save_daily_cache(park_code, "events", [e.model_dump() for e in index.events])
+            signature = self._events_cache_signature(park_code)
 
-            results[name] = data
+        self._event_indexes[park_code] = (signature, index)
+        logger.info(f"📅 Event index for {park_code}: {len(index)} events")
+        return index
 
-        return results
+    def get_park_amenities(self, park_code: str) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Retrieves amenities from the STATIC CACHE (File System).
+        Does NOT trigger live API calls.
+        
+        Each hub's own location is included under the "Park Entrance" category.
+        
+        Returns:
+            {
+                "Entrance Name": {
+                    "Gas Station": [ {...}, ... ],
+                    "Medical": [ ... ],
+                    "Park Entrance": [ {...} ]
+                }
+            }
+        """
+        return self.get_amenity_table(park_code).hub_view()
 
     def handle_query(self, request: OrchestratorRequest) -> OrchestratorResponse:
         # ... (Existing logic unchanged for now) ...
@@ -234,6 +282,12 @@ class OutdoorConciergeOrchestrator:
         updated_context.current_user_prefs = intent.user_prefs
         updated_context.chat_history.append(f"User: {query}")
 
+        # 2b. Cross-Park Queries ("easy waterfall hikes in any park")
+        if not intent.park_code and any(phrase in query.lower() for phrase in CROSS_PARK_PHRASES):
+            resp = self._answer_cross_park_trails(query, intent)
+            updated_context.chat_history.append(f"Agent: {resp.message}")
+            return OrchestratorResponse(chat_response=resp, parsed_intent=intent, updated_context=updated_context.model_dump())
+
         if not final_park_code:
             logger.warning(f"⚠️ No park code available (intent: {intent.park_code}, context: {ctx.current_park_code})")
             
@@ -450,15 +504,16 @@ class OutdoorConciergeOrchestrator:
             alerts = self.nps.get_alerts(intent.park_code)
             # Save raw dicts
             self.data_manager.save_daily_cache(intent.park_code, "alerts", [a.model_dump() for a in alerts])
-
-        # 2. Events
-        events_data = self.data_manager.load_daily_cache(intent.park_code, "events")
-        if events_data is not None:
-            events = [Event(**e) for e in events_data]
-            logger.info(f"Using cached events for {intent.park_code}")
+            # Re-resolve trails/drives/campgrounds against the fresh alerts
+            get_alert_matches(intent.park_code, alerts, self.data_manager, refresh=True)
+
+        # 2. Events (deduplicated and indexed by date once per daily cache)
+        event_index = self.get_event_index(intent.park_code)
+        if intent.target_date and parse_event_date(intent.target_date):
+            events = event_index.for_visit(intent.target_date, intent.duration_days)
+            logger.info(f"📅 {len(events)} of {len(event_index)} events overlap {intent.target_date} (+{intent.duration_days}d)")
         else:
-            events = self.nps.get_events(intent.park_code)
-            self.data_manager.save_daily_cache(intent.park_code, "events", [e.model_dump() for e in events])
+            events = event_index.upcoming()
         
         # 3. Weather
         weather = None
@@ -482,21 +537,12 @@ class OutdoorConciergeOrchestrator:
                 if weather:
                     self.data_manager.save_daily_cache(intent.park_code, "weather", weather.model_dump())
 
+        # Zonal Weather (cache only; written by the Park Explorer fetch)
+        zone_weather = self.data_manager.load_daily_cache(intent.park_code, "zone_weather") or {}
+
         # Amenities (Checking Hub Cache First)
-        amenities_data = self.get_park_amenities(intent.park_code)
-        # Flatten amenities from all hubs for LLM context, preserving category
-        amenities = []
-        for hub_name, entries in amenities_data.items():
-            for category, items in entries.items():
-                for item in items:
-                    # Add category to item for LLM context
-                    item_with_category = {**item, "category": category}
-                    # Construct simple Amenity object for LLM context
-                    try:
-                        amenities.append(Amenity(**item_with_category))
-                    except Exception:
-                        # If Amenity model doesn't have category field, just use original
-                        amenities.append(Amenity(**item))
+        # Precomputed per park: closest places per hub and category, each place once
+        amenities = list(self.get_amenity_table(intent.park_code).chat_amenities)
 
         # 4. Engine Execution
         # We need _fetch_trails_for_park logic to be real or mock
@@ -538,6 +584,7 @@ class OutdoorConciergeOrchestrator:
             now = datetime.now()
             
             fresh_targets = []
+            target_names = self._get_trail_name_index(intent.park_code, [t.name for t in raw_trails]).matching_names(targets or [])
             if intent.review_targets:
                  fresh_targets.extend(intent.review_targets)
                  
@@ -557,12 +604,10 @@ class OutdoorConciergeOrchestrator:
                     # Logic:
                     # 1. If explicit targets were requested, ensure canonical names are in intent
                     passed_through = False
-                    if targets:
-                         for tgt in targets:
-                             if fuzzy_match_trail_name(tgt, t.name):
-                                 if t.name not in fresh_targets:
-                                     fresh_targets.append(t.name)
-                                 passed_through = True
+                    if targets and t.name in target_names:
+                         if t.name not in fresh_targets:
+                             fresh_targets.append(t.name)
+                         passed_through = True
                     
                     # 2. If NO explicit targets (fallback case), add everything with reviews
                     if not targets or (len(targets) >= 3 and "top trails" in query.lower()): # Heuristic for fallback
@@ -608,6 +653,30 @@ class OutdoorConciergeOrchestrator:
         
         # Else (Itinerary / List Options): Keep strict vetted_trails logic above
 
+        # RANKING: Send only the top candidates to the LLM (deterministic, smaller prompt)
+        if len(vetted_trails) > MAX_LLM_TRAILS:
+            targets = intent.review_targets or []
+            target_names = self._get_trail_name_index(intent.park_code, [t.name for t in raw_trails]).matching_names(targets)
+            pinned = [t for t in vetted_trails if t.name in target_names]
+            default_length = UserPreference().max_length_miles
+            prefs = intent.user_prefs or UserPreference()
+            matches = self.engine.search_trails(
+                vetted_trails,
+                target_length_miles=prefs.max_length_miles if prefs.max_length_miles < default_length else None,
+                zone_weather=zone_weather,
+                base_zone_name=park.base_weather_zone if park else None,
+                alerts=alerts,
+                top_k=max(MAX_LLM_TRAILS - len(pinned), 0)
+            )
+            pinned_ids = {id(t) for t in pinned}
+            vetted_trails = pinned + [m.trail for m in matches if id(m.trail) not in pinned_ids]
+            logger.info(f"🏅 Ranked shortlist: {len(vetted_trails)} trails ({len(pinned)} pinned targets)")
+
+        # 4c. Spatial Lookup ("what's within 5 miles of Angels Landing?")
+        nearby = None
+        if any(phrase in query.lower() for phrase in NEARBY_PHRASES):
+            nearby = self._find_nearby(query, intent, raw_trails, campgrounds, amenities)
+
         # 5. Response
         logger.info(f"📤 CALLING LLM with {len(vetted_trails)} trails, response_type={intent.response_type}, review_targets={intent.review_targets}")
         if intent.response_type == "reviews":
@@ -629,7 +698,8 @@ class OutdoorConciergeOrchestrator:
             webcams=webcams,
             amenities=amenities,
             photo_spots=photo_spots,
-            scenic_drives=scenic_drives
+            scenic_drives=scenic_drives,
+            nearby=nearby
         )
 
         # Append partial data notice if applicable
@@ -648,6 +718,133 @@ class OutdoorConciergeOrchestrator:
             vetted_things=things_to_do
         )
 
+    def _get_spatial_index(self, park_code: str, trails, campgrounds, amenities) -> SpatialIndex:
+        """
+        Per-park spatial index over places, amenities, trails and campgrounds.
+        Rebuilt when the park's fixture files (places, trails, campgrounds, amenities)
+        change on disk, or when the collections passed in change size.
+        """
+        places = self.data_manager.load_fixture(park_code, "places.json") or []
+        signature = (self.data_manager.fixtures_signature(park_code),
+                     len(places), len(amenities), len(trails), len(campgrounds))
+        cached = self._spatial_indexes.get(park_code)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        index = SpatialIndex()
+        for kind, items, name_attr in [("place", places, "title"), ("amenity", amenities, "name"),
+                                       ("trail", trails, "name"), ("campground", campgrounds, "name")]:
+            for item in items:
+                lat, lon = item_coords(item)
+                if lat is None or lon is None:
+                    continue
+                name = item.get(name_attr) if isinstance(item, dict) else getattr(item, name_attr, None)
+                index.add(lat, lon, {"kind": kind, "name": name or kind.title(), "lat": lat, "lon": lon})
+
+        self._spatial_indexes[park_code] = (signature, index)
+        logger.info(f"📍 Spatial index for {park_code}: {len(index)} points")
+        return index
+
+    def _get_trail_name_index(self, park_code: str, names: List[str], kind: str = "trails") -> TrailNameIndex:
+        """
+        Per-park TrailNameIndex over a list of names, rebuilt only when the names change.
+        """
+        key = (park_code.upper(), kind)
+        names = tuple(names)
+        cached = self._trail_name_indexes.get(key)
+        if cached and cached[0] == names:
+            return cached[1]
+        index = TrailNameIndex(list(names))
+        self._trail_name_indexes[key] = (names, index)
+        return index
+
+    def _find_nearby(self, query: str, intent: LLMParsedIntent, trails, campgrounds, amenities) -> Optional[Dict[str, Any]]:
+        """
+        Resolves the anchor (a trail or campground named in the query) and lists what is around it.
+        """
+        import re
+
+        anchor = None
+        targets = intent.review_targets or []
+        clean_query = re.sub(r"[^\w\s']", " ", query)
+        candidates = list(trails) + list(campgrounds)
+        name_index = self._get_trail_name_index(
+            intent.park_code, [getattr(item, "name", None) or "" for item in candidates], kind="anchors"
+        )
+        anchor_names = name_index.matching_names(targets) | name_index.mentioned_in(clean_query)
+        for item in candidates:
+            name = getattr(item, "name", None)
+            if not name:
+                continue
+            if name in anchor_names:
+                lat, lon = item_coords(item)
+                if lat is not None:
+                    anchor = (name, lat, lon)
+                    break
+        if not anchor:
+            return None
+
+        radius = DEFAULT_NEARBY_RADIUS_MILES
+        m = re.search(r'within\s+(\d+(?:\.\d+)?)\s*(?:mi|mile)', query.lower())
+        if m:
+            radius = float(m.group(1))
+
+        index = self._get_spatial_index(intent.park_code, trails, campgrounds, amenities)
+        name, lat, lon = anchor
+        items = [
+            {"name": item["name"], "kind": item["kind"], "distance_miles": round(dist, 2)}
+            for item, dist in index.within(lat, lon, radius)
+            if item["name"] != name
+        ][:MAX_NEARBY_RESULTS]
+        logger.info(f"📍 Nearby {name}: {len(items)} points within {radius} mi")
+        return {"anchor": name, "radius_miles": radius, "items": items}
+
+    def _answer_cross_park_trails(self, query: str, intent: LLMParsedIntent) -> LLMResponse:
+        """
+        Answers trail questions spanning all parks directly from the global trail index.
+        """
+        from app.config import SUPPORTED_PARKS
+
+        self.global_trails.refresh()
+
+        query_lower = query.lower()
+        keywords = []
+        for theme, terms in CROSS_PARK_THEMES.items():
+            if theme in query_lower:
+                keywords.extend(terms)
+
+        hits = self.global_trails.search(prefs=intent.user_prefs, keywords=keywords)
+        # Best rated first, stable across parks
+        hits.sort(key=lambda h: h.trail.average_rating or 0.0, reverse=True)
+        hits = hits[:MAX_CROSS_PARK_RESULTS]
+        logger.info(f"🌎 Cross-park search: {len(hits)} hits (keywords={keywords})")
+
+        if not hits:
+            message = (
+                f"I couldn't find trails matching that across the parks I have data for "
+                f"({', '.join(p.upper() for p in self.global_trails.park_codes)}). "
+                f"Try loosening the difficulty or length."
+            )
+        else:
+            lines = ["Here are matching trails across the parks I have data for:\n"]
+            for h in hits:
+                t = h.trail
+                park_name = SUPPORTED_PARKS.get(h.park_code, h.park_code.upper())
+                details = [f"{t.length_miles} mi" if t.length_miles else None,
+                           (t.difficulty or "").title() or None,
+                           f"{t.average_rating}★" if t.average_rating else None]
+                detail_str = ", ".join(d for d in details if d)
+                name = f"[{t.name}]({t.url})" if t.url else t.name
+                lines.append(f"- **{name}** — {park_name}" + (f" ({detail_str})" if detail_str else ""))
+            message = "\n".join(lines)
+
+        return LLMResponse(
+            message=message,
+            safety_status="Unknown",
+            safety_reasons=["Multiple parks; check each park's conditions."],
+            suggested_trails=[h.trail.name for h in hits]
+        )
+
     def _fetch_trails_for_park(self, park_code: str) -> List[TrailSummary]:
         """
         Loads trail data from the filesystem (trails_v2.json), falling back to mock ONLY if files missing.
@@ -679,6 +876,7 @@ class OutdoorConciergeOrchestrator:
                 
                 if trails:
                     logger.info(f"Loaded {len(trails)} real trails for {park_code}")
+                    self.engine.index_trails(park_code, trails)
                     return trails
 
             except Exception as e:
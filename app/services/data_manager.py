@@ -16,11 +16,15 @@ class DataManager:
     def _get_park_dir(self, park_code: str) -> str:
         return os.path.join(self.base_dir, park_code.upper())
 
-    def _get_amenity_filepath(self, park_code: str, entrance_name: str) -> str:
+    @staticmethod
+    def amenity_slug(entrance_name: str) -> str:
+        """File-safe hub name used in amenities_<slug>.json."""
         safe_name = entrance_name.replace(" ", "_").lower()
         # Remove any non-alphanumeric chars for safety if needed
-        safe_name = "".join(c for c in safe_name if c.isalnum() or c == "_")
-        filename = f"amenities_{safe_name}.json"
+        return "".join(c for c in safe_name if c.isalnum() or c == "_")
+
+    def _get_amenity_filepath(self, park_code: str, entrance_name: str) -> str:
+        filename = f"amenities_{self.amenity_slug(entrance_name)}.json"
         return os.path.join(self._get_park_dir(park_code), filename)
 
     def load_fixture(self, park_code: str, filename: str) -> Optional[Any]:
@@ -116,6 +120,75 @@ class DataManager:
             logger.error(f"Failed to load consolidated amenities: {e}")
             return None
 
+    def load_amenity_index(self, park_code: str) -> Optional[Dict[str, Any]]:
+        """
+        Loads the compact 'amenity_index.json' (flat, distance-sorted rows) written at
+        consolidation time, or None for parks consolidated before it existed.
+        """
+        return self.load_fixture(park_code, "amenity_index.json")
+
+    def _get_geojson_layer_path(self, park_code: str, name: str) -> str:
+        return os.path.join(self._get_park_dir(park_code), "layers", f"{name}.geojson")
+
+    def load_geojson_layer(self, park_code: str, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Loads an exported map layer (layers/<name>.geojson), or None if not exported.
+        """
+        filepath = self._get_geojson_layer_path(park_code, name)
+        if not os.path.exists(filepath):
+            return None
+
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load map layer {filepath}: {e}")
+            return None
+
+    def save_geojson_layer(self, park_code: str, name: str, collection: Dict[str, Any]):
+        """
+        Saves a map layer FeatureCollection. Kept outside the fixture JSON files so
+        exporting doesn't change fixtures_signature().
+        """
+        filepath = self._get_geojson_layer_path(park_code, name)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(collection, f, ensure_ascii=False, separators=(",", ":"))
+            logger.info(f"Saved map layer: {filepath}")
+        except Exception as e:
+            logger.error(f"Failed to write map layer {filepath}: {e}")
+
+    def amenity_files_signature(self, park_code: str) -> tuple:
+        """Modification times of the consolidated amenity files (None when missing), for cache invalidation."""
+        park_dir = self._get_park_dir(park_code)
+        signature = []
+        for filename in ("amenities_consolidated.json", "amenity_index.json"):
+            path = os.path.join(park_dir, filename)
+            signature.append(os.path.getmtime(path) if os.path.exists(path) else None)
+        return tuple(signature)
+
+    @staticmethod
+    def _dir_signature(path: str) -> tuple:
+        """(name, mtime_ns, size) of every JSON file in a directory (one scandir), () if missing."""
+        try:
+            with os.scandir(path) as entries:
+                return tuple(sorted(
+                    (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                    for entry in entries if entry.name.endswith(".json") and entry.is_file()
+                ))
+        except OSError:
+            return ()
+
+    def fixtures_signature(self, park_code: str) -> tuple:
+        """Version of a park's fixture files, for in-memory cache invalidation."""
+        return self._dir_signature(self._get_park_dir(park_code))
+
+    def daily_cache_signature(self, park_code: str) -> tuple:
+        """Version of today's daily cache files (weather/alerts/events) for a park."""
+        return self._dir_signature(os.path.dirname(self._get_daily_cache_path(park_code, "_")))
+
     # --- Daily Persistent Cache Logic ---
     def _get_daily_cache_path(self, park_code: str, category: str) -> str:
         """
@@ -174,6 +247,47 @@ class DataManager:
         except Exception as e:
             logger.error(f"Failed to write daily cache {filepath}: {e}")
 
+    # --- Rendered Map Cache ---
+    def _get_map_cache_path(self, park_code: str, name: str, version: str) -> str:
+        """data_cache/[PARK]/maps/[name]-[version].html"""
+        return os.path.join("data_cache", park_code.upper(), "maps", f"{name}-{version}.html")
+
+    def load_map_html(self, park_code: str, name: str, version: str) -> Optional[str]:
+        """
+        Loads a pre-rendered map page for this data version, or None.
+        """
+        filepath = self._get_map_cache_path(park_code, name, version)
+        if not os.path.exists(filepath):
+            logger.debug(f"Map Cache MISS: {filepath}")
+            return None
+
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return f.read()
+        except Exception as e:
+            logger.error(f"Failed to read map cache {filepath}: {e}")
+            return None
+
+    def save_map_html(self, park_code: str, name: str, version: str, html: str):
+        """
+        Saves a pre-rendered map page, replacing older versions of the same map.
+        """
+        filepath = self._get_map_cache_path(park_code, name, version)
+        map_dir = os.path.dirname(filepath)
+        os.makedirs(map_dir, exist_ok=True)
+
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(html)
+            logger.info(f"Saved map cache: {filepath}")
+
+            current = os.path.basename(filepath)
+            for filename in os.listdir(map_dir):
+                if filename.startswith(f"{name}-") and filename != current:
+                    os.remove(os.path.join(map_dir, filename))
+        except Exception as e:
+            logger.error(f"Failed to write map cache {filepath}: {e}")
+
     def _cleanup_old_date_folders(self, park_code: str):
         """
         Removes old date folders for a park, keeping only today's folder.
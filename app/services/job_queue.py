@@ -0,0 +1,309 @@
+"""
+JobQueue - SQLite-backed queue for park onboarding jobs.
+
+Streamlit sessions submit jobs and poll their status; separate worker processes
+claim jobs and run ParkDataFetcher.ensure_park_data. Because the job lives in the
+database and runs outside the Streamlit script thread:
+- a browser refresh (or another user) sees the same job and its progress,
+- concurrent requests for the same park share one job,
+- a slow onboarding never blocks other sessions' script runs.
+
+Run dedicated workers with:
+    python -m app.services.job_queue --workers 2
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import argparse
+import threading
+import multiprocessing
+from contextlib import closing
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.getenv("JOB_QUEUE_DB", "data_cache/jobs.sqlite3")
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+# A running job whose worker hasn't checked in for this long is assumed dead and requeued
+HEARTBEAT_SEC = 10
+STALE_AFTER_SEC = 90
+MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    park_code TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    progress_current INTEGER NOT NULL DEFAULT 0,
+    progress_total INTEGER NOT NULL DEFAULT 0,
+    message TEXT,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_park ON jobs (park_code, created_at);
+"""
+
+
+class JobQueue:
+    """
+    Thin wrapper over a SQLite jobs table. Safe to use from several processes:
+    every state change is a single short transaction.
+    """
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"] or "{}")
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def submit(self, park_code: str, **options) -> Dict[str, Any]:
+        """
+        Queues an ensure_park_data job, or returns the park's already queued/running job.
+        options are passed through to ensure_park_data (include_trails=..., etc.).
+        """
+        park_code = park_code.upper()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE park_code = ? AND status IN ({','.join('?' * len(ACTIVE_STATES))}) "
+                "ORDER BY created_at LIMIT 1",
+                (park_code, *ACTIVE_STATES)
+            ).fetchone()
+            if row is None:
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, park_code, options, status, message, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, park_code, json.dumps(options), QUEUED, "Waiting for a worker...", time.time())
+                )
+                row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                logger.info(f"📥 Queued onboarding job {job_id[:8]} for {park_code}")
+            else:
+                logger.info(f"🔁 Reusing active job {row['id'][:8]} for {park_code}")
+            conn.execute("COMMIT")
+            return self._to_dict(row)
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            return self._to_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def latest_job(self, park_code: str) -> Optional[Dict[str, Any]]:
+        """Most recent job for a park (active or finished), for the UI to poll."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE park_code = ? ORDER BY created_at DESC LIMIT 1",
+                (park_code.upper(),)
+            ).fetchone()
+            return self._to_dict(row)
+
+    def list_jobs(self, statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            if statuses:
+                rows = conn.execute(
+                    f"SELECT * FROM jobs WHERE status IN ({','.join('?' * len(statuses))}) ORDER BY created_at",
+                    tuple(statuses)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY created_at").fetchall()
+            return [self._to_dict(r) for r in rows]
+
+    def claim_next(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Atomically moves the oldest queued job to running and returns it (FIFO across parks)."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._requeue_stale(conn)
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, started_at = ?, "
+                "heartbeat_at = ?, message = ? WHERE id = ?",
+                (RUNNING, worker, now, now, "Starting...", row["id"])
+            )
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+            return self._to_dict(job)
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _requeue_stale(self, conn: sqlite3.Connection):
+        cutoff = time.time() - STALE_AFTER_SEC
+        stale = conn.execute(
+            "SELECT id, park_code, attempts FROM jobs WHERE status = ? AND heartbeat_at < ?", (RUNNING, cutoff)
+        ).fetchall()
+        for row in stale:
+            if row["attempts"] >= MAX_ATTEMPTS:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (FAILED, "Worker stopped responding", time.time(), row["id"])
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker = NULL, message = ? WHERE id = ?",
+                    (QUEUED, "Worker lost; requeued", row["id"])
+                )
+            logger.warning(f"⚠️ Job {row['id'][:8]} for {row['park_code']} lost its worker")
+
+    def update_progress(self, job_id: str, current: int, total: int, message: str):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET progress_current = ?, progress_total = ?, message = ?, heartbeat_at = ? WHERE id = ?",
+                (current, total, message, time.time(), job_id)
+            )
+
+    def heartbeat(self, job_id: str):
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, message = ?, finished_at = ? WHERE id = ?",
+                (COMPLETED, json.dumps(result, default=str), "Data setup complete!", time.time(), job_id)
+            )
+
+    def fail(self, job_id: str, error: str):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (FAILED, error, time.time(), job_id)
+            )
+
+
+def _run_job(job_queue: JobQueue, job: Dict[str, Any]):
+    from app.services.registry import get_services
+
+    job_id = job["id"]
+    stop = threading.Event()
+
+    # Long stages (Gemini refine, blog scraping) may not report progress for minutes
+    def beat():
+        while not stop.wait(HEARTBEAT_SEC):
+            job_queue.heartbeat(job_id)
+
+    threading.Thread(target=beat, daemon=True).start()
+    try:
+        # One fetcher (and client sessions) per worker process, reused across jobs;
+        # without an NPS key, stages that need it fail on their own and the rest still run
+        fetcher = get_services().park_fetcher
+        result = fetcher.ensure_park_data(
+            job["park_code"],
+            progress_callback=lambda current, total, message: job_queue.update_progress(job_id, current, total, message),
+            **job["options"]
+        )
+        job_queue.complete(job_id, result)
+        logger.info(f"✅ Job {job_id[:8]} for {job['park_code']} completed")
+    except Exception as e:
+        job_queue.fail(job_id, str(e))
+        logger.error(f"❌ Job {job_id[:8]} for {job['park_code']} failed: {e}")
+    finally:
+        stop.set()
+
+
+def run_worker(db_path: str = DEFAULT_DB_PATH, poll_interval: float = 2.0, max_jobs: Optional[int] = None):
+    """
+    Worker loop: claims and runs jobs until max_jobs have run (forever by default).
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    job_queue = JobQueue(db_path)
+    worker = f"{os.uname().nodename if hasattr(os, 'uname') else 'local'}:{os.getpid()}"
+    logger.info(f"👷 Job worker {worker} polling {db_path}")
+
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = job_queue.claim_next(worker)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        logger.info(f"🚀 Worker {worker} running job {job['id'][:8]} for {job['park_code']}")
+        _run_job(job_queue, job)
+        processed += 1
+
+
+_started_workers: List[multiprocessing.Process] = []
+
+
+def start_workers(count: int = 1, db_path: str = DEFAULT_DB_PATH) -> List[multiprocessing.Process]:
+    """
+    Spawns daemon worker processes for this server process (once; later calls are no-ops
+    while they're alive). Jobs they leave behind on exit are requeued by the next worker.
+    """
+    alive = [p for p in _started_workers if p.is_alive()]
+    ctx = multiprocessing.get_context("spawn")
+    for _ in range(max(0, count - len(alive))):
+        process = ctx.Process(target=run_worker, args=(db_path,), daemon=True, name="park-data-worker")
+        process.start()
+        alive.append(process)
+    _started_workers[:] = alive
+    return alive
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(processName)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Run park data onboarding workers")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Job queue database path")
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        run_worker(args.db)
+    else:
+        processes = [
+            multiprocessing.Process(target=run_worker, args=(args.db,), name=f"worker-{i}")
+            for i in range(args.workers)
+        ]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
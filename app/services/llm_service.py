@@ -12,7 +12,8 @@ from pydantic import BaseModel, Field, ValidationError
 
 from app.engine.constraints import UserPreference, SafetyStatus
 from app.models import TrailSummary, ThingToDo, Event, Campground, VisitorCenter, Webcam, Amenity, TrailReview, PhotoSpot, ScenicDrive
-from app.utils.fuzzy_match import fuzzy_match_trail_name
+from app.utils.fuzzy_match import TrailNameIndex
+from app.utils.alert_matcher import get_alert_index
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +57,8 @@ class LLMService(Protocol):
         webcams: List[Webcam],
         amenities: List[Amenity],
         photo_spots: List[PhotoSpot] = [],
-        scenic_drives: List[ScenicDrive] = []
+        scenic_drives: List[ScenicDrive] = [],
+        nearby: Optional[dict] = None
     ) -> LLMResponse: ...
 
 # --- Agent Worker Abstraction ---
@@ -207,7 +209,8 @@ class GeminiLLMService:
         webcams: List[Webcam],
         amenities: List[Amenity],
         photo_spots: List[PhotoSpot] = None,
-        scenic_drives: List[ScenicDrive] = None
+        scenic_drives: List[ScenicDrive] = None,
+        nearby: Optional[dict] = None
     ) -> LLMResponse:
         alerts = alerts or []
         photo_spots = photo_spots or []
@@ -226,7 +229,8 @@ class GeminiLLMService:
                 photo_spots=photo_spots,
                 review_targets=intent.review_targets,
                 only_show_targets=True,
-                include_amenities=needs_amenities
+                include_amenities=needs_amenities,
+                nearby=nearby
             )
             
             # Build amenity-specific instructions if needed
@@ -263,7 +267,8 @@ class GeminiLLMService:
                 trails, things_to_do, events, campgrounds, visitor_centers, webcams, amenities, safety, weather, alerts,
                 photo_spots=photo_spots,
                 review_targets=intent.review_targets,
-                only_show_targets=True
+                only_show_targets=True,
+                nearby=nearby
             )
             prompt = f"""
             ROLE: Research Assistant.
@@ -295,7 +300,8 @@ class GeminiLLMService:
             data_context = self._build_data_context(
                 trails, things_to_do, events, campgrounds, visitor_centers, webcams, amenities, safety, weather, alerts,
                 photo_spots=photo_spots,
-                scenic_drives=scenic_drives
+                scenic_drives=scenic_drives,
+                nearby=nearby
             )
             history_text = "\n".join(chat_history[-5:]) if chat_history else "No previous history."
             
@@ -711,7 +717,8 @@ class GeminiLLMService:
         scenic_drives=None,
         review_targets: Optional[List[str]] = None,
         only_show_targets: bool = False,
-        include_amenities: bool = False
+        include_amenities: bool = False,
+        nearby: Optional[dict] = None
     ) -> str:
         alerts = alerts or []
         photo_spots = photo_spots or []
@@ -793,44 +800,9 @@ class GeminiLLMService:
             return "\n".join(lines)
 
         # --- Trail Formatter (with Images) ---
-        # Helper: Check if trail is affected by any alert (same logic as Trail Browser)
-        def get_trail_alert(trail_name: str):
-            """Check if trail name appears in any alert title/description using phrase matching."""
-            if not trail_name or not alerts:
-                return None
-            
-            import re
-            trail_lower = trail_name.lower()
-            raw_words = trail_lower.split()
-            clean_words = [re.sub(r'[^\w-]', '', w) for w in raw_words]
-            remove_words = {'trail', 'trails', 'trailhead', 'hike', 'path', 'the', 'and', 'to', 'of', 'at', 'a'}
-            words = [w for w in clean_words if w and w not in remove_words]
-            
-            search_phrases = []
-            for i, word in enumerate(words):
-                if len(word) > 2:
-                    search_phrases.append(word)
-                    if i + 1 < len(words):
-                        search_phrases.append(f"{word} {words[i+1]}")
-            
-            if not search_phrases:
-                return None
-            
-            for alert in alerts:
-                title = getattr(alert, 'title', '') or ''
-                desc = getattr(alert, 'description', '') or ''
-                combined = (title + ' ' + desc).lower()
-                
-                core_name = ' '.join(words)
-                alert_url = getattr(alert, 'url', None) or ''
-                if core_name and core_name in combined:
-                    return {"category": getattr(alert, 'category', 'Closure'), "title": title[:100], "url": alert_url}
-                
-                for phrase in search_phrases:
-                    if ' ' in phrase and phrase in combined:
-                        return {"category": getattr(alert, 'category', 'Closure'), "title": title[:100], "url": alert_url}
-            
-            return None
+        # Helper: Check if trail is affected by any alert (shared index, same logic as Trail Browser)
+        alert_index = get_alert_index(alerts)
+        get_trail_alert = alert_index.match
         
         def format_trail(t):
             is_target = review_targets and any(tgt.lower() in t.name.lower() for tgt in review_targets)
@@ -907,7 +879,8 @@ class GeminiLLMService:
         if only_show_targets and review_targets:
             logger.info(f"\ud83d\udd0d CONTEXT FILTER - Showing only targets: {review_targets}")
             logger.info(f"\ud83d\udd0d Input trails count: {len(trails)}")
-            trails = [t for t in trails if any(fuzzy_match_trail_name(tgt, t.name) for tgt in review_targets)]
+            target_names = TrailNameIndex([t.name for t in trails]).matching_names(review_targets)
+            trails = [t for t in trails if t.name in target_names]
             logger.info(f"\u2705 Filtered trails count: {len(trails)}")
             if trails:
                 logger.info(f"\ud83c\udfaf Filtered trail names: {[t.name for t in trails]}")
@@ -971,6 +944,13 @@ class GeminiLLMService:
         
         alerts_txt = "\n".join([format_alert(a) for a in alerts]) if alerts else "None"
 
+        def format_camp(x):
+            result = f"{link(x.name, getattr(x, 'url', None))} (Status: {x.isOpen})"
+            camp_alert = alert_index.match(x.name)
+            if camp_alert:
+                result += f" ⚠️ {camp_alert['category']}: {camp_alert['title']}"
+            return result
+
         return f"""
         === CURRENT CONDITIONS ===
         STATUS: {safe_status_display}
@@ -982,7 +962,7 @@ class GeminiLLMService:
         {fmt(trails, "Trail", format_trail)}
 
         CAMPGROUNDS:
-        {fmt(camps, "Campground", lambda x: f"{link(x.name, getattr(x, 'url', None))} (Status: {x.isOpen})")}
+        {fmt(camps, "Campground", format_camp)}
 
         VISITOR CENTERS:
         {fmt(centers, "Center", lambda x: link(x.name, getattr(x, 'url', None)))}
@@ -994,15 +974,27 @@ class GeminiLLMService:
         {fmt(events, "Event", format_event)}
         
         SCENIC DRIVES:
-        {self._format_scenic_drives(scenic_drives)}
+        {self._format_scenic_drives(scenic_drives, alert_index)}
         
         PHOTO SPOTS:
         {self._format_photo_spots(photo_spots)}
         
         AMENITIES (Nearby Services):
         {self._format_amenities(amenities)}
+        {self._format_nearby(nearby)}
         """
     
+    def _format_nearby(self, nearby) -> str:
+        """Format a spatial 'what's near X' lookup (distances precomputed by the orchestrator)."""
+        if not nearby:
+            return ""
+        header = f"NEARBY (within {nearby['radius_miles']} mi of {nearby['anchor']}, closest first):"
+        items = nearby.get("items", [])
+        if not items:
+            return f"{header}\n        Nothing found within that distance."
+        lines = [f"- {i['name']} ({i['kind']}) — {i['distance_miles']:.1f} mi" for i in items]
+        return header + "\n" + "\n".join(lines)
+    
     def _format_photo_spots(self, photo_spots) -> str:
         """Format photo spots for LLM context with images."""
         if not photo_spots:
@@ -1059,7 +1051,7 @@ class GeminiLLMService:
         
         return "\n".join(lines) if lines else "No photo spots available."
     
-    def _format_scenic_drives(self, scenic_drives) -> str:
+    def _format_scenic_drives(self, scenic_drives, alert_index=None) -> str:
         """Format scenic drives for LLM context with images."""
         if not scenic_drives:
             return "No scenic drives available."
@@ -1106,6 +1098,9 @@ class GeminiLLMService:
                     line += f" | {drive_time}"
                 if best_time:
                     line += f" | Best: {best_time}"
+                drive_alert = alert_index.match(name) if alert_index else None
+                if drive_alert:
+                    line += f" | ⚠️ {drive_alert['category']}: {drive_alert['title']}"
                 if description:
                     line += f"\n  {description[:200]}"
                 if highlights and len(highlights) > 0:
@@ -0,0 +1,266 @@
+"""
+OnboardingPipeline - Runs park onboarding as a graph of resumable stages.
+
+Each stage declares the stages it depends on and the files it produces.
+- A stage whose outputs already exist and are newer than its inputs is skipped
+  (that is its checkpoint), so a failed run resumes from the first incomplete stage.
+- An intermediate stage runs whenever a stage depending on it has to, so its
+  dependents are never rebuilt from stale intermediate files.
+- Stages whose dependencies are satisfied run in parallel on a thread pool
+  (the work is network bound: NPS, Serper, Firecrawl, Gemini).
+- A failed stage blocks only its dependents; independent branches keep going.
+- Per-stage status and timings are written to a state file and returned as a report.
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# Result value for stages whose outputs already existed (same marker ensure_park_data always used)
+ALREADY_EXISTS = "already_exists"
+
+
+class PipelineStage:
+    """
+    One unit of onboarding work.
+
+    Args:
+        name: Stage name, also the key in the status report
+        run: fn(progress_callback) -> result; raising marks the stage failed
+        outputs: Files the stage produces; all present == stage complete
+        depends_on: Names of stages that must complete first
+        inputs: Files the stage reads; an output older than any of them == stage out of date
+        summarize: Optional fn(result) -> dict for the status report
+        intermediate: Run exactly when a dependent stage needs to run, whether or not
+            its own outputs exist (e.g. trail candidates are only needed to (re)build trails)
+    """
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Optional[Callable[[int, int, str], None]]], Any],
+        outputs: List[str],
+        depends_on: Optional[List[str]] = None,
+        summarize: Optional[Callable[[Any], Dict[str, Any]]] = None,
+        intermediate: bool = False,
+        inputs: Optional[List[str]] = None
+    ):
+        self.name = name
+        self.run = run
+        self.outputs = outputs
+        self.depends_on = depends_on or []
+        self.summarize = summarize
+        self.intermediate = intermediate
+        self.inputs = inputs or []
+
+    def is_complete(self) -> bool:
+        return bool(self.outputs) and all(os.path.exists(path) for path in self.outputs)
+
+    def is_up_to_date(self) -> bool:
+        """Complete, and no existing input was modified after the oldest output."""
+        if not self.is_complete():
+            return False
+        oldest_output = min(os.path.getmtime(path) for path in self.outputs)
+        return all(os.path.getmtime(path) <= oldest_output for path in self.inputs if os.path.exists(path))
+
+
+class OnboardingPipeline:
+    """
+    Schedules PipelineStages by dependency, running ready stages concurrently.
+    """
+    def __init__(self, stages: List[PipelineStage], state_file: Optional[str] = None, max_workers: int = 4):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_file = state_file
+        self.max_workers = max(1, max_workers)
+
+        for stage in stages:
+            unknown = [dep for dep in stage.depends_on if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {unknown}")
+        self._order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order, visiting, visited = [], set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle at stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def plan(self) -> List[str]:
+        """Names of the stages that need to run, in dependency order."""
+        dependents: Dict[str, List[str]] = {name: [] for name in self.stages}
+        for stage in self.stages.values():
+            for dep in stage.depends_on:
+                dependents[dep].append(stage.name)
+
+        needed = set()
+        # Reverse order: a stage's dependents are decided before the stage itself
+        for name in reversed(self._order):
+            stage = self.stages[name]
+            if stage.intermediate:
+                if any(d in needed for d in dependents[name]):
+                    needed.add(name)
+            elif not stage.is_up_to_date():
+                needed.add(name)
+        return [name for name in self._order if name in needed]
+
+    def _load_state(self) -> Dict[str, Any]:
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable pipeline state {self.state_file}: {e}")
+            return {}
+
+    def _save_state(self, state: Dict[str, Any]):
+        if not self.state_file:
+            return
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        with open(self.state_file, "w") as f:
+            json.dump(state, f, indent=2)
+
+    def run(self, progress_callback: Callable[[int, int, str], None] = None) -> Dict[str, Any]:
+        """
+        Runs every stage that still needs to, in parallel where the graph allows.
+
+        Progress from stage threads is queued and reported from the calling thread,
+        so callbacks that touch UI state (Streamlit) stay on the script thread.
+
+        Returns:
+            {"operations": {stage: result}, "timings": {stage: seconds},
+             "elapsed_sec": float, "critical_path_sec": float}
+        """
+        start = time.monotonic()
+        to_run = self.plan()
+        total = len(to_run)
+        state = self._load_state()
+        events: "queue.Queue" = queue.Queue()
+
+        operations: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        for name in self._order:
+            if name not in to_run and self.stages[name].is_complete():
+                operations[name] = ALREADY_EXISTS
+
+        resumed_from = [name for name in to_run if state.get(name, {}).get("status") == "failed"]
+        if resumed_from:
+            logger.info(f"🔁 Resuming onboarding; retrying previously failed stage(s): {resumed_from}")
+
+        def report(message: str):
+            if progress_callback:
+                progress_callback(len(timings), total, message)
+
+        def drain():
+            while True:
+                try:
+                    name, message = events.get_nowait()
+                except queue.Empty:
+                    return
+                report(f"[{name}] {message}")
+
+        def execute(stage: PipelineStage):
+            def stage_progress(current, stage_total, message):
+                events.put((stage.name, message))
+
+            t0 = time.monotonic()
+            try:
+                return stage.run(stage_progress), None, time.monotonic() - t0
+            except Exception as e:
+                return None, e, time.monotonic() - t0
+
+        pending = list(to_run)
+        failed = set()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Launch every stage whose dependencies are complete; block those downstream of a failure
+                for name in list(pending):
+                    deps = self.stages[name].depends_on
+                    blocked = [d for d in deps if d in failed]
+                    if blocked:
+                        pending.remove(name)
+                        failed.add(name)
+                        operations[name] = {"error": f"skipped: dependency failed ({', '.join(blocked)})"}
+                        continue
+                    if all(d in timings or d not in to_run for d in deps):
+                        pending.remove(name)
+                        report(f"Starting {name}...")
+                        running[executor.submit(execute, self.stages[name])] = name
+
+                if not running:
+                    if pending:
+                        raise RuntimeError(f"Unschedulable stages: {pending}")
+                    continue
+
+                done, _ = wait(list(running), timeout=0.2, return_when=FIRST_COMPLETED)
+                drain()
+                for future in done:
+                    name = running.pop(future)
+                    stage = self.stages[name]
+                    result, error, duration = future.result()
+                    timings[name] = round(duration, 2)
+
+                    if error is None:
+                        operations[name] = stage.summarize(result) if stage.summarize else {"success": True}
+                        state[name] = {"status": "completed", "duration_sec": timings[name]}
+                        logger.info(f"✅ Stage {name} finished in {duration:.1f}s")
+                    else:
+                        failed.add(name)
+                        operations[name] = {"error": str(error)}
+                        state[name] = {"status": "failed", "duration_sec": timings[name], "error": str(error)}
+                        logger.error(f"❌ Stage {name} failed after {duration:.1f}s: {error}")
+                    state[name]["finished_at"] = datetime.now().isoformat()
+                    self._save_state(state)
+                    report(f"Finished {name} ({duration:.1f}s)")
+
+        elapsed = round(time.monotonic() - start, 2)
+        critical_path = self._critical_path(timings)
+        self._log_timing_report(timings, elapsed, critical_path)
+
+        return {
+            "operations": operations,
+            "timings": timings,
+            "elapsed_sec": elapsed,
+            "critical_path_sec": critical_path,
+        }
+
+    def _critical_path(self, timings: Dict[str, float]) -> float:
+        """Longest dependency chain through the stages that ran this time."""
+        finish: Dict[str, float] = {}
+        for name in self._order:
+            deps = [finish[d] for d in self.stages[name].depends_on if d in finish]
+            finish[name] = max(deps, default=0.0) + timings.get(name, 0.0)
+        return round(max(finish.values(), default=0.0), 2)
+
+    def _log_timing_report(self, timings: Dict[str, float], elapsed: float, critical_path: float):
+        if not timings:
+            logger.info("⏱️ Onboarding: all stages already complete")
+            return
+        lines = [f"   {name:<20} {seconds:>8.1f}s" for name, seconds in timings.items()]
+        logger.info(
+            "⏱️ Onboarding stage timings:\n" + "\n".join(lines) +
+            f"\n   {'total (sum)':<20} {sum(timings.values()):>8.1f}s"
+            f"\n   {'critical path':<20} {critical_path:>8.1f}s"
+            f"\n   {'wall clock':<20} {elapsed:>8.1f}s"
+        )
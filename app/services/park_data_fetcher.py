@@ -14,11 +14,16 @@ import logging
 from typing import Dict, List, Optional, Any, Callable
 
 from app.services.data_manager import DataManager
+from app.services.onboarding_pipeline import OnboardingPipeline, PipelineStage
+from app.utils.rate_limiter import throttle
 from app.clients.nps_client import NPSClient
 import requests
 
 logger = logging.getLogger(__name__)
 
+# Onboarding stages allowed to run at once (photo spots, drives and amenities don't wait on trails)
+ONBOARDING_WORKERS = int(os.getenv("ONBOARDING_WORKERS", "4"))
+
 
 class ParkDataFetcher:
     """
@@ -45,12 +50,13 @@ class ParkDataFetcher:
         "amenities_consolidated.json",  # Requires Serper API
     ]
     
-    def __init__(self, nps_client: NPSClient = None, data_manager: DataManager = None):
+    def __init__(self, nps_client: NPSClient = None, data_manager: DataManager = None, external_client=None):
         """
         Initialize with optional injected dependencies.
         """
         self.nps = nps_client
         self.data_manager = data_manager or DataManager()
+        self.external = external_client
     
     def has_basic_data(self, park_code: str) -> bool:
         """
@@ -234,6 +240,7 @@ class ParkDataFetcher:
         
         try:
             logger.info(f"🌐 Looking up elevations for {park_code} weather zones...")
+            throttle("elevation")
             response = requests.post(ELEVATION_API_URL, json={"locations": locations_payload}, timeout=30)
             response.raise_for_status()
             results = response.json().get("results", [])
@@ -362,11 +369,13 @@ class ParkDataFetcher:
     def refine_trails(
         self,
         park_code: str,
-        progress_callback: Callable[[int, int, str], None] = None
+        progress_callback: Callable[[int, int, str], None] = None,
+        full_refresh: bool = False
     ) -> List[Dict]:
         """
         Runs Gemini enrichment on raw trail candidates.
         Requires raw_trails.json to exist in nps/raw/PARK/.
+        Only new/changed candidates are sent to Gemini unless full_refresh=True.
         
         Returns:
             List of enriched trail dictionaries
@@ -376,7 +385,7 @@ class ParkDataFetcher:
         
         from scripts.refine_trails_with_gemini import refine_trails
         
-        return refine_trails(park_code, progress_callback)
+        return refine_trails(park_code, progress_callback, full_refresh=full_refresh)
     
     def fetch_rankings(
         self,
@@ -438,8 +447,8 @@ class ParkDataFetcher:
         progress_callback: Callable[[int, int, str], None] = None
     ) -> Dict[str, Any]:
         """
-        Fetches amenities (gas, restaurants, etc.) near park entrances using Serper API,
-        then consolidates them.
+        Fetches amenities (gas, restaurants, etc.) near park entrances using Serper API;
+        the fetch also writes the consolidated amenities file.
         
         Returns:
             Consolidated amenities data
@@ -448,35 +457,110 @@ class ParkDataFetcher:
         sys.path.insert(0, '.')
         
         from scripts.admin_fetch_amenities import fetch_amenities_for_park
-        from scripts.refine_amenities import refine_amenities_for_park
         
         park_code = park_code.upper()
         
-        # Step 1: Fetch raw amenities from Serper/Google Maps
         if progress_callback:
-            progress_callback(0, 2, "Searching for nearby amenities...")
+            progress_callback(0, 1, "Searching for nearby amenities...")
         
         result = fetch_amenities_for_park(
             park_code,
             nps_client=self.nps,
+            external_client=self.external,
             data_manager=self.data_manager,
             progress_callback=progress_callback
         )
         
-        # Step 2: Consolidate amenities
         if progress_callback:
-            progress_callback(1, 2, "Consolidating amenity data...")
+            progress_callback(1, 1, f"Found amenities for {len(result.get('hubs', {}))} hubs")
         
-        try:
-            consolidated = refine_amenities_for_park(park_code)
-        except FileNotFoundError:
-            # If no amenity files exist, return the raw result
-            consolidated = result
+        # No entrances -> nothing consolidated; return the (empty) raw result
+        return result.get("consolidated", result)
+    
+    def _fixture_path(self, park_code: str, filename: str) -> str:
+        return os.path.join(self.data_manager.base_dir, park_code.upper(), filename)
+    
+    def build_onboarding_stages(
+        self,
+        park_code: str,
+        include_trails: bool = True,
+        include_rankings: bool = True,
+        include_photo_spots: bool = True,
+        include_scenic_drives: bool = True,
+        include_amenities: bool = True
+    ) -> List[PipelineStage]:
+        """
+        Declares the onboarding stage graph for a park.
         
-        if progress_callback:
-            progress_callback(2, 2, f"Found amenities for {len(result.get('hubs', {}))} hubs")
+        nps_data ─► trail_candidates ─► trails ─► rankings
+        photo_spots, scenic_drives, amenities (independent; they query their own sources)
+        """
+        park_code = park_code.upper()
+        raw_dir = f"data_samples/nps/raw/{park_code}"
+        
+        stages = [
+            PipelineStage(
+                "nps_data",
+                run=lambda cb: self.fetch_nps_static_data(park_code, cb),
+                outputs=[self._fixture_path(park_code, f) for f in self.REQUIRED_FIXTURES],
+                summarize=lambda result: result
+            )
+        ]
+        
+        if include_trails:
+            stages += [
+                PipelineStage(
+                    "trail_candidates",
+                    run=lambda cb: self.fetch_and_classify_trails(park_code, cb),
+                    outputs=[f"{raw_dir}/raw_trails.json"],
+                    depends_on=["nps_data"],
+                    intermediate=True
+                ),
+                PipelineStage(
+                    "trails",
+                    run=lambda cb: self.refine_trails(park_code, cb),
+                    outputs=[self._fixture_path(park_code, "trails_v2.json")],
+                    depends_on=["trail_candidates"],
+                    inputs=[f"{raw_dir}/raw_trails.json"],
+                    summarize=lambda trails: {"count": len(trails)}
+                ),
+            ]
+        
+        if include_rankings:
+            stages.append(PipelineStage(
+                "rankings",
+                run=lambda cb: self.fetch_rankings(park_code, cb),
+                outputs=[self._fixture_path(park_code, "rankings.json")],
+                # Rankings are merged into trails_v2.json
+                depends_on=["trails"] if include_trails else [],
+                summarize=lambda count: {"count": count}
+            ))
+        
+        if include_photo_spots:
+            stages.append(PipelineStage(
+                "photo_spots",
+                run=lambda cb: self.fetch_photo_spots(park_code, cb),
+                outputs=[self._fixture_path(park_code, "photo_spots.json")],
+                summarize=lambda spots: {"count": len(spots)}
+            ))
         
-        return consolidated
+        if include_scenic_drives:
+            stages.append(PipelineStage(
+                "scenic_drives",
+                run=lambda cb: self.fetch_scenic_drives(park_code, cb),
+                outputs=[self._fixture_path(park_code, "scenic_drives.json")],
+                summarize=lambda drives: {"count": len(drives)}
+            ))
+        
+        if include_amenities:
+            stages.append(PipelineStage(
+                "amenities",
+                run=lambda cb: self.fetch_amenities(park_code, cb),
+                outputs=[self._fixture_path(park_code, "amenities_consolidated.json")],
+                summarize=lambda amenities: {"hubs": len(amenities.get("hubs", {}))}
+            ))
+        
+        return stages
     
     def ensure_park_data(
         self,
@@ -486,12 +570,17 @@ class ParkDataFetcher:
         include_photo_spots: bool = True,
         include_scenic_drives: bool = True,
         include_amenities: bool = True,
-        progress_callback: Callable[[int, int, str], None] = None
+        progress_callback: Callable[[int, int, str], None] = None,
+        max_workers: int = ONBOARDING_WORKERS
     ) -> Dict[str, Any]:
         """
         Main entry point: Ensures all required data exists for a park.
         Fetches and refines missing data as needed.
         
+        Runs the stage graph from build_onboarding_stages: stages whose fixtures exist
+        are skipped, independent stages run in parallel, and a failure only blocks
+        the stages downstream of it, so re-running resumes where it stopped.
+        
         Args:
             park_code: The park code (e.g., "BRCA")
             include_trails: Whether to include trail enrichment (slow)
@@ -500,113 +589,30 @@ class ParkDataFetcher:
             include_scenic_drives: Whether to include scenic drives (expensive)
             include_amenities: Whether to include amenities (requires pre-fetch)
             progress_callback: Optional callback(current, total, message)
+            max_workers: Maximum number of stages running at once
             
         Returns:
-            Dict with status of each operation
+            Dict with status of each operation, plus per-stage timings
         """
         park_code = park_code.upper()
-        status = {"park_code": park_code, "operations": {}}
-        
-        # Step 1: NPS Static Data - Fetch if ANY required fixture is missing
-        missing_required = [f for f in self.REQUIRED_FIXTURES 
-                          if not self.data_manager.has_fixture(park_code, f)]
         
-        if missing_required:
-            if progress_callback:
-                progress_callback(0, 4, f"Fetching NPS data (missing: {', '.join(missing_required)})...")
-            try:
-                result = self.fetch_nps_static_data(park_code, progress_callback)
-                status["operations"]["nps_data"] = result
-                logger.info(f"📦 Fetched missing fixtures for {park_code}: {missing_required}")
-            except Exception as e:
-                status["operations"]["nps_data"] = {"error": str(e)}
-                logger.error(f"NPS data fetch failed: {e}")
-        else:
-            status["operations"]["nps_data"] = "already_exists"
+        stages = self.build_onboarding_stages(
+            park_code,
+            include_trails=include_trails,
+            include_rankings=include_rankings,
+            include_photo_spots=include_photo_spots,
+            include_scenic_drives=include_scenic_drives,
+            include_amenities=include_amenities
+        )
+        pipeline = OnboardingPipeline(
+            stages,
+            state_file=f"data_samples/nps/raw/{park_code}/onboarding_state.json",
+            max_workers=max_workers
+        )
         
-        # Step 2: Trail classification and refinement
-        if include_trails:
-            if not self.data_manager.has_fixture(park_code, "trails_v2.json"):
-                # Pre-check: Ensure places.json exists (critical for trail classification)
-                if not self.data_manager.has_fixture(park_code, "places.json"):
-                    logger.warning(f"⚠️ places.json missing for {park_code}, fetching before trail classification...")
-                    try:
-                        places = self.nps.get_places(park_code)
-                        if places:
-                            self.data_manager.save_fixture(park_code, "places.json", places)
-                            logger.info(f"✅ Fetched places.json for {park_code}")
-                    except Exception as e:
-                        logger.error(f"Failed to fetch places.json: {e}")
-                
-                if progress_callback:
-                    progress_callback(1, 4, "Processing trails...")
-                try:
-                    self.fetch_and_classify_trails(park_code, progress_callback)
-                    trails = self.refine_trails(park_code, progress_callback)
-                    status["operations"]["trails"] = {"count": len(trails)}
-                except Exception as e:
-                    status["operations"]["trails"] = {"error": str(e)}
-                    logger.error(f"Trail processing failed: {e}")
-            else:
-                status["operations"]["trails"] = "already_exists"
-        
-        # Step 3: AllTrails rankings
-        if include_rankings:
-            if not self.data_manager.has_fixture(park_code, "rankings.json"):
-                if progress_callback:
-                    progress_callback(2, 4, "Fetching AllTrails rankings...")
-                try:
-                    count = self.fetch_rankings(park_code, progress_callback)
-                    status["operations"]["rankings"] = {"count": count}
-                except Exception as e:
-                    status["operations"]["rankings"] = {"error": str(e)}
-                    logger.error(f"Rankings fetch failed: {e}")
-            else:
-                status["operations"]["rankings"] = "already_exists"
-        
-        # Step 4: Photo spots (optional)
-        if include_photo_spots:
-            if not self.data_manager.has_fixture(park_code, "photo_spots.json"):
-                if progress_callback:
-                    progress_callback(3, 4, "Fetching photo spots...")
-                try:
-                    spots = self.fetch_photo_spots(park_code, progress_callback)
-                    status["operations"]["photo_spots"] = {"count": len(spots)}
-                except Exception as e:
-                    status["operations"]["photo_spots"] = {"error": str(e)}
-                    logger.error(f"Photo spots fetch failed: {e}")
-            else:
-                status["operations"]["photo_spots"] = "already_exists"
-        
-        # Step 5: Scenic drives (optional)
-        if include_scenic_drives:
-            if not self.data_manager.has_fixture(park_code, "scenic_drives.json"):
-                if progress_callback:
-                    progress_callback(4, 6, "Fetching scenic drives...")
-                try:
-                    drives = self.fetch_scenic_drives(park_code, progress_callback)
-                    status["operations"]["scenic_drives"] = {"count": len(drives)}
-                except Exception as e:
-                    status["operations"]["scenic_drives"] = {"error": str(e)}
-                    logger.error(f"Scenic drives fetch failed: {e}")
-            else:
-                status["operations"]["scenic_drives"] = "already_exists"
-        
-        # Step 6: Amenities
-        if include_amenities:
-            if not self.data_manager.has_fixture(park_code, "amenities_consolidated.json"):
-                if progress_callback:
-                    progress_callback(5, 6, "Fetching nearby amenities...")
-                try:
-                    amenities = self.fetch_amenities(park_code, progress_callback)
-                    status["operations"]["amenities"] = {"hubs": len(amenities.get("hubs", {}))}
-                except Exception as e:
-                    status["operations"]["amenities"] = {"error": str(e)}
-                    logger.error(f"Amenities fetch failed: {e}")
-            else:
-                status["operations"]["amenities"] = "already_exists"
+        report = pipeline.run(progress_callback)
         
         if progress_callback:
-            progress_callback(6, 6, "Data setup complete!")
+            progress_callback(1, 1, "Data setup complete!")
         
-        return status
+        return {"park_code": park_code, **report}
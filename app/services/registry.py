@@ -0,0 +1,127 @@
+import os
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from app.services.data_manager import DataManager
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """
+    Process-wide container for the app's long-lived services.
+
+    Each service (API clients with their pooled HTTP sessions, the DataManager,
+    fetchers, the orchestrator) is built on first use and then shared by the
+    Streamlit app, data-access helpers, background job workers and scripts.
+    Clients whose API key is missing resolve to None instead of raising.
+    """
+    def __init__(self, base_dir: str = "data_samples/ui_fixtures", overrides: Optional[Dict[str, Any]] = None):
+        self.base_dir = base_dir
+        self._services: Dict[str, Any] = dict(overrides or {})
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if name not in self._services:
+                self._services[name] = factory()
+            return self._services[name]
+
+    def register(self, name: str, service: Any) -> None:
+        """Installs (or replaces) a service instance, e.g. a mock in tests."""
+        with self._lock:
+            self._services[name] = service
+
+    def reset(self) -> None:
+        """Drops every service; the next access builds fresh ones."""
+        with self._lock:
+            self._services.clear()
+
+    @staticmethod
+    def _optional(name: str, factory: Callable[[], Any]) -> Optional[Any]:
+        try:
+            return factory()
+        except ValueError as e:
+            logger.warning(f"⚠️ {name} unavailable: {e}")
+            return None
+
+    # --- Services ---
+
+    @property
+    def data_manager(self) -> DataManager:
+        return self._get("data_manager", lambda: DataManager(base_dir=self.base_dir))
+
+    @property
+    def nps_client(self):
+        from app.clients.nps_client import NPSClient
+        return self._get("nps_client", lambda: self._optional("NPS client", NPSClient))
+
+    @property
+    def weather_client(self):
+        from app.clients.weather_client import WeatherClient
+        return self._get("weather_client", lambda: self._optional("Weather client", WeatherClient))
+
+    @property
+    def external_client(self):
+        from app.clients.external_client import ExternalClient
+        return self._get("external_client", ExternalClient)
+
+    @property
+    def llm_service(self):
+        from app.services.llm_service import GeminiLLMService
+        return self._get("llm_service", lambda: self._optional(
+            "Gemini", lambda: GeminiLLMService(api_key=os.getenv("GEMINI_API_KEY"))
+        ))
+
+    @property
+    def park_fetcher(self):
+        from app.services.park_data_fetcher import ParkDataFetcher
+        return self._get("park_fetcher", lambda: ParkDataFetcher(
+            nps_client=self.nps_client, data_manager=self.data_manager, external_client=self.external_client
+        ))
+
+    @property
+    def review_scraper(self):
+        from app.services.review_scraper import ReviewScraper
+        return self._get("review_scraper", lambda: ReviewScraper(self.llm_service, data_manager=self.data_manager))
+
+    @property
+    def orchestrator(self):
+        """The chat orchestrator, or None if the NPS, Gemini or Weather client is unavailable."""
+        from app.orchestrator import OutdoorConciergeOrchestrator
+
+        def build():
+            if not (self.llm_service and self.nps_client and self.weather_client):
+                return None
+            return OutdoorConciergeOrchestrator(
+                llm_service=self.llm_service,
+                nps_client=self.nps_client,
+                weather_client=self.weather_client,
+                external_client=self.external_client,
+                data_manager=self.data_manager,
+                review_scraper=self.review_scraper,
+                park_fetcher=self.park_fetcher
+            )
+        return self._get("orchestrator", build)
+
+
+_registry: Optional[ServiceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_services() -> ServiceRegistry:
+    """The process's ServiceRegistry (created on first call)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ServiceRegistry()
+    return _registry
+
+
+def set_services(registry: Optional[ServiceRegistry]) -> None:
+    """Replaces the process's registry (None = build a new one on next use)."""
+    global _registry
+    with _registry_lock:
+        _registry = registry
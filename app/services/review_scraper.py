@@ -19,13 +19,14 @@ except ImportError as e:
 from app.services.llm_service import GeminiLLMService
 from app.services.data_manager import DataManager
 from app.models import TrailReview
+from app.adapters.alltrails_adapter import parse_review_markdown
 
 logger = logging.getLogger(__name__)
 
 class ReviewScraper:
-    def __init__(self, llm_service: GeminiLLMService):
+    def __init__(self, llm_service: GeminiLLMService, data_manager: Optional[DataManager] = None):
         self.llm = llm_service
-        self.data_manager = DataManager()
+        self.data_manager = data_manager or DataManager()
         self.api_key = os.getenv("FIRECRAWL_API_KEY")
         if not self.api_key:
             logger.warning("FIRECRAWL_API_KEY not found. Scraping will be disabled.")
@@ -46,23 +47,23 @@ class ReviewScraper:
             return []
 
         # 2. Find target trail (fuzzy match name)
-        from app.utils.fuzzy_match import fuzzy_match_trail_name
+        from app.utils.fuzzy_match import TrailNameIndex
         target_trail = None
-        trail_name_lower = trail_name.lower()
+        name_index = TrailNameIndex(trails_data)
         
-        # Try exact match first
-        for t in trails_data:
-            if t.get("name", "").lower() == trail_name_lower:
-                target_trail = t
-                break
+        # Try the normalized name index first (exact key, then a trail whose name contains the query)
+        found = name_index.match(trail_name, min_score=0.5, query_within=True)
+        if found:
+            target_trail = found.item
+            if found.kind != "exact":
+                logger.info(f"Matched '{trail_name}' to '{found.name}' (score {found.score:.2f})")
         
-        # Try fuzzy match if not found
+        # Try fuzzy match if not found (all significant words, closest name first)
         if not target_trail:
-            for t in trails_data:
-                if fuzzy_match_trail_name(trail_name, t.get("name", "")):
-                    target_trail = t
-                    logger.info(f"Fuzzy matched '{trail_name}' to '{t.get('name')}'")
-                    break
+            fuzzy = name_index.search(trail_name, limit=1)
+            if fuzzy:
+                target_trail = fuzzy[0].item
+                logger.info(f"Fuzzy matched '{trail_name}' to '{fuzzy[0].name}'")
         
         if not target_trail:
             logger.warning(f"Trail '{trail_name}' not found in local DB.")
@@ -157,9 +158,16 @@ class ReviewScraper:
                     return [TrailReview(**r) for r in target_trail["recent_reviews"]]
                  return []
 
-             # 5. Extract
-             logger.info("🧠 Extracting reviews with Gemini...")
-             reviews = self.llm.extract_reviews_from_text(markdown)
+             # 5. Extract: parse the page's review blocks directly; only hand the
+             #    review section (not the whole page) to Gemini if that fails
+             page = parse_review_markdown(markdown)
+             if page["complete"]:
+                 reviews = page["reviews"]
+                 logger.info(f"📝 Parsed {len(reviews)} reviews from page structure (no LLM)")
+             else:
+                 text = page["section"] or markdown
+                 logger.info(f"🧠 Extracting reviews with Gemini ({len(text):,} of {len(markdown):,} chars)...")
+                 reviews = self.llm.extract_reviews_from_text(text)
              
              if reviews:
                  logger.info(f"✅ Found {len(reviews)} reviews. updating cache.")
@@ -168,8 +176,11 @@ class ReviewScraper:
                  target_trail["reviews_last_updated"] = datetime.now().isoformat()
                  target_trail["last_enriched"] = datetime.now().isoformat()
 
-                 # 7. Recalculate Stats (Rating/Count)
-                 if reviews:
+                 # 7. Stats (Rating/Count): the page header's, else recalculated
+                 if page["average_rating"] is not None:
+                     target_trail["average_rating"] = page["average_rating"]
+                     target_trail["total_reviews"] = page["total_reviews"]
+                 elif reviews:
                      avg_rating = sum(r.rating for r in reviews) / len(reviews)
                      target_trail["average_rating"] = round(avg_rating, 1)
                      target_trail["total_reviews"] = len(reviews) 
@@ -3,7 +3,9 @@ import streamlit as st
 from typing import Optional, Dict, List, Any
 from datetime import datetime
 
-from app.services.data_manager import DataManager
+from app.services.registry import get_services
+from app.engine.event_index import EventIndex
+from app.utils.alert_matcher import get_alert_matches
 from app.models import (
     ParkContext, Campground, VisitorCenter, Webcam, 
     Place, ThingToDo, PassportStamp, Alert, Event, 
@@ -11,13 +13,82 @@ from app.models import (
 )
 
 logger = logging.getLogger(__name__)
-data_manager = DataManager()
+
+# Per-park generation, bumped by invalidate_park_data() to force a reload even when
+# the files on disk look unchanged (st.cache_data is shared by every session)
+_cache_generations: Dict[str, int] = {}
+
+# (park, day) -> (daily cache signature after the volatile loader's own writes, signature
+# it was cached under), so a cold-day load that fills the daily cache isn't repeated
+_settled_daily_signatures: Dict[tuple, tuple] = {}
+
+
+class _IncompleteVolatileData(Exception):
+    """
+    Raised out of the cached volatile loader when a fetch failed, so st.cache_data doesn't
+    keep the partial result; carries it for the current rerun.
+    """
+    def __init__(self, result: Dict[str, Any], failed: List[str]):
+        super().__init__(f"Volatile data fetch failed: {', '.join(failed)}")
+        self.result = result
+        self.failed = failed
+
+
+def _empty_volatile_data() -> Dict[str, Any]:
+    return {"weather": None, "zone_weather": None, "alerts": [], "alert_matches": {}, "events": [], "event_index": None}
+
+
+def invalidate_park_data(park_code: Optional[str] = None):
+    """
+    Drops cached static/volatile data for one park (or every park), e.g. after a fetch.
+    """
+    if park_code is None:
+        _load_park_static_data.clear()
+        _load_volatile_data.clear()
+        return
+    key = park_code.upper()
+    _cache_generations[key] = _cache_generations.get(key, 0) + 1
+
+
+def park_data_versions(park_code: str) -> Dict[str, Any]:
+    """
+    Cheap version stamps for cache keys of derived views:
+    {"fixtures": ..., "trails": ..., "weather": ..., "alerts": ...} from file mtimes/sizes.
+    """
+    data_manager = get_services().data_manager
+    fixtures_signature = data_manager.fixtures_signature(park_code)
+    fixtures = {name: (mtime, size) for name, mtime, size in fixtures_signature}
+    daily = {name: (mtime, size) for name, mtime, size in data_manager.daily_cache_signature(park_code)}
+    generation = _cache_generations.get(park_code.upper(), 0)
+    return {
+        "fixtures": (fixtures_signature, generation),
+        "trails": (fixtures.get("trails_v2.json"), fixtures.get("park_details.json"), generation),
+        "weather": (daily.get("zone_weather.json"), datetime.now().strftime("%Y-%m-%d")),
+        "alerts": (daily.get("alerts.json"), daily.get("alert_matches.json")),
+    }
+
 
 def get_park_static_data(park_code: str, nps_client=None) -> Dict[str, Any]:
     """
     Loads all static fixture data for a park from disk.
     If park_details.json doesn't exist and nps_client is provided, fetches from NPS API.
+
+    Cached across reruns and sessions; a rerun costs one directory listing unless the
+    park's fixture files changed or invalidate_park_data() was called.
     """
+    data_manager = get_services().data_manager
+    return _load_park_static_data(
+        park_code,
+        data_manager.fixtures_signature(park_code),
+        _cache_generations.get(park_code.upper(), 0),
+        _nps_client=nps_client
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _load_park_static_data(park_code: str, fixtures_version: tuple, generation: int, _nps_client=None) -> Dict[str, Any]:
+    data_manager = get_services().data_manager
+    nps_client = _nps_client
     result = {
         "park_details": None, "campgrounds": [], "visitor_centers": [],
         "webcams": [], "places": [], "things_to_do": [],
@@ -75,11 +146,46 @@ def get_volatile_data(park_code: str, orchestrator) -> Dict[str, Any]:
     """
     Loads volatile data (weather, alerts, events) using daily disk cache.
     Falls back to API fetch if cache miss, then saves to disk for the day.
+
+    Cached in memory per park and day, keyed by today's cache files and the park's fixtures.
+    The files the loader writes itself (a cold day's fetches) don't count as a change.
+    Results with a failed fetch are returned but not cached.
     """
     if not orchestrator:
-        return {"weather": None, "zone_weather": None, "alerts": [], "events": []}
+        return _empty_volatile_data()
     
-    result = {"weather": None, "zone_weather": None, "alerts": [], "events": []}
+    data_manager = get_services().data_manager
+    day = datetime.now().strftime("%Y-%m-%d")
+    signature = data_manager.daily_cache_signature(park_code)
+    settled = _settled_daily_signatures.get((park_code.upper(), day))
+    if settled and settled[0] == signature:
+        signature = settled[1]
+
+    try:
+        result = _load_volatile_data(
+            park_code,
+            day,
+            signature,
+            data_manager.fixtures_signature(park_code),
+            _cache_generations.get(park_code.upper(), 0),
+            _orchestrator=orchestrator
+        )
+    except _IncompleteVolatileData as e:
+        # Not cached or settled: the next rerun retries the failed fetches
+        logger.warning(f"Not caching volatile data for {park_code}: {e}")
+        return e.result
+    if result.get("_daily_signature", signature) != signature:
+        _settled_daily_signatures[(park_code.upper(), day)] = (result["_daily_signature"], signature)
+    return result
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _load_volatile_data(park_code: str, day: str, cache_version: tuple, fixtures_version: tuple,
+                        generation: int, _orchestrator=None) -> Dict[str, Any]:
+    data_manager = get_services().data_manager
+    orchestrator = _orchestrator
+    result = _empty_volatile_data()
+    failed = []
     
     # Get static data for park location and zone config
     park_data = get_park_static_data(park_code, nps_client=orchestrator.nps if hasattr(orchestrator, 'nps') else None)
@@ -99,10 +205,7 @@ def get_volatile_data(park_code: str, orchestrator) -> Dict[str, Any]:
         else:
             # Fetch weather for all zones
             try:
-                # Instantiate fresh client to bypass cached orchestrator instance
-                from app.clients.weather_client import WeatherClient
-                wc = WeatherClient() 
-                zone_data = wc.get_zonal_forecasts(
+                zone_data = orchestrator.weather.get_zonal_forecasts(
                     park_code, weather_zones, base_zone_name
                 )
                 if zone_data:
@@ -119,6 +222,7 @@ def get_volatile_data(park_code: str, orchestrator) -> Dict[str, Any]:
                     logger.info(f"Fetched zonal weather for {park_code}: {list(zone_data.keys())}")
             except Exception as e:
                 logger.error(f"Zonal weather fetch failed for {park_code}: {e}")
+                failed.append("zone_weather")
     
     # --- Regular Weather (fallback or if no zones) ---
     weather = data_manager.load_daily_cache(park_code, "weather")
@@ -132,8 +236,10 @@ def get_volatile_data(park_code: str, orchestrator) -> Dict[str, Any]:
             data_manager.save_daily_cache(park_code, "weather", w.model_dump() if hasattr(w, 'model_dump') else w)
         except Exception as e:
             logger.error(f"Weather fetch failed: {e}")
+            failed.append("weather")
 
     # --- Alerts ---
+    alerts_refreshed = False
     alerts = data_manager.load_daily_cache(park_code, "alerts")
     if alerts:
         # Convert cached dicts to Alert objects
@@ -149,35 +255,47 @@ def get_volatile_data(park_code: str, orchestrator) -> Dict[str, Any]:
             result["alerts"] = a
             # Serialize list of Pydantic models
             data_manager.save_daily_cache(park_code, "alerts", [item.model_dump() if hasattr(item, 'model_dump') else item for item in a])
+            alerts_refreshed = True
         except Exception as e:
             logger.error(f"Alerts fetch failed: {e}")
+            failed.append("alerts")
+
+    # --- Alert Matches (trails/drives/campgrounds named in alerts, cached next to the alerts) ---
+    try:
+        result["alert_matches"] = get_alert_matches(park_code, result["alerts"], data_manager, refresh=alerts_refreshed)
+    except Exception as e:
+        logger.error(f"Alert matching failed for {park_code}: {e}")
 
-    # --- Events ---
+    # --- Events (recurring instances merged, cached with their calendar index) ---
     events = data_manager.load_daily_cache(park_code, "events")
     if events:
-        # Convert cached dicts to Event objects
-        from app.models import Event as EventModel
-        try:
-            result["events"] = [EventModel(**e) if isinstance(e, dict) else e for e in events]
-        except Exception as parse_err:
-            logger.warning(f"Failed to parse cached events: {parse_err}")
-            result["events"] = events  # Fallback to raw dicts
+        # Cached dicts -> deduplicated Event objects
+        result["event_index"] = EventIndex(events)
+        result["events"] = result["event_index"].events
     else:
         try:
-            e = orchestrator.nps.get_events(park_code)
-            result["events"] = e
-            # Serialize list of Pydantic models
-            data_manager.save_daily_cache(park_code, "events", [item.model_dump() if hasattr(item, 'model_dump') else item for item in e])
+            result["event_index"] = EventIndex(orchestrator.nps.get_events(park_code))
+            result["events"] = result["event_index"].events
+            data_manager.save_daily_cache(park_code, "events", [item.model_dump() for item in result["events"]])
         except Exception as e:
             logger.error(f"Events fetch failed: {e}")
-        
+            failed.append("events")
+
+    if failed:
+        raise _IncompleteVolatileData(result, failed)
+
+    # Daily cache version after this load's own writes (see get_volatile_data)
+    result["_daily_signature"] = data_manager.daily_cache_signature(park_code)
     return result
 
 def clear_volatile_cache():
     """
-    Clears daily cache for today for all parks.
+    Clears daily cache for today for all parks (on disk and in memory).
     This forces a re-fetch from APIs on next load.
     """
+    _load_volatile_data.clear()
+    _settled_daily_signatures.clear()
+
     import os
     import shutil
     from datetime import datetime
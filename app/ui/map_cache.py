@@ -0,0 +1,109 @@
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import folium
+from folium.plugins import MarkerCluster
+from folium.utilities import JsCode
+import streamlit as st
+import streamlit.components.v1 as components
+
+from app.engine.map_layers import feature_collection
+from app.services.registry import get_services
+
+logger = logging.getLogger(__name__)
+
+# Layers with more markers than this are clustered
+CLUSTER_THRESHOLD = 25
+
+# Popups/tooltips come precomputed in each feature's properties
+BIND_FEATURE_POPUP = JsCode("""
+function(feature, layer) {
+    layer.bindPopup(feature.properties.popup, {maxWidth: 200});
+    layer.bindTooltip(feature.properties.tooltip);
+}
+""")
+
+
+def map_version(version: Any) -> str:
+    """Short, file-safe digest of a data version (any repr-stable value)."""
+    return hashlib.sha1(repr(version).encode("utf-8")).hexdigest()[:12]
+
+
+def marker_layer(name: str, marker_count: int, show: bool = True):
+    """
+    A toggleable map layer: a MarkerCluster for dense categories, else a plain FeatureGroup.
+    """
+    if marker_count > CLUSTER_THRESHOLD:
+        return MarkerCluster(name=name, show=show, options={"disableClusteringAtZoom": 15})
+    return folium.FeatureGroup(name=name, show=show)
+
+
+def add_geojson_markers(parent, collection: Dict[str, Any]):
+    """
+    Adds a FeatureCollection of points (app.engine.map_layers properties) to a layer:
+    one folium.GeoJson per (color, icon) instead of a folium.Marker per point.
+    """
+    styles: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for feature in collection.get("features", []):
+        props = feature["properties"]
+        styles.setdefault((props["color"], props["icon"]), []).append(feature)
+
+    for (color, icon), features in styles.items():
+        folium.GeoJson(
+            feature_collection(features),
+            marker=folium.Marker(icon=folium.Icon(color=color, icon=icon, prefix='fa')),
+            on_each_feature=BIND_FEATURE_POPUP,
+            control=False
+        ).add_to(parent)
+    return parent
+
+
+def render_map_page(m: Optional[folium.Map]) -> Optional[str]:
+    """Full standalone HTML page for a Folium map."""
+    if m is None:
+        return None
+    return m.get_root().render()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def get_map_html(
+    park_code: str,
+    name: str,
+    version: Any,
+    persist: bool = True,
+    _build: Callable[[], Optional[folium.Map]] = None
+) -> Optional[str]:
+    """
+    Pre-rendered map HTML, built once per (park, map, data version).
+
+    Held in memory by st.cache_data and, when persist is set, on disk under
+    data_cache/[PARK]/maps/ so a restart reuses it too. _build is only called on a
+    miss and is not hashed.
+
+    Args:
+        park_code: Park the map belongs to
+        name: Map name (one cached file per park and name)
+        version: Data version stamp(s) the map was built from
+        persist: Also keep the page on disk (off for short-lived filter variants)
+        _build: Returns the folium.Map (or None when there is nothing to show)
+    """
+    data_manager = get_services().data_manager
+    digest = map_version(version)
+
+    html = data_manager.load_map_html(park_code, name, digest) if persist else None
+    if html is not None:
+        return html
+
+    html = render_map_page(_build() if _build else None)
+    if html is None:
+        return None
+    if persist:
+        data_manager.save_map_html(park_code, name, digest, html)
+    logger.info(f"🗺️ Rendered {name} map for {park_code} ({len(html) // 1024} KB)")
+    return html
+
+
+def show_map_html(html: str, height: int = 500):
+    """Displays pre-rendered map HTML (layer toggles run in the browser, no Python round trip)."""
+    components.html(html, height=height)
@@ -0,0 +1,171 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app.adapters.weather_adapter import get_trail_weather
+from app.engine.map_layers import get_layer_key
+from app.models import ZonalForecast
+from app.utils.alert_matcher import get_alert_index
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTY_ORDER = ["Easy", "Moderate", "Strenuous", "Unknown"]
+
+
+def _typed_zone_weather(zone_weather: Optional[Dict[str, Any]]) -> Dict[str, ZonalForecast]:
+    """Cached zone weather dicts -> ZonalForecast objects (once per build, not per trail)."""
+    typed = {}
+    for name, forecast in (zone_weather or {}).items():
+        if isinstance(forecast, dict):
+            try:
+                typed[name] = ZonalForecast(**forecast)
+            except Exception:
+                continue
+        else:
+            typed[name] = forecast
+    return typed
+
+
+def build_trail_frame(
+    trails: Sequence[Any],
+    zone_weather: Optional[Dict[str, Any]] = None,
+    base_zone_name: Optional[str] = None,
+    alerts: Optional[List[Any]] = None,
+    alert_matches: Optional[Dict[str, Any]] = None
+) -> pd.DataFrame:
+    """
+    One row per trail with everything the Trails Browser shows: metrics, links, image,
+    accessibility flags, the weather badge and the matching alert.
+
+    Args:
+        trails: trails_v2.json records (dicts or TrailSummary)
+        zone_weather: {zone_name: ZonalForecast or dict} from the daily cache
+        base_zone_name: Zone used for trails without their own
+        alerts: Park alerts (used only when alert_matches is None)
+        alert_matches: Precomputed {trail_name: alert} cached with the alerts
+    """
+    typed_weather = _typed_zone_weather(zone_weather)
+    alert_index = get_alert_index(alerts or []) if alert_matches is None else None
+    weather_by_zone: Dict[Any, Optional[Dict[str, Any]]] = {}
+
+    rows = []
+    for t in trails:
+        item = t if isinstance(t, dict) else t.model_dump()
+
+        # Extract Lat/Lon safely
+        lat, lon = None, None
+        loc = item.get("location")
+        if loc and isinstance(loc, dict):
+            lat = loc.get("lat")
+            lon = loc.get("lon")
+
+        # First image (and its alt text/caption as description fallbacks)
+        images = item.get("images") or []
+        image = images[0] if images else {}
+        img_url = image.get("url")
+
+        # Default to "Unknown" if no difficulty classification
+        difficulty = item.get("difficulty")
+        if not difficulty or difficulty.lower() == "unknown":
+            difficulty = "Unknown"
+
+        # Zonal weather, falling back to the base zone; computed once per (zone, elevation)
+        trail_zone = item.get("weather_zone") or base_zone_name
+        weather = None
+        if typed_weather and trail_zone:
+            key = (trail_zone, item.get("trailhead_elevation_ft"))
+            if key not in weather_by_zone:
+                weather_by_zone[key] = get_trail_weather(typed_weather, trail_zone, key[1], base_zone_name)
+            weather = weather_by_zone[key]
+
+        name = item.get("name")
+        if alert_matches is not None:
+            trail_alert = alert_matches.get(name)
+        else:
+            trail_alert = alert_index.match(name)
+
+        rows.append({
+            "name": name,
+            "difficulty": difficulty,
+            "difficulty_layer": get_layer_key(difficulty),
+            "length": item.get("length_miles"),
+            "elevation": item.get("elevation_gain_ft"),
+            "rating": item.get("alltrails_rating"),
+            "reviews": item.get("alltrails_review_count"),
+            "lat": lat,
+            "lon": lon,
+            "desc": item.get("description"),
+            "raw_listing_description": item.get("raw_listing_description"),
+            "raw_body_text": item.get("raw_body_text"),
+            "estimated_time_hours": item.get("estimated_time_hours"),
+            "img_alt": (image.get("altText") or None) if img_url else None,
+            "img_caption": (image.get("caption") or None) if img_url else None,
+            "url_nps": item.get("nps_url"),
+            "url_at": item.get("alltrails_url"),
+            "img": img_url,
+            "route_type": item.get("route_type"),
+            "popularity_rank": item.get("popularity_rank"),
+            "wheelchair": bool(item.get("is_wheelchair_accessible", False)),
+            "kid_friendly": bool(item.get("is_kid_friendly", False)),
+            "pet_friendly": bool(item.get("is_pet_friendly", False)),
+            "weather": weather,
+            "trail_alert": trail_alert
+        })
+
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df["has_coords"] = df["lat"].notna() & (df["lat"] != 0.0)
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_trail_frame(
+    park_code: str,
+    trails_version: Any,
+    weather_version: Any,
+    alerts_version: Any,
+    _trails: Sequence[Any] = (),
+    _zone_weather: Optional[Dict[str, Any]] = None,
+    _base_zone_name: Optional[str] = None,
+    _alerts: Optional[List[Any]] = None,
+    _alert_matches: Optional[Dict[str, Any]] = None
+) -> pd.DataFrame:
+    """
+    build_trail_frame, cached per (park, trails version, weather version, alerts version).
+    The underscore arguments are the data itself and are not hashed.
+    """
+    df = build_trail_frame(_trails, _zone_weather, _base_zone_name, _alerts, _alert_matches)
+    logger.info(f"🥾 Built trail table for {park_code}: {len(df)} trails")
+    return df
+
+
+def filter_mask(
+    df: pd.DataFrame,
+    difficulties: Optional[List[str]] = None,
+    min_length: float = 0.0,
+    wheelchair: bool = False,
+    kid_friendly: bool = False,
+    pet_friendly: bool = False
+) -> np.ndarray:
+    """
+    Boolean row mask for the Trails Browser filters. Difficulties are map layer names
+    (DIFFICULTY_ORDER), matched the way the map buckets trails; trails without a length
+    pass the length filter.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if df.empty:
+        return mask
+    if difficulties:
+        mask &= df["difficulty_layer"].isin(difficulties).to_numpy()
+    if min_length > 0:
+        mask &= ((df["length"] >= min_length) | df["length"].isna()).to_numpy()
+    if wheelchair:
+        mask &= df["wheelchair"].to_numpy()
+    if kid_friendly:
+        mask &= df["kid_friendly"].to_numpy()
+    if pet_friendly:
+        mask &= df["pet_friendly"].to_numpy()
+    return mask
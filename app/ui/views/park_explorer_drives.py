@@ -1,5 +1,5 @@
 import streamlit as st
-from typing import List, Any, Optional
+from typing import List, Any, Optional, Dict
 
 
 # Keywords to identify road closure alerts
@@ -25,7 +25,7 @@ def _get_road_closure_alerts(alerts: List[Any]) -> List[Any]:
     return closure_alerts
 
 
-def render_scenic_drives(scenic_drives: List[Any], alerts: Optional[List[Any]] = None):
+def render_scenic_drives(scenic_drives: List[Any], alerts: Optional[List[Any]] = None, alert_matches: Optional[Dict[str, Dict]] = None):
     """
     Render scenic drives from scenic_drives.json fixture.
     Follows the same display pattern as Photo Spots.
@@ -33,6 +33,7 @@ def render_scenic_drives(scenic_drives: List[Any], alerts: Optional[List[Any]] =
     Args:
         scenic_drives: List of ScenicDrive objects
         alerts: Optional list of Alert objects to check for road closures
+        alert_matches: Optional drive name -> alert match (cached with the day's alerts)
     """
     st.markdown("### 🚗 Scenic Drives")
     st.caption("Explore the park's most beautiful routes by car.")
@@ -101,6 +102,14 @@ def render_scenic_drives(scenic_drives: List[Any], alerts: Optional[List[Any]] =
                 if badges:
                     st.caption(" • ".join(badges))
                 
+                # Alert naming this drive
+                drive_alert = (alert_matches or {}).get(drive.name)
+                if drive_alert:
+                    alert_label = f"⚠️ {drive_alert['category']}: {drive_alert['title']}"
+                    if drive_alert.get("url"):
+                        alert_label = f"[{alert_label}]({drive_alert['url']})"
+                    st.warning(alert_label)
+                
                 # Description
                 desc = getattr(drive, "description", "")
                 if desc:
@@ -1,7 +1,13 @@
 import streamlit as st
 import folium
-from streamlit_folium import st_folium
 from app.models import Amenity
+from app.ui.data_access import park_data_versions
+from app.engine.map_layers import (
+    get_category_icon, hub_services_features, in_park_features, place_categories, split_by, load_park_layer,
+    IN_PARK_CATEGORIES, CAMPING_CATEGORY, HUB_SERVICES_LAYER, IN_PARK_LAYER
+)
+from app.services.registry import get_services
+from app.ui.map_cache import get_map_html, show_map_html, marker_layer, add_geojson_markers
 import datetime
 
 # --- 1. STYLING (Unchanged) ---
@@ -559,203 +565,77 @@ def render_zonal_weather(zone_weather: dict, base_zone_name: str, weather_zones:
 
 
 # --- 4. MAP HELPERS (Unchanged) ---
-def get_category_icon(category: str):
-    cat_lower = str(category).lower()
-    if "gas" in cat_lower or "station" in cat_lower: return "blue", "gas-pump"
-    if "ev" in cat_lower: return "green", "charging-station"
-    if "entrance" in cat_lower: return "darkblue", "star"
-    if "food" in cat_lower: return "orange", "utensils"
-    if "lodging" in cat_lower: return "purple", "bed"
-    if "camping" in cat_lower: return "darkgreen", "campground"
-    if "store" in cat_lower or "supplies" in cat_lower: return "red", "shopping-cart"
-    if "medical" in cat_lower: return "darkred", "medkit"
-    return "gray", "info-circle"
-
 def get_category_html_label(category: str):
     cat_title = "Park Entrance" if category == "Park Entrance" else str(category).title()
     color, icon = get_category_icon(category)
     return f'<i class="fa fa-{icon}" style="color:{color}"></i> &nbsp; {cat_title}'
 
-def render_detailed_map(amenities_data):
-    if not amenities_data: return None
-
-    start_lat, start_lon = 39.8283, -98.5795
-    found = False
-    for hub_vals in amenities_data.values():
-        for items in hub_vals.values():
-            if items:
-                am = Amenity(**items[0]) if isinstance(items[0], dict) else items[0]
-                if am.latitude:
-                    start_lat, start_lon = am.latitude, am.longitude
-                    found = True
-                    break
-        if found: break
+def render_detailed_map(amenities_data, collection=None):
+    """
+    Hub services map: one toggleable layer per category, markers drawn from GeoJSON.
 
+    Args:
+        amenities_data: {hub: {category: [place dicts]}}
+        collection: Exported hub_services layer (built from amenities_data if None)
+    """
+    if collection is None:
+        collection = hub_services_features(amenities_data)
+    if not collection["features"]: return None
+
+    start_lon, start_lat = collection["features"][0]["geometry"]["coordinates"]
     m = folium.Map(location=[start_lat, start_lon], zoom_start=11)
-    
-    category_markers = {}
-    for hub_name, categories in amenities_data.items():
-        for category, items in categories.items():
-            cat_label = get_category_html_label(category)
-            if cat_label not in category_markers: category_markers[cat_label] = []
-            
-            color, icon_name = get_category_icon(category)
-            for item_data in items:
-                am = Amenity(**item_data) if isinstance(item_data, dict) else item_data
-                if am.latitude and am.longitude:
-                    gmaps = f"https://www.google.com/maps/search/?api=1&query={am.latitude},{am.longitude}"
-                    # Show address with embedded link, fallback to coordinates link
-                    if am.address and am.address.lower() != "n/a":
-                        addr_link = f'<a href="{gmaps}" target="_blank">{am.address} ↗</a>'
-                    else:
-                        addr_link = f'<a href="{gmaps}" target="_blank">View on Maps ↗</a>'
-                    popup = f"""<div style="width:180px"><b>{am.name}</b><br>{addr_link}</div>"""
-                    
-                    marker = folium.Marker(
-                        [am.latitude, am.longitude],
-                        popup=folium.Popup(popup, max_width=200),
-                        tooltip=am.name,
-                        icon=folium.Icon(color=color, icon=icon_name, prefix='fa')
-                    )
-                    category_markers[cat_label].append(marker)
-    
-    sorted_cats = sorted(category_markers.keys(), key=lambda x: (0 if "Entrance" in x else 1, x))
+
+    layers = {get_category_html_label(cat): layer for cat, layer in split_by(collection, "category").items()}
+    sorted_cats = sorted(layers.keys(), key=lambda x: (0 if "Entrance" in x else 1, x))
     for cat in sorted_cats:
-        fg = folium.FeatureGroup(name=cat)
-        for mk in category_markers[cat]: mk.add_to(fg)
+        fg = marker_layer(cat, len(layers[cat]["features"]))
+        add_geojson_markers(fg, layers[cat])
         fg.add_to(m)
         
     folium.LayerControl(collapsed=False).add_to(m)
     return m
 
-def render_in_park_map(static_data):
+def render_in_park_map(static_data, collection=None):
+    """
+    In-park services map (restrooms, water, food, picnic, medical, shuttle, camping).
+
+    Args:
+        static_data: Park static data (places, campgrounds)
+        collection: Exported in_park_services layer (built from static_data if None)
+    """
     if not static_data: return None
-    
-    places = static_data.get("places", [])
-    campgrounds = static_data.get("campgrounds", [])
-    
-    # Categories to plot with OFFSETS (lat_offset, lon_offset)
-    # Approx 0.0004 deg separation prevents exact overlap
-    target_cats = {
-        "Restroom": {"keywords": ["restroom", "toilet"], "exclude_keywords": [], "color": "darkblue", "icon": "restroom", "offset": (0.0000, 0.0000)},
-        "Water": {"keywords": ["water", "bottle"], "exclude_keywords": [], "color": "blue", "icon": "tint", "offset": (0.0004, 0.0000)},
-        "Food": {"keywords": ["food", "restaurant", "dining"], "exclude_keywords": ["food storage", "animal-safe"], "color": "orange", "icon": "utensils", "offset": (-0.0004, 0.0000)},
-        "Picnic": {"keywords": ["picnic"], "exclude_keywords": [], "color": "green", "icon": "tree", "offset": (0.0000, 0.0004)},
-        "Medical": {"keywords": ["first aid", "medical", "aed", "emergency"], "exclude_keywords": [], "color": "red", "icon": "medkit", "offset": (0.0000, -0.0004)},
-        "Shuttle": {"keywords": ["shuttle", "bus"], "exclude_keywords": [], "color": "purple", "icon": "bus", "offset": (0.0004, 0.0004)},
-    }
-    
-    # Prepare markers bucket
-    device_markers = {k: [] for k in target_cats.keys()}
-    device_markers["Camping"] = [] 
-    
-    def get_attr(obj, attr, default=None):
-        return obj.get(attr, default) if isinstance(obj, dict) else getattr(obj, attr, default)
-        
-    start_lat, start_lon = 37.2, -113.0
-    has_loc = False
 
-    # 1. Process Campgrounds (Category: Camping)
-    for camp in campgrounds:
-        loc = get_attr(camp, "location")
-        lat = get_attr(loc, "lat")
-        lon = get_attr(loc, "lon")
-        
-        if lat and lon:
-            if not has_loc: start_lat, start_lon = lat, lon; has_loc = True
-                
-            # Offset for Camping
-            lat += -0.0004
-            lon += -0.0004
-            
-            name = get_attr(camp, "name")
-            desc = get_attr(camp, "description")[:100] + "..."
-            popup = f"""<div style="width:180px"><b>{name}</b><br><span style="font-size:12px">{desc}</span></div>"""
-            
-            marker = folium.Marker(
-                [lat, lon],
-                popup=folium.Popup(popup, max_width=200),
-                tooltip=name,
-                icon=folium.Icon(color="green", icon="campground", prefix='fa')
-            )
-            device_markers["Camping"].append(marker)
+    if collection is None:
+        collection = in_park_features(static_data.get("places", []), static_data.get("campgrounds", []))
+
+    start_lat, start_lon = 37.2, -113.0
+    if collection["features"]:
+        start_lon, start_lat = collection["features"][0]["geometry"]["coordinates"]
 
-    # 2. Process Places
-    for place in places:
-        loc = get_attr(place, "location")
-        lat = get_attr(loc, "lat")
-        lon = get_attr(loc, "lon")
-        
-        if not lat or not lon: continue
-        if not has_loc: start_lat, start_lon = lat, lon; has_loc = True
-            
-        amenities = get_attr(place, "amenities", [])
-        title = get_attr(place, "title")
-        
-        for cat_name, info in target_cats.items():
-            match = False
-            for am in amenities:
-                am_lower = str(am).lower()
-                
-                # Check exclusions
-                is_excluded = False
-                for ex in info.get("exclude_keywords", []):
-                    if ex in am_lower: is_excluded = True; break
-                if is_excluded: continue
-                
-                # Check inclusions
-                for kw in info["keywords"]:
-                    if kw in am_lower: match = True; break
-                if match: break
-            
-            if match:
-                # Apply Offset
-                off_lat, off_lon = info["offset"]
-                p_lat = lat + off_lat
-                p_lon = lon + off_lon
-                
-                
-                url_html = ""
-                # Safely get URL from place (pydantic model or dict)
-                place_url = getattr(place, "url", None)
-                if place_url:
-                    url_html = f'<br><a href="{place_url}" target="_blank" style="color:blue; text-decoration:none;">Website &rarr;</a>'
-
-                popup = f"""<div style="width:160px"><b>{title}</b><br><span style="color:gray">{cat_name}</span>{url_html}</div>"""
-                marker = folium.Marker(
-                    [p_lat, p_lon],
-                    popup=folium.Popup(popup, max_width=200),
-                    tooltip=f"{title} ({cat_name})",
-                    icon=folium.Icon(color=info["color"], icon=info["icon"], prefix='fa')
-                )
-                device_markers[cat_name].append(marker)
-                
     # Build Map
     m = folium.Map(location=[start_lat, start_lon], zoom_start=11)
-    
+
     # Add Layers with HTML Labels
-    for cat, markers in device_markers.items():
-        if markers:
-            # Determine color/icon for label
-            if cat == "Camping":
-                color, icon = "green", "campground"
-            elif cat in target_cats:
-                color = target_cats[cat]["color"]
-                icon = target_cats[cat]["icon"]
-            else:
-                color, icon = "gray", "info-circle"
-            
-            # Create HTML label
-            label = f'<i class="fa fa-{icon}" style="color:{color}"></i> &nbsp; {cat} ({len(markers)})'
-            
-            fg = folium.FeatureGroup(name=label)
-            for mk in markers: mk.add_to(fg)
-            fg.add_to(m)
+    for cat, layer in split_by(collection, "category", list(IN_PARK_CATEGORIES) + ["Camping"]).items():
+        if cat == "Camping":
+            color, icon = CAMPING_CATEGORY["color"], CAMPING_CATEGORY["icon"]
+        elif cat in IN_PARK_CATEGORIES:
+            color, icon = IN_PARK_CATEGORIES[cat]["color"], IN_PARK_CATEGORIES[cat]["icon"]
+        else:
+            color, icon = "gray", "info-circle"
+        count = len(layer["features"])
+
+        # Create HTML label
+        label = f'<i class="fa fa-{icon}" style="color:{color}"></i> &nbsp; {cat} ({count})'
+
+        fg = marker_layer(label, count)
+        add_geojson_markers(fg, layer)
+        fg.add_to(m)
             
     folium.LayerControl(collapsed=False).add_to(m)
     return m
 
-def render_in_park_details(static_data):
+def render_in_park_details(static_data, alert_matches=None):
     if not static_data: return
     
     st.markdown("### 🏕️ Campgrounds")
@@ -790,6 +670,11 @@ def render_in_park_details(static_data):
                 st.caption(f"**Sites:** {total} Total • {rv} RV-Only • {tent} Tent-Only")
                 if am_list: st.info(" | ".join(am_list))
                 
+                # Alert naming this campground
+                camp_alert = (alert_matches or {}).get(name)
+                if camp_alert:
+                    st.warning(f"⚠️ {camp_alert['category']}: {camp_alert['title']}")
+                
                 # Accessibility
                 access = getattr(camp, "accessibility", {})
                 if isinstance(access, dict):
@@ -801,39 +686,16 @@ def render_in_park_details(static_data):
     # Other Categories
     places = static_data.get("places", [])
     
-    # Reuse categories from map
-    target_cats = {
-        "Shuttle": {"keywords": ["shuttle", "bus"], "exclude_keywords": [], "icon": "bus", "color":"purple"},
-        "Restroom": {"keywords": ["restroom", "toilet"], "exclude_keywords": [], "icon": "restroom", "color":"darkblue"},
-        "Water": {"keywords": ["water", "bottle"], "exclude_keywords": [], "icon": "tint", "color":"blue"},
-        "Food": {"keywords": ["food", "restaurant", "dining"], "exclude_keywords": ["food storage", "animal-safe"], "icon": "utensils", "color":"orange"},
-        "Medical": {"keywords": ["first aid", "medical", "aed", "emergency"], "exclude_keywords": [], "icon": "medkit", "color":"red"},
-    }
-    
-    grouped = {k: [] for k in target_cats.keys()}
+    # Categories come precomputed on each place (Place.essentials_categories), shared with the map
+    list_cats = ["Shuttle", "Restroom", "Water", "Food", "Medical"]
+    grouped = {k: [] for k in list_cats}
     
     for place in places:
-        amenities = getattr(place, "amenities", [])
         title = getattr(place, "title", "Place")
         url = getattr(place, "url", None)
         
-        for cat_name, info in target_cats.items():
-            match = False
-            for am in amenities:
-                am_lower = str(am).lower()
-                
-                # Check exclusions
-                is_excluded = False
-                for ex in info.get("exclude_keywords", []):
-                    if ex in am_lower: is_excluded = True; break
-                if is_excluded: continue
-                
-                # Check inclusions
-                for kw in info["keywords"]:
-                    if kw in am_lower: match = True; break
-                if match: break
-            
-            if match:
+        for cat_name in place_categories(place):
+            if cat_name in grouped:
                 # Store tuple (Title, URL)
                 grouped[cat_name].append((title, url))
 
@@ -843,8 +705,8 @@ def render_in_park_details(static_data):
     for cat, items in grouped.items():
         if items:
             with cols[idx % 3]:
-                icon = target_cats[cat]["icon"]
-                color = target_cats[cat]["color"]
+                icon = IN_PARK_CATEGORIES[cat]["icon"]
+                color = IN_PARK_CATEGORIES[cat]["color"]
                 st.markdown(f'#### <i class="fa fa-{icon}" style="color:{color}"></i> &nbsp; {cat}', unsafe_allow_html=True)
                 
                 # Sort by title, items are (title, url) tuples
@@ -914,16 +776,23 @@ def render_essentials_dashboard(park_code, orchestrator, static_data, volatile_d
     
     st.subheader(f"🗺️ {view_option} Map")
     
-    # 2. Map Rendering based on Toggle
+    # 2. Map Rendering based on Toggle (pre-rendered once per park and data version)
+    # from the exported GeoJSON layers when they are current
+    data_manager = get_services().data_manager
+    fixtures_version = park_data_versions(park_code)["fixtures"]
     if view_option == "Hub Services":
         st.caption("Gas, Food, Lodging & Supplies near Park Hubs")
-        m1 = render_detailed_map(amenities_data)
-        if m1: st_folium(m1, height=500, use_container_width=True, key="map_hub")
+        html = get_map_html(park_code, "hub_services", fixtures_version, _build=lambda: render_detailed_map(
+            amenities_data, load_park_layer(data_manager, park_code, HUB_SERVICES_LAYER)
+        ))
+        if html: show_map_html(html, height=500)
         else: st.info("Map data unavailable.")
     else:
         st.caption("Restrooms, Water, Shuttle Stops, Camping & Medical inside the Park")
-        m2 = render_in_park_map(static_data)
-        if m2: st_folium(m2, height=500, use_container_width=True, key="map_park")
+        html = get_map_html(park_code, "in_park_services", fixtures_version, _build=lambda: render_in_park_map(
+            static_data, load_park_layer(data_manager, park_code, IN_PARK_LAYER)
+        ))
+        if html: show_map_html(html, height=500)
         else: st.info("In-Park data unavailable.")
 
     st.divider()
@@ -968,4 +837,4 @@ def render_essentials_dashboard(park_code, orchestrator, static_data, volatile_d
                                  """, unsafe_allow_html=True)
     
     else: # In-Park Services
-        render_in_park_details(static_data)
+        render_in_park_details(static_data, (volatile_data.get("alert_matches") or {}).get("campgrounds"))
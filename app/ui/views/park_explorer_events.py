@@ -1,57 +1,46 @@
 import streamlit as st
-from datetime import datetime
+from datetime import date
 from app.models import Event
+from app.engine.event_index import EventIndex
 from app.ui.components import render_event_card
 
-def render_events_list(events: list[Event], visit_date: datetime.date = None):
-    # deduplicate logic: attributes to dict mapping
-    # Key = Title, Value = Event object (augmented with all dates)
-    deduped = {}
-    
-    for e in events:
-        if e.title not in deduped:
-            # Create a clone effectively
-            deduped[e.title] = e
-            # Ensure dates field is populated from ranges if empty
-            if not getattr(e, "dates", []):
-                # If no specific dates but has range, we rely on range display
-                # But for deduplication we mainly aggregate 'dates' if they exist or just keep instances
-                pass
-        else:
-            # Merge dates
-            current = deduped[e.title]
-            new_dates = getattr(e, "dates", [])
-            current_dates = getattr(current, "dates", [])
-            
-            # Combine and sort unique dates
-            all_dates = sorted(list(set(current_dates + new_dates)))
-            try:
-                current.dates = all_dates
-            except ValueError:
-                # Stale model schema in cache
-                pass
-            
-            # If the current one doesn't have an image but the new one does, take it
-            if not getattr(current, "images", []) and getattr(e, "images", []):
-                try:
-                    current.images = e.images
-                except ValueError:
-                    pass
+def render_events_list(events: list[Event], visit_date: date = None, event_index: EventIndex = None):
+    """
+    Renders the park's events, one card per event (recurring instances merged).
 
-    # Flatten back to list
-    final_events = list(deduped.values())
-    
-    # Sort events by date if possible (optional, but good for UX)
-    # final_events.sort(key=lambda x: x.date_start)
+    Args:
+        events: Events from the daily cache
+        visit_date: Preselected visit start date (optional)
+        event_index: EventIndex built with the volatile data (built here if None)
+    """
+    # Recurring instances are merged and indexed by date once, at cache time
+    if event_index is None:
+        event_index = EventIndex(events)
 
-    if not final_events:
+    if not len(event_index):
         st.info("No events found.")
         return
 
-    st.caption(f"Showing {len(final_events)} distinct events")
+    # Visit dates: a single day or a range, answered from the calendar index
+    visit = st.date_input(
+        "📅 Visit dates",
+        value=(visit_date,) if visit_date else (),
+        format="YYYY-MM-DD",
+        key="events_visit_dates",
+        help="Pick a day or a range to see only events happening then."
+    )
+    visit = [d for d in (visit if isinstance(visit, (list, tuple)) else [visit]) if d]
 
-    # Deduplicate/Filter Logic (Keep existing logic up to filtering)
-    # ... (Actually I need to keep the dedup loop, only replace the rendering loop)
+    if visit:
+        final_events = event_index.between(visit[0], visit[-1])
+        span = visit[0].strftime("%b %d") if len(visit) == 1 else f"{visit[0].strftime('%b %d')} – {visit[-1].strftime('%b %d')}"
+        if not final_events:
+            st.info(f"No events scheduled for {span}.")
+            return
+        st.caption(f"Showing {len(final_events)} of {len(event_index)} distinct events on {span}")
+    else:
+        final_events = event_index.events
+        st.caption(f"Showing {len(final_events)} distinct events")
 
     for event in final_events:
         render_event_card(event)
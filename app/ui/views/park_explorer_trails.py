@@ -1,17 +1,38 @@
 import streamlit as st
 import pandas as pd
 import folium
-from streamlit_folium import st_folium
-from app.adapters.weather_adapter import get_trail_weather
-from app.models import ZonalForecast
+from typing import List, Optional
+from app.ui.data_access import park_data_versions
+from app.engine.map_layers import trail_features, split_by, feature_collection, DIFFICULTY_LAYERS
+from app.ui.map_cache import get_map_html, show_map_html, marker_layer, add_geojson_markers
+from app.ui.trail_table import get_trail_frame, filter_mask
 
-def get_difficulty_color(diff: str):
-    if not diff or diff.lower() == "unknown": return "gray"
-    d = diff.lower()
-    if "easy" in d: return "green"
-    if "moderate" in d: return "orange"
-    if "hard" in d or "strenuous" in d: return "red"
-    return "gray"
+def build_trail_map(map_df: pd.DataFrame, shown_layers: Optional[List[str]] = None) -> folium.Map:
+    """
+    Trail markers in one toggleable layer per difficulty (clustered when dense).
+    Only shown_layers (default: all) are switched on when the map loads.
+    """
+    # Center map
+    m = folium.Map(location=[map_df["lat"].mean(), map_df["lon"].mean()], zoom_start=11)
+    
+    layer_names = {
+        "Easy": '<span style="color:green">●</span> Easy',
+        "Moderate": '<span style="color:orange">●</span> Moderate',
+        "Strenuous": '<span style="color:red">●</span> Strenuous',
+        "Unknown": '<span style="color:gray">●</span> Unknown'
+    }
+    layers = split_by(trail_features(map_df.to_dict("records")), "layer")
+        
+    # Add Layers to Map in Order
+    for title in DIFFICULTY_LAYERS:
+        layer = layers.get(title, feature_collection([]))
+        show = shown_layers is None or title in shown_layers
+        fg = marker_layer(layer_names[title], len(layer["features"]), show=show)
+        add_geojson_markers(fg, layer)
+        fg.add_to(m)
+        
+    folium.LayerControl(collapsed=False).add_to(m)
+    return m
 
 def render_trails_browser(park_code: str, static_data, volatile_data=None):
     st.subheader(f"Hiking Trails")
@@ -21,151 +42,18 @@ def render_trails_browser(park_code: str, static_data, volatile_data=None):
         st.info("No trail data available.")
         return
     
-    # Get Alerts for cross-referencing
-    alerts = volatile_data.get("alerts", []) if volatile_data else []
-    
-    # Helper: Check if trail name appears in any alert
-    def get_trail_alert(trail_name: str) -> dict:
-        """Check if trail name appears in any alert title/description.
-        Uses phrase matching to avoid false positives."""
-        if not trail_name or not alerts:
-            return None
-        
-        trail_lower = trail_name.lower()
-        
-        # Build the "core" trail name by removing common suffixes/prefixes
-        # e.g., "Navajo Loop Trailhead" -> "navajo loop"
-        # e.g., "Wall Street and Queens Garden Loop Trail" -> "wall street", "queens garden"
-        import re
-        # Strip punctuation from each word
-        raw_words = trail_lower.split()
-        clean_words = [re.sub(r'[^\w-]', '', w) for w in raw_words]  # Keep letters, numbers, hyphens
-        remove_words = {'trail', 'trails', 'trailhead', 'hike', 'path', 'the', 'and', 'to', 'of', 'at', 'a'}
-        words = [w for w in clean_words if w and w not in remove_words]
-        
-        # Create search phrases (consecutive significant words)
-        # e.g., ["navajo", "navajo loop"] or ["wall", "wall street", "queens", "queens garden"]
-        search_phrases = []
-        for i, word in enumerate(words):
-            if len(word) > 2:  # Skip very short words
-                search_phrases.append(word)  # Single word
-                if i + 1 < len(words):
-                    search_phrases.append(f"{word} {words[i+1]}")  # Two-word phrase
-        
-        if not search_phrases:
-            return None
-        
-        for alert in alerts:
-            title = getattr(alert, 'title', '') or (alert.get('title') if isinstance(alert, dict) else '')
-            desc = getattr(alert, 'description', '') or (alert.get('description') if isinstance(alert, dict) else '')
-            combined = (title + ' ' + desc).lower()
-            
-            # Match if full trail name (minus generic words) appears
-            core_name = ' '.join(words)
-            if core_name and core_name in combined:
-                return {
-                    "title": title[:100],
-                    "category": getattr(alert, 'category', None) or (alert.get('category') if isinstance(alert, dict) else 'Closure'),
-                    "url": getattr(alert, 'url', None) or (alert.get('url') if isinstance(alert, dict) else None)
-                }
-            
-            # Match if a 2-word phrase from trail name appears in alert
-            for phrase in search_phrases:
-                if ' ' in phrase and phrase in combined:  # Only match 2+ word phrases
-                    return {
-                        "title": title[:100],
-                        "category": getattr(alert, 'category', None) or (alert.get('category') if isinstance(alert, dict) else 'Closure'),
-                        "url": getattr(alert, 'url', None) or (alert.get('url') if isinstance(alert, dict) else None)
-                    }
-        
-        return None
-        
-    # Get Zonal Weather Data
-    zone_weather = volatile_data.get("zone_weather") if volatile_data else None
-    
-    # Get Base Zone Name (from static data)
+    # 1. Trail table: built once per (park, trails, weather, alerts) version and cached
+    volatile_data = volatile_data or {}
     park_details = static_data.get("park_details")
-    base_zone_name = getattr(park_details, "base_weather_zone", None) if park_details else None
-
-    # 1. Prepare Data Frame
-    clean_rows = []
-    for t in trails:
-        item = t if isinstance(t, dict) else t.model_dump()
-        
-        # Extract Lat/Lon safely
-        lat, lon = None, None
-        loc = item.get("location")
-        if loc and isinstance(loc, dict):
-            lat = loc.get("lat")
-            lon = loc.get("lon")
-        
-        # Extract Image
-        img_url = None
-        if item.get("images") and len(item["images"]) > 0:
-            img_url = item["images"][0].get("url")
-
-        # Default to "Unknown" if no difficulty classification
-        difficulty = item.get("difficulty")
-        if not difficulty or difficulty.lower() == "unknown":
-            difficulty = "Unknown"
-            
-        # --- Zonal Weather Calculation ---
-        weather_badge_info = None
-        trail_zone = item.get("weather_zone")
-        elev_ft = item.get("trailhead_elevation_ft")
-        
-        # Fallback: use base zone if trail doesn't have a zone assigned
-        if not trail_zone and base_zone_name:
-            trail_zone = base_zone_name
-        
-        if zone_weather and trail_zone:
-            # Convert dict cache to object if needed for adapter, or adapter handles dict?
-            # get_trail_weather expects Dict[str, ZonalForecast]. 
-            # But cached data might be raw dicts.
-            # Let's reconstitute ZonalForecast objects if they are dicts
-            
-            # Helper to ensure we have objects
-            typed_zone_weather = {}
-            for k, v in zone_weather.items():
-                if isinstance(v, dict):
-                    try:
-                        typed_zone_weather[k] = ZonalForecast(**v)
-                    except: pass
-                else:
-                    typed_zone_weather[k] = v
-            
-            w_data = get_trail_weather(typed_zone_weather, trail_zone, elev_ft, base_zone_name)
-            if w_data:
-                weather_badge_info = w_data
-        
-        clean_rows.append({
-            "name": item.get("name"),
-            "difficulty": difficulty,
-            "length": item.get("length_miles"),
-            "elevation": item.get("elevation_gain_ft"),
-            "rating": item.get("alltrails_rating"),
-            "reviews": item.get("alltrails_review_count"),
-            "lat": lat,
-            "lon": lon,
-            "desc": item.get("description"),
-            "raw_listing_description": item.get("raw_listing_description"),
-            "raw_body_text": item.get("raw_body_text"),
-            "estimated_time_hours": item.get("estimated_time_hours"),
-            "img_alt": None if not img_url else (item.get("images")[0].get("altText") if item.get("images") and len(item.get("images"))>0 and item.get("images")[0].get("altText") else None),
-            "img_caption": None if not img_url else (item.get("images")[0].get("caption") if item.get("images") and len(item.get("images"))>0 and item.get("images")[0].get("caption") else None),
-            "url_nps": item.get("nps_url"),
-            "url_at": item.get("alltrails_url"),
-            "img": img_url,
-            "route_type": item.get("route_type"),
-            "popularity_rank": item.get("popularity_rank"),
-            "wheelchair": item.get("is_wheelchair_accessible", False),
-            "kid_friendly": item.get("is_kid_friendly", False),
-            "pet_friendly": item.get("is_pet_friendly", False),
-            "weather": weather_badge_info,  # Store weather info
-            "trail_alert": get_trail_alert(item.get("name"))  # Alert cross-reference
-        })
-        
-    df = pd.DataFrame(clean_rows)
+    versions = park_data_versions(park_code)
+    df = get_trail_frame(
+        park_code, versions["trails"], versions["weather"], versions["alerts"],
+        _trails=trails,
+        _zone_weather=volatile_data.get("zone_weather"),
+        _base_zone_name=getattr(park_details, "base_weather_zone", None) if park_details else None,
+        _alerts=volatile_data.get("alerts", []),
+        _alert_matches=(volatile_data.get("alert_matches") or {}).get("trails")
+    )
 
     # 2. Filters
     with st.expander("🔍 Filter Trails", expanded=True):
@@ -182,97 +70,24 @@ def render_trails_browser(park_code: str, static_data, volatile_data=None):
         kid_friendly_only = c4.checkbox("👶 Kid Friendly")
         pet_friendly_only = c5.checkbox("🐕 Pet Friendly")
 
-    # Apply Filters
-    filtered = df.copy()
-    if diff_filter:
-        filtered = filtered[filtered["difficulty"].isin(diff_filter)]
-    if min_len > 0:
-        filtered = filtered[(filtered["length"] >= min_len) | (filtered["length"].isna())]
-    if wheelchair_only:
-        filtered = filtered[filtered["wheelchair"] == True]
-    if kid_friendly_only:
-        filtered = filtered[filtered["kid_friendly"] == True]
-    if pet_friendly_only:
-        filtered = filtered[filtered["pet_friendly"] == True]
+    # Apply Filters (boolean masks over the cached table)
+    filtered = df[filter_mask(df, diff_filter, min_len, wheelchair_only, kid_friendly_only, pet_friendly_only)]
 
-    # 3. Map (Valid coords only)
-    map_df = filtered[(filtered["lat"].notnull()) & (filtered["lat"] != 0.0)]
+    # 3. Map (Valid coords only). Every difficulty layer is on the page; the Difficulty
+    # filter picks which ones start switched on (the layer control can still toggle them).
+    map_df = df[filter_mask(df, None, min_len, wheelchair_only, kid_friendly_only, pet_friendly_only) & df["has_coords"].to_numpy()]
+    shown_layers = [layer for layer in DIFFICULTY_LAYERS if not diff_filter or layer in diff_filter]
+    shown_count = int(map_df["difficulty_layer"].isin(shown_layers).sum()) if not map_df.empty else 0
     
     if not map_df.empty:
-        st.markdown(f"### 🗺️ Trail Map ({len(map_df)} locations)")
-        
-        # Center map
-        m = folium.Map(location=[map_df["lat"].mean(), map_df["lon"].mean()], zoom_start=11)
-        
-        # Prepare Layers
-        layers = {
-            "Easy": folium.FeatureGroup(name='<span style="color:green">●</span> Easy'),
-            "Moderate": folium.FeatureGroup(name='<span style="color:orange">●</span> Moderate'),
-            "Strenuous": folium.FeatureGroup(name='<span style="color:red">●</span> Strenuous'),
-            "Unknown": folium.FeatureGroup(name='<span style="color:gray">●</span> Unknown')
-        }
-        
-        # Determine strict layer mapping
-        def get_layer_key(diff_str):
-            if not diff_str or diff_str.lower() == "unknown": return "Unknown"
-            d = diff_str.lower()
-            if "easy" in d: return "Easy"
-            if "hard" in d or "strenuous" in d: return "Strenuous"
-            if "moderate" in d: return "Moderate"
-            return "Unknown"
-
-        for _, row in map_df.iterrows():
-            color = get_difficulty_color(row["difficulty"])
-            layer_key = get_layer_key(row["difficulty"])
-            
-            # Build rating string with optional reviews link
-            if pd.notna(row['rating']) and pd.notna(row['reviews']) and row['url_at']:
-                rating_str = f"{row['rating']} ⭐ <a href='{row['url_at']}?reviews=true' target='_blank'>Latest Reviews ({int(row['reviews'])})</a>"
-            elif pd.notna(row['rating']) and pd.notna(row['reviews']):
-                rating_str = f"{row['rating']} ⭐ ({int(row['reviews'])} Latest Reviews)"
-            elif pd.notna(row['rating']):
-                rating_str = f"{row['rating']} ⭐"
-            else:
-                rating_str = "N/A"
-            
-            # Build trail URL for popup
-            popup_trail_url = row['url_nps'] if pd.notna(row['url_nps']) and row['url_nps'] else row['url_at'] if pd.notna(row['url_at']) and row['url_at'] else None
-            
-            # Build trail name with optional link
-            if popup_trail_url:
-                trail_name_html = f"<a href='{popup_trail_url}' target='_blank' style='text-decoration:none;color:#1a73e8;'><b>{row['name']}</b></a>"
-            else:
-                trail_name_html = f"<b>{row['name']}</b>"
-            
-            # Weather in Popup
-            wx = row.get("weather")
-            wx_html = ""
-            if wx:
-                wx_html = f"<br>🌡️ {wx['temp']:.0f}°F ({wx['condition']})"
-
-            popup_html = f"""
-            {trail_name_html}<br>
-            {row['difficulty']} | {row['length'] or '?'} mi{wx_html}<br>
-            Rating: {rating_str}
-            """
-            
-            marker = folium.Marker(
-                [row["lat"], row["lon"]],
-                popup=folium.Popup(popup_html, max_width=200),
-                tooltip=row["name"],
-                icon=folium.Icon(color=color, icon="person-hiking", prefix='fa')
-            )
-            
-            # Add to specific layer
-            marker.add_to(layers[layer_key])
-            
-        # Add Layers to Map in Order
-        for title in ["Easy", "Moderate", "Strenuous", "Unknown"]:
-            layers[title].add_to(m)
-            
-        folium.LayerControl(collapsed=False).add_to(m)
-            
-        st_folium(m, width="100%", height=450)
+        st.markdown(f"### 🗺️ Trail Map ({shown_count} locations)")
+        map_filters = (tuple(sorted(diff_filter)), min_len, wheelchair_only, kid_friendly_only, pet_friendly_only)
+        html = get_map_html(
+            park_code, "trails", (versions["trails"], versions["weather"], map_filters),
+            persist=not any(map_filters),
+            _build=lambda: build_trail_map(map_df, shown_layers)
+        )
+        show_map_html(html, height=450)
     
     st.divider()
 
@@ -382,7 +197,7 @@ def render_trails_browser(park_code: str, static_data, volatile_data=None):
     order = ["Easy", "Moderate", "Strenuous", "Unknown"]
     
     for level in order:
-        subset = filtered[filtered["difficulty"] == level]
+        subset = filtered[filtered["difficulty_layer"] == level]
         if subset.empty: continue
         
         with st.expander(f"**{level}** ({len(subset)})", expanded=False):
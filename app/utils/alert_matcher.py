@@ -0,0 +1,198 @@
+import logging
+import re
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Generic words that don't identify a trail/drive/campground on their own
+STOP_WORDS = {'trail', 'trails', 'trailhead', 'hike', 'path', 'the', 'and', 'to', 'of', 'at', 'a'}
+
+# Bound on the number of alert sets kept in the process-wide cache
+MAX_CACHED_INDEXES = 32
+
+# Fixture files whose names are matched against the alerts, by alert_matches key
+ALERT_MATCH_SOURCES = [("trails", "trails_v2.json"),
+                       ("scenic_drives", "scenic_drives.json"),
+                       ("campgrounds", "campgrounds.json")]
+
+
+def _field(alert: Any, key: str, default=None):
+    if isinstance(alert, dict):
+        return alert.get(key, default)
+    return getattr(alert, key, default)
+
+
+_WORD_RE = re.compile(r'[\w-]+')
+
+
+def _tokenize(text: str) -> List[str]:
+    # Runs of letters, numbers and hyphens; any other character separates words ('trail/vernal')
+    return _WORD_RE.findall(text.lower())
+
+
+def _parts(word: str) -> List[str]:
+    # Hyphenated compounds ('going-to-the-sun', 'round-bottom') are indexed as word runs
+    return [p for p in word.split('-') if p]
+
+
+def name_words(name: str) -> List[str]:
+    """Significant words of a name, e.g. 'Navajo Loop Trailhead' -> ['navajo', 'loop']."""
+    return [w for w in _tokenize(name or "") if w not in STOP_WORDS]
+
+
+class AlertIndex:
+    """
+    N-gram inverted index over a day's alerts.
+
+    Alert titles/descriptions are tokenized once into unigrams and bigrams
+    (n-gram -> alert positions). Resolving a name is then a few dict lookups instead
+    of a substring scan of every alert.
+
+    Matching semantics (shared by the Trail Browser and LLM context):
+      1. The full significant name (e.g. 'navajo loop') appears in the alert, or
+      2. Any two-word phrase from the name (first word > 2 chars) appears in the alert.
+    The earliest matching alert wins.
+
+    Words are compared whole, not as substrings: a word is a run of letters, numbers and
+    hyphens, so 'Mist Trail/Vernal Fall' reads as 'mist trail vernal fall'.
+    """
+    def __init__(self, alerts: List[Any]):
+        self.alerts = list(alerts or [])
+        self._tokens: List[List[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._cache: Dict[str, Optional[Dict[str, Any]]] = {}
+
+        for pos, alert in enumerate(self.alerts):
+            text = f"{_field(alert, 'title', '') or ''} {_field(alert, 'description', '') or ''}"
+            tokens = [p for w in _tokenize(text) for p in _parts(w)]
+            self._tokens.append(tokens)
+            grams = set(tokens)
+            grams.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(pos)
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    def _positions(self, words: List[str]) -> set:
+        """Alerts containing the words as a contiguous run."""
+        if not words:
+            return set()
+        if len(words) == 1:
+            return set(self._postings.get(words[0], []))
+
+        # Candidates must contain every bigram; verify contiguity only on those few
+        bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+        candidates = set(self._postings.get(bigrams[0], []))
+        for gram in bigrams[1:]:
+            candidates &= set(self._postings.get(gram, []))
+            if not candidates:
+                return candidates
+
+        n = len(words)
+        return {
+            pos for pos in candidates
+            if any(self._tokens[pos][i:i + n] == words for i in range(len(self._tokens[pos]) - n + 1))
+        }
+
+    def match(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns {"title", "category", "url"} for the first alert naming this trail/drive/campground,
+        or None.
+        """
+        if not name or not self.alerts:
+            return None
+        if name in self._cache:
+            return self._cache[name]
+
+        result = None
+        words = name_words(name)
+        if any(len(w) > 2 for w in words):
+            hits = self._positions([p for w in words for p in _parts(w)])
+            for i, word in enumerate(words[:-1]):
+                if len(word) > 2:
+                    hits |= self._positions(_parts(word) + _parts(words[i + 1]))
+            if hits:
+                alert = self.alerts[min(hits)]
+                result = {
+                    "title": (_field(alert, 'title', '') or '')[:100],
+                    "category": _field(alert, 'category') or 'Closure',
+                    "url": _field(alert, 'url')
+                }
+
+        self._cache[name] = result
+        return result
+
+    def match_all(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Resolves many names at once, keeping only the ones with an alert."""
+        matches = {}
+        for name in names:
+            hit = self.match(name)
+            if hit:
+                matches[name] = hit
+        return matches
+
+
+_INDEX_CACHE: "OrderedDict[Tuple, AlertIndex]" = OrderedDict()
+
+
+def get_alert_index(alerts: List[Any]) -> AlertIndex:
+    """
+    Process-wide AlertIndex per distinct alert set, so Streamlit reruns and chat turns
+    over the same day's alerts reuse one index (and its per-name results).
+    """
+    key = tuple(
+        (_field(a, 'id'), _field(a, 'lastIndexedDate'), _field(a, 'title')) for a in (alerts or [])
+    )
+    index = _INDEX_CACHE.get(key)
+    if index is None:
+        index = AlertIndex(alerts)
+        _INDEX_CACHE[key] = index
+        if len(_INDEX_CACHE) > MAX_CACHED_INDEXES:
+            _INDEX_CACHE.popitem(last=False)
+    else:
+        _INDEX_CACHE.move_to_end(key)
+    return index
+
+
+def build_alert_matches(park_code: str, alerts: List[Any], data_manager) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolves the park's trails, scenic drives and campgrounds against its alerts.
+
+    Returns:
+        {"trails": {name: match}, "scenic_drives": {...}, "campgrounds": {...}}
+    """
+    index = get_alert_index(alerts)
+    matches = {}
+    for key, filename in ALERT_MATCH_SOURCES:
+        items = data_manager.load_fixture(park_code, filename) or []
+        names = [item.get("name") for item in items if isinstance(item, dict) and item.get("name")]
+        matches[key] = index.match_all(names)
+    return matches
+
+
+def _sources_signature(park_code: str, data_manager) -> List[Optional[List[int]]]:
+    """[mtime_ns, size] (None when missing) of each matched fixture file, JSON-friendly."""
+    files = {name: [mtime, size] for name, mtime, size in data_manager.fixtures_signature(park_code)}
+    return [files.get(filename) for _, filename in ALERT_MATCH_SOURCES]
+
+
+def get_alert_matches(park_code: str, alerts: List[Any], data_manager, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Loads the alert matches cached next to today's alerts, building (and caching) them on a miss.
+    The cache is rebuilt when the trails, scenic drives or campgrounds changed since it was written.
+    Pass refresh=True right after the alerts themselves were re-fetched.
+    """
+    signature = _sources_signature(park_code, data_manager)
+    if not refresh:
+        cached = data_manager.load_daily_cache(park_code, "alert_matches")
+        if cached is not None and cached.get("source_signature") == signature:
+            return cached
+
+    matches = build_alert_matches(park_code, alerts, data_manager)
+    matches["source_signature"] = signature
+    data_manager.save_daily_cache(park_code, "alert_matches", matches)
+    logger.info(f"Cached alert matches for {park_code}: " +
+                ", ".join(f"{k}={len(matches[k])}" for k, _ in ALERT_MATCH_SOURCES))
+    return matches
@@ -1,4 +1,36 @@
 import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Suffixes that shouldn't affect matching ('trail', 'trailhead', 'hike', 'path', 'loop', plurals)
+_SUFFIX_RE = re.compile(r'\b(?:trailhead|trail|hike|path|loop)s?\b')
+
+
+@lru_cache(maxsize=8192)
+def _name_words(name: str) -> Tuple[str, Tuple[str, ...]]:
+    """(normalized name, significant words) - computed once per distinct name."""
+    # Normalize apostrophes (e.g., "Angel's" -> "Angels")
+    lower = name.lower().replace("'", "").replace("’", "")
+    lower = _SUFFIX_RE.sub('', lower).strip()
+    # Significant words (>3 chars to avoid matching just 'fall')
+    return lower, tuple(w for w in lower.split() if len(w) > 3)
+
+
+def _word_matches(tw: str, trw: str) -> bool:
+    # Handles plural/singular
+    return tw == trw or tw.rstrip('s') == trw or tw == trw.rstrip('s')
+
+
+def _words_match(target: Tuple[str, Tuple[str, ...]], trail: Tuple[str, Tuple[str, ...]]) -> bool:
+    target_lower, target_words = target
+    trail_lower, trail_words = trail
+    if not target_words or not trail_words:
+        # Fallback to simple contains check if words are too short
+        return target_lower in trail_lower or trail_lower in target_lower
+    # Require ALL significant target words to match (strict)
+    # This prevents 'Bridalveil Falls' from matching 'Vernal Falls' (only 'falls' matches)
+    return all(any(_word_matches(tw, trw) for trw in trail_words) for tw in target_words)
+
 
 def fuzzy_match_trail_name(target: str, trail_name: str) -> bool:
     """
@@ -7,36 +39,192 @@ def fuzzy_match_trail_name(target: str, trail_name: str) -> bool:
     - 'Cathedral Lakes Trail' vs 'Cathedral Lakes Trailhead'
     
     Requires the PRIMARY distinctive word(s) to match, not just common words like 'fall'.
-    """   
-    target_lower, trail_lower = target.lower(), trail_name.lower()
-    
-    # Normalize apostrophes (e.g., "Angel's" -> "Angels")
-    target_lower = target_lower.replace("'", "").replace("'", "")
-    trail_lower = trail_lower.replace("'", "").replace("'", "")
-    
-    # Remove common suffixes that shouldn't affect matching
-    SUFFIXES = ['trail', 'trailhead', 'hike', 'path', 'loop']
-    for suffix in SUFFIXES:
-        target_lower = re.sub(rf'\b{suffix}s?\b', '', target_lower).strip()
-        trail_lower = re.sub(rf'\b{suffix}s?\b', '', trail_lower).strip()
-    
-    # Extract significant words (>3 chars to avoid matching just 'fall')
-    target_words = [w for w in target_lower.split() if len(w) > 3]
-    trail_words = [w for w in trail_lower.split() if len(w) > 3]
-    
-    if not target_words or not trail_words:
-        # Fallback to simple contains check if words are too short
-        return target_lower in trail_lower or trail_lower in target_lower
-    
-    # Count matching words (handles plural/singular)
-    def word_matches(tw, trw):
-        return tw == trw or tw.rstrip('s') == trw or tw == trw.rstrip('s')
-    
-    matches = 0
-    for tw in target_words:
-        if any(word_matches(tw, trw) for trw in trail_words):
-            matches += 1
-    
-    # Require ALL significant target words to match (strict)
-    # This prevents 'Bridalveil Falls' from matching 'Vernal Falls' (only 'falls' matches)
-    return matches == len(target_words)
+    For matching one query against many trails, use TrailNameIndex.search.
+    """
+    return _words_match(_name_words(target), _name_words(trail_name))
+
+
+# --- Trail name index ---
+# Shared by ranking merge, review targeting and trail dedupe: every name is normalized
+# once, and a lookup only scores the few names sharing a word with the query instead
+# of scanning all of them.
+
+# Words that don't distinguish one trail from another
+NAME_STOPWORDS = {"trail", "trailhead", "trails", "hike", "path", "via", "the", "to", "and", "of", "a"}
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+
+def trail_name_key(name: str) -> str:
+    """Compact comparison key: 'Emerald Pools Trail' -> 'emeraldpools', 'X Falls via Y' -> 'xfally'."""
+    n = (name or "").lower()
+    n = n.replace(" trailhead", "").replace(" trail", "")
+    n = n.replace(" falls", " fall").replace(" via ", " ")
+    return _NON_ALNUM_RE.sub('', n)
+
+
+def trail_name_tokens(name: str) -> List[str]:
+    """Significant words of a name, apostrophes dropped and plurals folded ('Angel's Falls' -> ['angel', 'fall'])."""
+    words = _NON_ALNUM_RE.split((name or "").lower().replace("'", "").replace("’", ""))
+    return [w[:-1] if len(w) > 3 and w.endswith('s') else w for w in words if w and w not in NAME_STOPWORDS]
+
+
+class TrailNameMatch(NamedTuple):
+    item: Any
+    name: str
+    score: float  # 1.0 = same key / same significant words; lower = looser match
+    kind: str     # "exact", "contains", "all_words" or "any_words"
+
+
+class TrailNameIndex:
+    """
+    Normalized keys plus a word -> trail inverted index over a list of trails (dicts,
+    models or plain names).
+
+    match() tries the exact key, then scores containment ("angelslanding" in
+    "angelslandingviawestrim") only among the max_candidates names sharing the most
+    words with the query.
+
+    search() resolves a query with fuzzy_match_trail_name semantics ("all_words":
+    every significant query word must match) or ranks partial word overlap
+    ("any_words"), reading only the trails listed under the query's words.
+    """
+    def __init__(
+        self,
+        items: List[Any],
+        name_of: Optional[Callable[[Any], str]] = None,
+        key_fn: Callable[[str], str] = trail_name_key,
+        max_candidates: int = 25
+    ):
+        self.items = list(items)
+        self.name_of = name_of or _default_name_of
+        self.key_fn = key_fn
+        self.max_candidates = max_candidates
+
+        self.names = [self.name_of(item) or "" for item in self.items]
+        self.keys = [key_fn(name) for name in self.names]
+        self.by_key: Dict[str, List[int]] = {}
+        self.by_token: Dict[str, List[int]] = {}
+        for i, (name, key) in enumerate(zip(self.names, self.keys)):
+            self.by_key.setdefault(key, []).append(i)
+            for token in set(trail_name_tokens(name)):
+                self.by_token.setdefault(token, []).append(i)
+
+        # Significant words for the fuzzy modes, listed under their plural-folded form
+        self.words = [_name_words(name) for name in self.names]
+        self.by_word: Dict[str, List[int]] = {}
+        self._word_folds: List[Set[str]] = []
+        self._wordless: List[int] = []  # names matched by containment only
+        for i, (_, words) in enumerate(self.words):
+            folds = {w.rstrip('s') for w in words}
+            self._word_folds.append(folds)
+            if not folds:
+                self._wordless.append(i)
+            for fold in folds:
+                self.by_word.setdefault(fold, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def groups(self) -> Dict[str, List[Any]]:
+        """Items grouped by key, in first-seen order."""
+        return {key: [self.items[i] for i in ids] for key, ids in self.by_key.items()}
+
+    def candidates(self, name: str) -> List[int]:
+        """Indices of the names sharing the most words with `name` (at most max_candidates)."""
+        shared: Dict[int, int] = {}
+        for token in set(trail_name_tokens(name)):
+            for i in self.by_token.get(token, ()):
+                shared[i] = shared.get(i, 0) + 1
+        return sorted(shared, key=lambda i: (-shared[i], i))[:self.max_candidates]
+
+    def match(self, name: str, min_score: float = 0.0, query_within: bool = False) -> Optional[TrailNameMatch]:
+        """
+        Best match for a name, or None.
+        query_within=True only accepts trails whose key contains the query's, so a more
+        specific query ('Upper Bristlecone Loop') never resolves to a generic trail.
+        """
+        key = self.key_fn(name)
+        if not key:
+            return None
+        exact = self.by_key.get(key)
+        if exact:
+            return TrailNameMatch(self.items[exact[0]], self.names[exact[0]], 1.0, "exact")
+
+        best, best_score = None, 0.0
+        for i in self.candidates(name):
+            other = self.keys[i]
+            if other and (key in other or (other in key and not query_within)):
+                score = min(len(key), len(other)) / max(len(key), len(other))
+                if score >= min_score and score > best_score:
+                    best, best_score = i, score
+        if best is None:
+            return None
+        return TrailNameMatch(self.items[best], self.names[best], round(best_score, 3), "contains")
+
+    def search(self, query: str, mode: str = "all_words", limit: Optional[int] = None) -> List[TrailNameMatch]:
+        """
+        Trails matching a query, best first (ties keep list order).
+
+        Modes:
+            "all_words": fuzzy_match_trail_name(query, name) semantics; scored by the share
+                of the trail's significant words the query covers
+            "any_words": at least one significant word in common; scored by the share of
+                query words matched
+        """
+        target = _name_words(query)
+        target_lower, target_words = target
+        folds = {w.rstrip('s') for w in target_words}
+        if not folds:
+            # No significant words: containment against every name
+            ids = range(len(self.items))
+        elif mode == "all_words":
+            postings = sorted((self.by_word.get(f, []) for f in folds), key=len)
+            common = set(postings[0]).intersection(*postings[1:])
+            ids = sorted(common.union(self._wordless))
+        elif mode == "any_words":
+            ids = sorted({i for f in folds for i in self.by_word.get(f, ())})
+        else:
+            raise ValueError(f"Unknown match mode: {mode}")
+
+        results = []
+        for i in ids:
+            trail_words = self.words[i][1]
+            if mode == "all_words" or not folds:
+                if not _words_match(target, self.words[i]):
+                    continue
+                score = len(target_words) / len(trail_words) if target_words and trail_words else 1.0
+            else:
+                matched = sum(1 for tw in target_words if any(_word_matches(tw, trw) for trw in trail_words))
+                if not matched:
+                    continue
+                score = matched / len(target_words)
+            results.append(TrailNameMatch(self.items[i], self.names[i], round(min(score, 1.0), 3), mode))
+
+        results.sort(key=lambda m: -m.score)
+        return results[:limit] if limit else results
+
+    def matching_names(self, queries: Iterable[str]) -> Set[str]:
+        """Names matching any of the queries ("all_words" mode)."""
+        return {m.name for query in queries for m in self.search(query)}
+
+    def mentioned_in(self, text: str) -> Set[str]:
+        """Names whose significant words all appear in a free-text string (fuzzy_match_trail_name(name, text))."""
+        text_words = _name_words(text)
+        if not text_words[1]:
+            ids = range(len(self.items))
+        else:
+            hits: Dict[int, int] = {}
+            for fold in {w.rstrip('s') for w in text_words[1]}:
+                for i in self.by_word.get(fold, ()):
+                    hits[i] = hits.get(i, 0) + 1
+            ids = [i for i, n in hits.items() if n == len(self._word_folds[i])] + self._wordless
+        return {self.names[i] for i in ids if _words_match(self.words[i], text_words)}
+
+
+def _default_name_of(item: Any) -> str:
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        return item.get("name", "")
+    return getattr(item, "name", "")
@@ -1,5 +1,7 @@
 import math
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
 
 # Centroids for all 63 US National Parks (plus common abbreviations)
 # Used to filter out "hallucinated" search results (e.g., Bandelier in GRCA)
@@ -47,6 +49,18 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     except (ValueError, TypeError):
         return 9999.9
 
+def haversine_miles(lat, lon, lats, lons) -> np.ndarray:
+    """
+    Vectorized great-circle distance (miles) from one point to arrays of points.
+    NaN coordinates yield NaN distances.
+    """
+    R = 3958.8
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * R * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
 def get_coords(item):
     """
     Extracts valid float lat/lon from an item.
@@ -83,6 +97,128 @@ def get_coords(item):
     return None, None
 
 
+def item_coords(item) -> Tuple[Optional[float], Optional[float]]:
+    """get_coords for dicts or models (location / latitude+longitude attributes)."""
+    if isinstance(item, dict):
+        lat, lon = get_coords(item)
+        if lat is None and "lat" in item and "lon" in item:
+            # Already-normalized points, e.g. mined hubs {"name", "lat", "lon"}
+            try:
+                return float(item["lat"]), float(item["lon"])
+            except (ValueError, TypeError):
+                return None, None
+        return lat, lon
+    loc = getattr(item, "location", None)
+    if loc is not None and getattr(loc, "lat", None) is not None:
+        return float(loc.lat), float(loc.lon)
+    lat, lon = getattr(item, "latitude", None), getattr(item, "longitude", None)
+    try:
+        if lat is not None and lon is not None and str(lat).strip() and str(lon).strip():
+            return float(lat), float(lon)
+    except (ValueError, TypeError):
+        pass
+    return None, None
+
+
+class SpatialIndex:
+    """
+    Grid-bucketed point index with vectorized haversine distances.
+
+    Points are bucketed into cell_deg x cell_deg lat/lon cells; a radius query only
+    measures points in the cells overlapping the query's bounding box.
+    Supports incremental add() (used for greedy dedupe): coordinates live in NumPy
+    arrays that grow by doubling, so queries index them directly without copying.
+    """
+    def __init__(self, cell_deg: float = 0.1):
+        self.cell_deg = cell_deg
+        self.items: List[Any] = []
+        self._lats = np.empty(16)
+        self._lons = np.empty(16)
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+
+    @classmethod
+    def from_items(cls, items: List[Any], cell_deg: float = 0.1) -> "SpatialIndex":
+        """Indexes any items with coordinates (dicts or models); items without coords are skipped."""
+        index = cls(cell_deg=cell_deg)
+        for item in items:
+            lat, lon = item_coords(item)
+            if lat is not None and lon is not None:
+                index.add(lat, lon, item)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def lats(self) -> np.ndarray:
+        return self._lats[:len(self.items)]
+
+    @property
+    def lons(self) -> np.ndarray:
+        return self._lons[:len(self.items)]
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def add(self, lat: float, lon: float, item: Any = None):
+        idx = len(self.items)
+        if idx == len(self._lats):
+            self._lats = np.resize(self._lats, 2 * idx)
+            self._lons = np.resize(self._lons, 2 * idx)
+        self._lats[idx] = lat
+        self._lons[idx] = lon
+        self.items.append(item)
+        self._cells.setdefault(self._cell(lat, lon), []).append(idx)
+
+    def _candidates(self, lat: float, lon: float, radius_miles: float) -> List[int]:
+        # Bounding box in degrees (1° lat ≈ 69 mi; lon shrinks with cos(lat))
+        dlat = radius_miles / 69.0
+        dlon = radius_miles / max(69.0 * math.cos(math.radians(lat)), 1e-6)
+        r0, c0 = self._cell(lat - dlat, lon - dlon)
+        r1, c1 = self._cell(lat + dlat, lon + dlon)
+
+        # Huge radius: a full scan is cheaper than walking the cells
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self._cells):
+            return list(range(len(self.items)))
+
+        found = []
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                found.extend(self._cells.get((r, c), []))
+        return found
+
+    def within(self, lat: float, lon: float, radius_miles: float) -> List[Tuple[Any, float]]:
+        """All (item, distance_miles) within radius, nearest first."""
+        candidates = self._candidates(lat, lon, radius_miles)
+        if not candidates:
+            return []
+        cand = np.array(candidates)
+        dist = haversine_miles(lat, lon, self._lats[cand], self._lons[cand])
+        keep = np.flatnonzero(dist <= radius_miles)
+        keep = keep[np.argsort(dist[keep], kind="stable")]
+        return [(self.items[cand[i]], float(dist[i])) for i in keep]
+
+    def any_within(self, lat: float, lon: float, radius_miles: float) -> bool:
+        candidates = self._candidates(lat, lon, radius_miles)
+        if not candidates:
+            return False
+        cand = np.array(candidates)
+        dist = haversine_miles(lat, lon, self._lats[cand], self._lons[cand])
+        return bool((dist < radius_miles).any())
+
+    def nearest(self, lat: float, lon: float, k: int = 5, max_radius_miles: Optional[float] = None) -> List[Tuple[Any, float]]:
+        """The k nearest (item, distance_miles), nearest first."""
+        if not self.items or k <= 0:
+            return []
+        dist = haversine_miles(lat, lon, self.lats, self.lons)
+        if max_radius_miles is not None:
+            dist = np.where(dist <= max_radius_miles, dist, np.inf)
+        k = min(k, len(dist))
+        top = np.argpartition(dist, k - 1)[:k]
+        top = top[np.argsort(dist[top], kind="stable")]
+        return [(self.items[i], float(dist[i])) for i in top if np.isfinite(dist[i])]
+
+
 def mine_entrances(park_code: str, places_data: List[Dict], vc_data: List[Dict]) -> List[Dict[str, Any]]:
     print(f"[DEBUG] Mining {park_code}. Input: {len(places_data)} Places, {len(vc_data)} VCs")
     
@@ -143,16 +279,13 @@ def mine_entrances(park_code: str, places_data: List[Dict], vc_data: List[Dict])
     # ... (Dedupe & Dominance Logic same as before) ...
     # 3. Deduplicate
     unique = []
+    unique_index = SpatialIndex()
     raw_candidates.sort(key=lambda x: x["type"] == "Entrance", reverse=True)
     
     for c in raw_candidates:
-        is_near = False
-        for u in unique:
-            if calculate_distance(c["lat"], c["lon"], u["lat"], u["lon"]) < 3.0:
-                is_near = True
-                break
-        if not is_near:
+        if not unique_index.any_within(c["lat"], c["lon"], 3.0):
             unique.append(c)
+            unique_index.add(c["lat"], c["lon"], c)
 
     # 4. Entrance Dominance
     final_list = []
@@ -161,13 +294,9 @@ def mine_entrances(park_code: str, places_data: List[Dict], vc_data: List[Dict])
     
     final_list.extend(entrances)
     
+    entrance_index = SpatialIndex.from_items(entrances)
     for vc in vcs:
-        is_redundant = False
-        for ent in entrances:
-            if calculate_distance(vc["lat"], vc["lon"], ent["lat"], ent["lon"]) < 25.0:
-                is_redundant = True
-                break
-        if not is_redundant:
+        if not entrance_index.any_within(vc["lat"], vc["lon"], 25.0):
             final_list.append(vc)
             
     print(f"[DEBUG] Final List: {[c['name'] for c in final_list]}")
@@ -0,0 +1,164 @@
+import re
+from typing import List, Dict, Any, Iterable, Optional
+
+# Positive Signals (title): implies hiking context
+HIKE_KEYWORDS = [
+    "trail", "trailhead", "hike", "hiking", "route", "walk", "loop", "path",
+    "canyon", "rim", "overlook", "point", "junction", "narrows", "landing",
+    "bridge", "mesa", "wash", "access"
+]
+
+# Negative Signals (title): implies non-hike infrastructure
+INFRASTRUCTURE_KEYWORDS = [
+    "visitor center", "museum", "gift shop", "campground", "lodging",
+    "picnic", "restroom", "amphitheater", "station", "office", "entrance",
+    "exhibit", "wayside", "marker", "shuttle stop", "bus stop", "parking",
+    "residence", "village", "hotel", "store", "school", "church"
+]
+
+# Content Signals (description, substring match): words that strongly suggest a hike description
+CONTENT_INDICATORS = ["miles", "km", "elevation", "round-trip", "strenuous", "moderate", "easy", "climb", "hike"]
+
+# Hike keywords that need a hiking description to stay a candidate ("Glacier Point")
+AMBIGUOUS_KEYWORDS = ["overlook", "point"]
+
+# In-park essentials (NPS place amenities, substring match). An amenity containing an
+# exclude keyword never counts for that category ("Food Storage Lockers" is not Food).
+ESSENTIALS_CATEGORIES = {
+    "Restroom": {"keywords": ["restroom", "toilet"], "exclude_keywords": []},
+    "Water": {"keywords": ["water", "bottle"], "exclude_keywords": []},
+    "Food": {"keywords": ["food", "restaurant", "dining"], "exclude_keywords": ["food storage", "animal-safe"]},
+    "Picnic": {"keywords": ["picnic"], "exclude_keywords": []},
+    "Medical": {"keywords": ["first aid", "medical", "aed", "emergency"], "exclude_keywords": []},
+    "Shuttle": {"keywords": ["shuttle", "bus"], "exclude_keywords": []},
+}
+
+# Description fields used by classify_places (Places use listingDescription/bodyText, ThingsToDo short/longDescription)
+DESCRIPTION_FIELDS = ["listingDescription", "bodyText", "shortDescription", "longDescription"]
+
+
+class KeywordMatcher:
+    """
+    Precompiled matcher for one keyword class.
+
+    whole_word=True matches like r'\\bkeyword\\b', using one alternation regex whose
+    lookahead lets a single scan report every keyword present (even overlapping ones).
+    whole_word=False is a plain substring test; str's C substring search beats a
+    regex scan for a handful of keywords over long descriptions.
+    """
+    def __init__(self, keywords: Iterable[str], whole_word: bool = True):
+        self.keywords = [kw.lower() for kw in keywords]
+        self.whole_word = whole_word
+        self._regex = None
+        if whole_word:
+            # Longest first so e.g. 'trailhead' is tried before 'trail' at the same position
+            alternation = "|".join(re.escape(kw) for kw in sorted(set(self.keywords), key=len, reverse=True))
+            self._regex = re.compile(rf"\b(?=({alternation})\b)")
+
+    def find(self, text: str, lowered: bool = False) -> List[str]:
+        """Keywords present in text (case-insensitive), in keyword-list order."""
+        if not text:
+            return []
+        if not lowered:
+            text = text.lower()
+        if not self.whole_word:
+            return [kw for kw in self.keywords if kw in text]
+        found = {m.group(1) for m in self._regex.finditer(text)}
+        return [kw for kw in self.keywords if kw in found]
+
+    def search(self, text: str) -> bool:
+        return bool(self.find(text))
+
+
+HIKE_MATCHER = KeywordMatcher(HIKE_KEYWORDS)
+INFRASTRUCTURE_MATCHER = KeywordMatcher(INFRASTRUCTURE_KEYWORDS)
+CONTENT_MATCHER = KeywordMatcher(CONTENT_INDICATORS, whole_word=False)
+
+
+def classify_place(item: Dict[str, Any], desc_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Stage 1 broad-recall check: is this NPS place/thing-to-do a likely hike candidate?
+
+    Args:
+        item: Raw NPS places/thingstodo item
+        desc_fields: Description fields to scan (defaults to DESCRIPTION_FIELDS)
+
+    Returns:
+        {"is_trail", "reason", "hike_keywords", "infrastructure_keywords", "content_indicators"}
+        where reason is 'infrastructure', 'hike_keyword', 'content_indicators' or 'no_match'.
+    """
+    title = item.get("title", "") or ""
+    desc_lower = " ".join(item.get(f) or "" for f in (desc_fields or DESCRIPTION_FIELDS)).lower()
+
+    hike_keywords = HIKE_MATCHER.find(title)
+    infrastructure_keywords = INFRASTRUCTURE_MATCHER.find(title)
+    content_indicators = CONTENT_MATCHER.find(desc_lower, lowered=True)
+    has_content_indicators = len(content_indicators) >= 2
+
+    # LOGIC: infrastructure words in the title always win; otherwise a hike keyword in
+    # the title, or a description talking about miles/elevation, makes it a candidate.
+    if infrastructure_keywords:
+        reason, is_trail = "infrastructure", False
+    elif hike_keywords:
+        reason, is_trail = "hike_keyword", True
+    elif has_content_indicators:
+        reason, is_trail = "content_indicators", True
+    else:
+        reason, is_trail = "no_match", False
+
+    # Ambiguity Handling: "Overlook" or "Point" stay only if the description reads like a hike
+    if is_trail and any(kw in hike_keywords for kw in AMBIGUOUS_KEYWORDS):
+        is_hike_desc = "trail" in desc_lower or "hike" in desc_lower
+        if not has_content_indicators and not is_hike_desc:
+            is_trail = False
+
+    return {
+        "is_trail": is_trail,
+        "reason": reason,
+        "hike_keywords": hike_keywords,
+        "infrastructure_keywords": infrastructure_keywords,
+        "content_indicators": content_indicators,
+    }
+
+
+class CategoryClassifier:
+    """
+    Assigns items to categories from their amenity strings.
+
+    Each distinct amenity string is matched against every category once and the
+    result memoized; NPS parks reuse a small vocabulary ("Restroom", "Water - Bottle-
+    Filling Station", ...) across hundreds of places, so classifying a place is
+    mostly a set union over cached lookups.
+    """
+    def __init__(self, categories: Dict[str, Dict[str, List[str]]]):
+        self.categories = list(categories)
+        self._include = {name: KeywordMatcher(spec["keywords"], whole_word=False) for name, spec in categories.items()}
+        self._exclude = {name: KeywordMatcher(spec.get("exclude_keywords", []), whole_word=False) for name, spec in categories.items()}
+        self._by_amenity: Dict[str, frozenset] = {}
+
+    def amenity_categories(self, amenity: str) -> frozenset:
+        """Categories a single amenity string belongs to."""
+        key = str(amenity).lower()
+        cached = self._by_amenity.get(key)
+        if cached is None:
+            cached = frozenset(
+                name for name in self.categories
+                if self._include[name].find(key, lowered=True) and not self._exclude[name].find(key, lowered=True)
+            )
+            self._by_amenity[key] = cached
+        return cached
+
+    def classify(self, amenities: Iterable[str]) -> List[str]:
+        """Categories matched by any of the amenities, in category-table order."""
+        found = set()
+        for amenity in amenities or []:
+            found |= self.amenity_categories(amenity)
+        return [name for name in self.categories if name in found]
+
+
+ESSENTIALS_CLASSIFIER = CategoryClassifier(ESSENTIALS_CATEGORIES)
+
+
+def classify_essentials(amenities: Iterable[str]) -> List[str]:
+    """In-park essentials categories (ESSENTIALS_CATEGORIES) for an NPS place's amenities."""
+    return ESSENTIALS_CLASSIFIER.classify(amenities)
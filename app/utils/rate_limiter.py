@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+import multiprocessing
+from collections import Counter
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 / quota errors from Gemini (google-genai) or requests."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    response = getattr(error, "response", None)
+    if code is None and response is not None:
+        code = getattr(response, "status_code", None)
+    if code == 429:
+        return True
+    text = str(error).lower()
+    return "429" in text or "resource_exhausted" in text or "rate limit" in text or "quota" in text
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe AIMD rate limiter.
+
+    Callers acquire() before each request. The allowed rate creeps up additively after
+    each success (up to max_rate) and is halved on a 429, with a cooldown pause so
+    in-flight callers back off together.
+    """
+    def __init__(
+        self,
+        rate_per_sec: float = 2.0,
+        min_rate: float = 0.2,
+        max_rate: float = 10.0,
+        increase_step: float = 0.1,
+        cooldown_sec: float = 5.0,
+        name: str = "api"
+    ):
+        self.rate = rate_per_sec
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.cooldown_sec = cooldown_sec
+        self.name = name
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until the caller may send the next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._paused_until)
+            self._next_slot = slot + 1.0 / self.rate
+        wait = slot - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            pause = retry_after if retry_after is not None else self.cooldown_sec
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        logger.warning(f"⏳ {self.name} rate limited; backing off to {self.rate:.2f} req/s for {pause:.0f}s")
+
+
+class SharedRateLimiter:
+    """
+    Fixed-rate limiter shared by several processes (e.g. a batch onboarding pool).
+
+    The next free slot lives in shared memory, so every worker process created with
+    this limiter (passed via the pool initializer) draws from one global budget.
+    """
+    def __init__(self, rate_per_sec: float, name: str = "api", ctx=None):
+        ctx = ctx or multiprocessing.get_context()
+        self.rate = rate_per_sec
+        self.name = name
+        self._next_slot = ctx.Value("d", 0.0, lock=False)
+        self._lock = ctx.Lock()
+
+    def acquire(self):
+        """Blocks until the caller may send the next request."""
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + 1.0 / self.rate
+        wait = slot - time.time()
+        if wait > 0:
+            time.sleep(wait)
+
+
+# --- Per-API throttling hooks ---
+# Clients call throttle("<api>") before each request. With no limiter registered this
+# only counts the call, so the app pays nothing; batch jobs register shared limiters.
+_api_limiters: Dict[str, Any] = {}
+_api_calls: Counter = Counter()
+_api_calls_lock = threading.Lock()
+
+
+def set_api_limiter(api: str, limiter: Optional[Any]):
+    """Registers (or with None, removes) the limiter every `api` request in this process waits on."""
+    if limiter is None:
+        _api_limiters.pop(api, None)
+    else:
+        _api_limiters[api] = limiter
+
+
+def throttle(api: str):
+    """Waits for the API's registered limiter (if any) and counts the call."""
+    limiter = _api_limiters.get(api)
+    if limiter is not None:
+        limiter.acquire()
+    with _api_calls_lock:
+        _api_calls[api] += 1
+
+
+def api_call_counts() -> Dict[str, int]:
+    """Calls per API made by this process so far."""
+    with _api_calls_lock:
+        return dict(_api_calls)
@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+import time
 import logging
 from dotenv import load_dotenv
 
@@ -12,13 +13,10 @@ load_dotenv(override=True)
 
 # App imports
 # App imports
-from app.orchestrator import OutdoorConciergeOrchestrator, SessionContext
-from app.clients.nps_client import NPSClient
-from app.clients.weather_client import WeatherClient
-from app.clients.external_client import ExternalClient
-from app.services.llm_service import GeminiLLMService
-from app.services.park_data_fetcher import ParkDataFetcher
-from app.ui.data_access import get_park_static_data, get_volatile_data, clear_volatile_cache
+from app.orchestrator import SessionContext
+from app.services.registry import get_services
+from app.services.job_queue import JobQueue, start_workers, ACTIVE_STATES, COMPLETED, FAILED
+from app.ui.data_access import get_park_static_data, get_volatile_data, clear_volatile_cache, invalidate_park_data
 
 # Config & Styles
 from app.config import (
@@ -94,6 +92,8 @@ if "selected_park" not in st.session_state:
     st.session_state.selected_park = DEFAULT_PARK
 
 # --- 2. Service Initialization (Cached) ---
+# Clients, DataManager and fetchers live in the process-wide ServiceRegistry,
+# shared with data access helpers and every session
 @st.cache_resource
 def get_orchestrator():
     if not os.getenv("NPS_API_KEY") or not os.getenv("GEMINI_API_KEY") or not os.getenv("WEATHER_API_KEY"):
@@ -101,19 +101,23 @@ def get_orchestrator():
         return None
 
     try:
-        orchestrator = OutdoorConciergeOrchestrator(
-            llm_service=GeminiLLMService(api_key=os.getenv("GEMINI_API_KEY")),
-            nps_client=NPSClient(),
-            weather_client=WeatherClient(),
-            external_client=ExternalClient()
-        )
-        return orchestrator
+        return get_services().orchestrator
     except Exception as e:
         logger.error(f"Failed to initialize orchestrator: {e}")
         return None
 
 orchestrator = get_orchestrator()
 
+# Park data onboarding jobs run in worker processes shared by all sessions
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_SECONDS = 2
+
+@st.cache_resource
+def get_job_queue():
+    job_queue = JobQueue()
+    start_workers(JOB_WORKERS, job_queue.db_path)
+    return job_queue
+
 # --- 2b. Handle Deep Linking (Query Params) ---
 # Check early to redirect before rendering
 if "view" in st.query_params:
@@ -135,6 +139,7 @@ with st.sidebar:
     st.markdown("<div style='height: 100vh;'></div>", unsafe_allow_html=True)
 
 # --- 4. Load Data ---
+# Both are cached across reruns/sessions (see app/ui/data_access.py)
 park_code = st.session_state.selected_park
 nps_client = orchestrator.nps if orchestrator else None
 static_data = get_park_static_data(park_code, nps_client=nps_client)
@@ -245,7 +250,7 @@ with tab_explorer:
     st.header(f"Exploring {SUPPORTED_PARKS[st.session_state.selected_park]}")
     
     # Check if park has data before rendering
-    fetcher = ParkDataFetcher(nps_client=orchestrator.nps if orchestrator else None)
+    fetcher = get_services().park_fetcher
     
     # Check for missing explorer-critical files (trails, photos, drives matter for Explorer tab)
     EXPLORER_CRITICAL_FILES = ["trails_v2.json", "photo_spots.json", "scenic_drives.json"]
@@ -272,43 +277,40 @@ with tab_explorer:
             for m in missing:
                 st.write(f"• {m}")
         
+        # Onboarding runs in background worker processes; this run only submits and polls,
+        # so a refresh (or another user on the same park) picks up the same job.
+        job_queue = get_job_queue()
+        job = job_queue.latest_job(park_code)
+        
+        if job and job["status"] in ACTIVE_STATES:
+            st.info(f"⏳ Fetching data for {SUPPORTED_PARKS.get(park_code, park_code)} in the background "
+                    f"(you can keep browsing other parks).")
+            total = job["progress_total"] or 0
+            st.progress(min(job["progress_current"] / total, 1.0) if total else 0.0)
+            st.caption(job["message"] or "Working...")
+            time.sleep(JOB_POLL_SECONDS)
+            st.rerun()
+        
+        if job and job["status"] == FAILED:
+            st.error(f"❌ Last data fetch failed: {job['error']}")
+            st.info("Please try again in a few minutes.")
+        elif job and job["status"] == COMPLETED:
+            # Finished but some fixtures are still missing: surface the failed operations
+            for op_name, op_result in (job["result"] or {}).get("operations", {}).items():
+                if isinstance(op_result, dict) and "error" in op_result:
+                    st.error(f"{op_name}: {op_result['error']}")
+        
         if st.button("🚀 Fetch Park Data", type="primary"):
-            with st.spinner("Fetching data... This may take a few minutes."):
-                progress = st.progress(0)
-                status_text = st.empty()
-                
-                def update_progress(current, total, message):
-                    if total > 0:
-                        progress.progress(current / total)
-                    status_text.text(message)
-                
-                try:
-                    result = fetcher.ensure_park_data(
-                        park_code,
-                        include_trails=True,
-                        include_rankings=True,
-                        include_photo_spots=True,
-                        include_scenic_drives=True,
-                        include_amenities=True,
-                        progress_callback=update_progress
-                    )
-                    
-                    # Show results
-                    success_count = sum(1 for v in result.get("operations", {}).values() if isinstance(v, dict) and "error" not in v)
-                    total_ops = len(result.get("operations", {}))
-                    
-                    st.success(f"✅ Data fetched! {success_count}/{total_ops} operations successful.")
-                    
-                    # Show any errors
-                    for op_name, op_result in result.get("operations", {}).items():
-                        if isinstance(op_result, dict) and "error" in op_result:
-                            st.error(f"{op_name}: {op_result['error']}")
-                    
-                    st.rerun()  # Reload with new data
-                    
-                except Exception as e:
-                    st.error(f"❌ Error fetching data: {e}")
-                    st.info("Please try again in a few minutes.")
+            job_queue.submit(
+                park_code,
+                include_trails=True,
+                include_rankings=True,
+                include_photo_spots=True,
+                include_scenic_drives=True,
+                include_amenities=True
+            )
+            invalidate_park_data(park_code)
+            st.rerun()
         
         st.stop()  # Don't render the rest of the explorer
     
@@ -348,7 +350,11 @@ with tab_explorer:
         render_photo_spots(static_data.get("photo_spots", []))
 
     elif selected_view == "Scenic Drives":
-        render_scenic_drives(static_data.get("scenic_drives", []), alerts=volatile_data.get("alerts", []))
+        render_scenic_drives(
+            static_data.get("scenic_drives", []),
+            alerts=volatile_data.get("alerts", []),
+            alert_matches=(volatile_data.get("alert_matches") or {}).get("scenic_drives")
+        )
 
     elif selected_view == "Activities & Events":
         # Internal sub-navigation using Radio Buttons
@@ -366,7 +372,8 @@ with tab_explorer:
             
         elif activity_view == "Upcoming Events":
             render_events_list(
-                volatile_data.get("events", [])
+                volatile_data.get("events", []),
+                event_index=volatile_data.get("event_index")
             )
 
     elif selected_view == "Webcams":
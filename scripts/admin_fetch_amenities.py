@@ -1,13 +1,18 @@
 import os
+import sys
 import logging
 from typing import Dict, List, Any, Callable
 from dotenv import load_dotenv
 
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
 # App Imports
 from app.clients.nps_client import NPSClient
-from app.clients.external_client import ExternalClient
+from app.clients.external_client import ExternalClient, place_key
 from app.utils.geospatial import mine_entrances
 from app.services.data_manager import DataManager
+from scripts.refine_amenities import consolidate_park, hub_display_name, save_consolidated_amenities
 
 # Setup
 logging.basicConfig(level=logging.INFO)
@@ -45,7 +50,8 @@ def fetch_amenities_for_park(
         progress_callback: Optional callback(current, total, message)
         
     Returns:
-        Dict with hubs and their amenities
+        Dict with hubs and their raw amenities, plus the "consolidated" structure
+        written to amenities_consolidated.json
         
     Raises:
         ValueError: If API keys not found
@@ -79,51 +85,60 @@ def fetch_amenities_for_park(
         logger.warning(f"No entrances found for {park_code}")
         return {"park_code": park_code, "hubs": {}}
     
-    result = {"park_code": park_code, "hubs": {}}
-    total_tasks = len(entrances) * len(TASKS)
-    completed = 0
+    # 2. Plan every missing (hub, query, zoom) search; cached categories are reused
+    hub_data = {ent["name"]: dm.load_amenities(park_code, ent["name"]) for ent in entrances}
+    pending = [
+        (ent["name"], query, zoom, ent["lat"], ent["lon"])
+        for ent in entrances
+        for query, zoom in TASKS
+        if not hub_data[ent["name"]].get(query)
+    ]
     
-    for i, ent in enumerate(entrances):
-        name = ent["name"]
-        lat = ent["lat"]
-        lon = ent["lon"]
-        
-        if progress_callback:
-            progress_callback(i + 1, len(entrances) + 1, f"Searching amenities near {name}...")
-        
-        # Check existing data
-        current_data = dm.load_amenities(park_code, name)
-        changes = False
+    if progress_callback:
+        progress_callback(1, 3, f"Searching {len(pending)} amenity queries across {len(entrances)} hubs...")
+    
+    # 3. Fan out all searches concurrently under one Serper rate limit
+    if pending:
+        responses = ext.search_maps_bulk([(query, lat, lon, zoom) for _, query, zoom, lat, lon in pending])
         
-        # Run tasks
-        for query, zoom in TASKS:
-            if query in current_data and current_data[query]:
-                completed += 1
-                continue
-            
-            try:
-                amenities = ext.search_maps(query, lat, lon, zoom)
-                current_data[query] = [a.model_dump() for a in amenities]
-                changes = True
-                completed += 1
-            except Exception as e:
-                logger.error(f"Error fetching {query} for {name}: {e}")
+        # Overlapping hubs return the same places; store one record per place
+        places_by_key = {}
+        changed_hubs = set()
+        for (name, query, _, _, _), amenities in zip(pending, responses):
+            hub_data[name][query] = [
+                places_by_key.setdefault(place_key(a), a.model_dump()) for a in amenities
+            ]
+            changed_hubs.add(name)
         
-        # Save
-        if changes:
-            dm.save_amenities(park_code, name, current_data)
+        total_results = sum(len(r) for r in responses)
+        logger.info(f"Fetched {total_results} results ({len(places_by_key)} unique places) for {park_code}")
         
-        result["hubs"][name] = {
-            "location": {"lat": lat, "lon": lon},
-            "amenities": current_data
+        for name in changed_hubs:
+            dm.save_amenities(park_code, name, hub_data[name])
+    
+    # 4. Build the consolidated file directly from the fetched data
+    if progress_callback:
+        progress_callback(2, 3, "Consolidating amenity data...")
+    
+    result = {"park_code": park_code, "hubs": {}}
+    for ent in entrances:
+        result["hubs"][ent["name"]] = {
+            "location": {"lat": ent["lat"], "lon": ent["lon"]},
+            "amenities": hub_data[ent["name"]]
         }
+    consolidated, index = consolidate_park(park_code, [
+        {"name": hub_display_name(dm.amenity_slug(ent["name"])), "lat": ent["lat"], "lon": ent["lon"],
+         "amenities": hub_data[ent["name"]]}
+        for ent in entrances
+    ])
+    save_consolidated_amenities(consolidated, dm.base_dir, index)
+    result["consolidated"] = consolidated
     
     if progress_callback:
-        progress_callback(len(entrances) + 1, len(entrances) + 1, f"Completed amenity fetch for {park_code}")
+        progress_callback(3, 3, f"Completed amenity fetch for {park_code}")
     
     return result
 
-
 def main():
     """CLI entry point for manual execution."""
     print("--- 🛠️ Admin Tool: Pre-Fetch Park Amenities ---")
@@ -24,7 +24,6 @@ Arguments:
 import os
 import sys
 import json
-import re
 import argparse
 from datetime import datetime
 from dotenv import load_dotenv
@@ -37,21 +36,11 @@ load_dotenv()
 from app.clients.nps_client import NPSClient
 from app.services.data_manager import DataManager
 
-# Classification keywords (same as fetch_static_nps.py)
-HIKE_KEYWORDS = [
-    "trail", "trailhead", "hike", "hiking", "route", "walk", "loop", "path", 
-    "canyon", "rim", "overlook", "point", "junction", "narrows", "landing", 
-    "bridge", "mesa", "wash", "access"
-]
+# Classification keywords and logic shared with fetch_static_nps.classify_places
+from app.utils.keyword_classifier import classify_place
 
-INFRASTRUCTURE_KEYWORDS = [
-    "visitor center", "museum", "gift shop", "campground", "lodging", 
-    "picnic", "restroom", "amphitheater", "station", "office", "entrance", 
-    "exhibit", "wayside", "marker", "shuttle stop", "bus stop", "parking",
-    "residence", "village", "hotel", "store", "school", "church"
-]
-
-CONTENT_INDICATORS = ["miles", "km", "elevation", "round-trip", "strenuous", "moderate", "easy", "climb", "hike"]
+# analyze_item also looks at activityDescription
+ANALYSIS_DESC_FIELDS = ["shortDescription", "longDescription", "listingDescription", "bodyText", "activityDescription"]
 
 
 def divider(title: str, char: str = "="):
@@ -62,12 +51,6 @@ def divider(title: str, char: str = "="):
     print(f"{char * width}\n")
 
 
-def contains_whole_word(text: str, keyword: str) -> bool:
-    """Check if a whole word exists in text."""
-    pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-    return bool(re.search(pattern, text.lower()))
-
-
 def analyze_item(item: dict) -> dict:
     """Analyze a single NPS item for trail classification signals."""
     title = item.get("title", "Unknown")
@@ -82,13 +65,9 @@ def analyze_item(item: dict) -> dict:
     }
     
     desc_combined = " ".join(v for v in desc_fields.values() if v)
-    title_lower = title.lower()
-    desc_lower = desc_combined.lower()
     
-    # Classification analysis
-    found_hike_kw = [kw for kw in HIKE_KEYWORDS if contains_whole_word(title_lower, kw)]
-    found_infra_kw = [kw for kw in INFRASTRUCTURE_KEYWORDS if contains_whole_word(title_lower, kw)]
-    found_content = [w for w in CONTENT_INDICATORS if w in desc_lower]
+    # Classification analysis (same classifier as classify_places in fetch_static_nps.py)
+    classification = classify_place(item, desc_fields=ANALYSIS_DESC_FIELDS)
     
     # Activities from the item
     activities = item.get("activities", [])
@@ -101,44 +80,20 @@ def analyze_item(item: dict) -> dict:
     if isinstance(location, dict):
         has_location = bool(location.get("lat") and location.get("lon"))
     
-    # Classification logic (mirrors classify_places in fetch_static_nps.py)
-    is_infrastructure = any(contains_whole_word(title_lower, kw) for kw in INFRASTRUCTURE_KEYWORDS)
-    has_hike_keyword = any(contains_whole_word(title_lower, kw) for kw in HIKE_KEYWORDS)
-    has_content_indicators = sum(1 for w in CONTENT_INDICATORS if w in desc_lower) >= 2
-    
-    would_classify = False
-    if is_infrastructure:
-        would_classify = False
-    elif has_hike_keyword:
-        would_classify = True
-    elif has_content_indicators:
-        would_classify = True
-    
-    # Overlook/Point special handling
-    if contains_whole_word(title_lower, "overlook") or contains_whole_word(title_lower, "point"):
-        is_hike_desc = "trail" in desc_lower or "hike" in desc_lower
-        if not has_content_indicators and not is_hike_desc:
-            would_classify = False
-    
     return {
         "title": title,
         "id": item.get("id", ""),
         "description_length": len(desc_combined),
         "description_preview": desc_combined[:150] + "..." if len(desc_combined) > 150 else desc_combined,
-        "hike_keywords_found": found_hike_kw,
-        "infrastructure_keywords_found": found_infra_kw,
-        "content_indicators_found": found_content,
+        "hike_keywords_found": classification["hike_keywords"],
+        "infrastructure_keywords_found": classification["infrastructure_keywords"],
+        "content_indicators_found": classification["content_indicators"],
         "activities": activity_names,
         "has_hiking_activity": has_hiking_activity,
         "has_location": has_location,
         "duration": item.get("duration", ""),
-        "would_classify_as_trail": would_classify,
-        "classification_reason": (
-            "infrastructure" if is_infrastructure else
-            "hike_keyword" if has_hike_keyword else
-            "content_indicators" if has_content_indicators else
-            "no_match"
-        )
+        "would_classify_as_trail": classification["is_trail"],
+        "classification_reason": classification["reason"]
     }
 
 
@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from typing import Dict, List, Any, Optional
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from app.models import Place, Campground
+from app.services.data_manager import DataManager
+from app.engine.amenity_table import AmenityTable
+from app.engine.map_layers import (
+    hub_services_features, in_park_features, trail_features, layers_version,
+    HUB_SERVICES_LAYER, IN_PARK_LAYER, TRAILS_LAYER
+)
+from app.ui.trail_table import build_trail_frame
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Constants
+DATA_DIR = "data_samples/ui_fixtures"
+
+
+def _load_models(data_manager: DataManager, park_code: str, filename: str, model_class) -> List[Any]:
+    items = []
+    for raw in data_manager.load_fixture(park_code, filename) or []:
+        try:
+            items.append(model_class(**raw))
+        except Exception as e:
+            logger.warning(f"Skipping invalid entry in {park_code}/{filename}: {e}")
+    return items
+
+
+def export_park_layers(park_code: str, data_manager: Optional[DataManager] = None) -> Dict[str, int]:
+    """
+    Writes the park's map layers as GeoJSON FeatureCollections (layers/<name>.geojson):
+    hub services, in-park services (places + campgrounds) and trails, each feature
+    carrying its category, icon, color, popup HTML and tooltip.
+
+    Trail popups are exported without the daily weather badge.
+
+    Args:
+        park_code: Park to export
+        data_manager: DataManager for the fixture directory (defaults to DATA_DIR)
+
+    Returns:
+        {layer name: feature count}
+    """
+    data_manager = data_manager or DataManager(base_dir=DATA_DIR)
+    park_code = park_code.upper()
+    park_dir = os.path.join(data_manager.base_dir, park_code)
+    if not os.path.isdir(park_dir):
+        raise FileNotFoundError(f"Park directory not found: {park_dir}")
+
+    layers = {}
+
+    # 1. Hub services (consolidated amenities + hub entrances)
+    consolidated = data_manager.load_consolidated_amenities(park_code)
+    if consolidated and "hubs" in consolidated:
+        table = AmenityTable.from_consolidated(park_code, consolidated, data_manager.load_amenity_index(park_code))
+        layers[HUB_SERVICES_LAYER] = hub_services_features(table.hub_view())
+
+    # 2. In-park services
+    places = _load_models(data_manager, park_code, "places.json", Place)
+    campgrounds = _load_models(data_manager, park_code, "campgrounds.json", Campground)
+    if places or campgrounds:
+        layers[IN_PARK_LAYER] = in_park_features(places, campgrounds)
+
+    # 3. Trails
+    trails = data_manager.load_fixture(park_code, "trails_v2.json") or []
+    if trails:
+        layers[TRAILS_LAYER] = trail_features(build_trail_frame(trails, alert_matches={}).to_dict("records"))
+
+    version = layers_version(data_manager, park_code)
+    for name, collection in layers.items():
+        collection["park_code"] = park_code
+        collection["source_version"] = version
+        data_manager.save_geojson_layer(park_code, name, collection)
+
+    counts = {name: len(collection["features"]) for name, collection in layers.items()}
+    logger.info(f"🗺️ Exported map layers for {park_code}: {counts}")
+    return counts
+
+
+def export_layers_batch(park_codes: Optional[List[str]] = None, data_dir: str = DATA_DIR) -> Dict[str, Any]:
+    """
+    Exports many parks in one run.
+
+    Args:
+        park_codes: Parks to process; None = every park directory
+        data_dir: Base directory for fixture data
+
+    Returns:
+        {park_code: {layer name: feature count}, or {"error": str}}
+    """
+    data_manager = DataManager(base_dir=data_dir)
+    if park_codes is None:
+        park_codes = sorted(d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)))
+
+    start = time.perf_counter()
+    summary = {}
+    for park_code in park_codes:
+        try:
+            summary[park_code.upper()] = export_park_layers(park_code, data_manager)
+        except FileNotFoundError as e:
+            logger.warning(f"Skipping {park_code}: {e}")
+            summary[park_code.upper()] = {"error": str(e)}
+    logger.info(f"⏱️ Exported map layers for {len(park_codes)} parks in {time.perf_counter() - start:.2f}s")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export park map layers as GeoJSON")
+    parser.add_argument("parks", nargs="*", help="Park codes (default: every park)")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args()
+
+    print(export_layers_batch(args.parks or None, args.data_dir))
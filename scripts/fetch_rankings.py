@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import time
 import re
@@ -7,6 +8,12 @@ from datetime import datetime
 from typing import List, Dict, Optional, Any
 from dotenv import load_dotenv
 
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from app.utils.rate_limiter import throttle
+from app.utils.fuzzy_match import TrailNameIndex, trail_name_key
+
 # Load environment variables
 load_dotenv()
 
@@ -77,6 +84,7 @@ def scrape_rankings_for_park(park_code: str, progress_callback=None) -> List[Dic
         if progress_callback:
             progress_callback(1, 3, "Fetching page content...")
         
+        throttle("firecrawl")
         scraped_data = app.scrape(url=target_url, formats=['markdown'])
         markdown = scraped_data.markdown if hasattr(scraped_data, 'markdown') else ''
         
@@ -129,6 +137,7 @@ def scrape_rankings_for_park(park_code: str, progress_callback=None) -> List[Dic
         {markdown[:60000]}
         """
         
+        throttle("gemini")
         response = client.models.generate_content(
             model=os.getenv("GEMINI_MODEL") or "gemini-1.5-flash",
             contents=prompt,
@@ -183,33 +192,16 @@ def scrape_rankings_for_park(park_code: str, progress_callback=None) -> List[Dic
         raise ValueError(f"Error scraping rankings: {e}")
 
 
-def merge_rankings_for_park(park_code: str, rankings: List[Dict], progress_callback=None) -> int:
+def merge_rankings_into_trails(local_trails: List[Dict], rankings: List[Dict]) -> Dict[str, Any]:
     """
-    Merges AllTrails rankings with existing trails_v2.json for a park.
-    
-    Args:
-        park_code: The park code (e.g., "BRCA")
-        rankings: List of ranking dictionaries from scrape_rankings_for_park
-        progress_callback: Optional callback function(current, total, message)
-        
+    Merges AllTrails rankings into a park's trail list in place, appending AllTrails-only trails.
+
+    Each local trail is resolved through a TrailNameIndex over the rankings: the exact
+    normalized name first, then the best name containment among rankings sharing a word.
+
     Returns:
-        Number of trails merged
-        
-    Raises:
-        FileNotFoundError: If trails_v2.json doesn't exist
+        {"merged": int, "appended": int, "matches": [{"trail", "ranking", "score", "kind"}]}
     """
-    park_code = park_code.upper()
-    
-    if not rankings:
-        return 0
-    
-    trails_file = f"{OUTPUT_DIR}/{park_code}/trails_v2.json"
-    if not os.path.exists(trails_file):
-        raise FileNotFoundError(f"{trails_file} not found. Run trail enrichment first.")
-    
-    with open(trails_file, "r") as f:
-        local_trails = json.load(f)
-    
     # Cleanup legacy tags and normalize time strings
     for t in local_trails:
         for bad_key in ("source", "difficulty_source", "length_miles_source", "estimated_time_hours_source"):
@@ -219,68 +211,50 @@ def merge_rankings_for_park(park_code: str, rankings: List[Dict], progress_callb
             t['estimated_time_hours'] = _normalize_time_string(t.get('estimated_time_hours'))
         if t.get('alltrails_estimated_time_hours'):
             t['alltrails_estimated_time_hours'] = _normalize_time_string(t.get('alltrails_estimated_time_hours'))
-    
-    if progress_callback:
-        progress_callback(0, len(rankings), "Merging rankings with local data...")
-    
-    def norm(name):
-        n = name.lower()
-        n = n.replace(" trailhead", "").replace(" trail", "")
-        n = n.replace(" falls", " fall").replace(" via ", " ")
-        n = re.sub(r'[^a-z0-9]', '', n)
-        return n
-    
+
+    # Best-ranked entry per normalized name
     ranked_map = {}
     for t in rankings:
-        norm_name = norm(t['name'])
+        norm_name = trail_name_key(t['name'])
         if norm_name not in ranked_map or t['rank'] < ranked_map[norm_name]['rank']:
             ranked_map[norm_name] = t
-    
+    ranked_index = TrailNameIndex(list(ranked_map.values()))
+
     merged_count = 0
     appended_count = 0
     used_keys = set()
-    
+    matches = []
+
     for trail in local_trails:
-        local_name = norm(trail['name'])
-        
-        match = None
-        matched_key = None
-        
-        if local_name in ranked_map:
-            match = ranked_map[local_name]
-            matched_key = local_name
-        else:
-            for r_name, r_data in ranked_map.items():
-                if r_name in local_name or local_name in r_name:
-                    match = r_data
-                    matched_key = r_name
-                    break
-        
-        if match:
-            trail['popularity_rank'] = match.get('rank')
-            trail['alltrails_url'] = match.get('url')
-            trail['alltrails_rating'] = match.get('rating')
-            trail['alltrails_review_count'] = match.get('review_count')
-            trail['alltrails_difficulty'] = match.get('difficulty')
-            trail['alltrails_length_miles'] = match.get('length_miles')
-            trail['alltrails_elevation_gain_ft'] = match.get('elevation_gain_ft')
-            trail['alltrails_estimated_time_hours'] = _normalize_time_string(match.get('estimated_time_hours')) if match.get('estimated_time_hours') else None
-            trail['alltrails_reviews_url'] = match.get('reviews_url')
-            
-            if not trail.get('difficulty') and match.get('difficulty'):
-                trail['difficulty'] = match.get('difficulty')
-            if not trail.get('length_miles') and match.get('length_miles'):
-                trail['length_miles'] = match.get('length_miles')
-            if not trail.get('elevation_gain_ft') and match.get('elevation_gain_ft'):
-                trail['elevation_gain_ft'] = match.get('elevation_gain_ft')
-                trail['elevation_gain_ft_source'] = 'alltrails'
-            if not trail.get('estimated_time_hours') and match.get('estimated_time_hours'):
-                trail['estimated_time_hours'] = _normalize_time_string(match.get('estimated_time_hours'))
-            
-            merged_count += 1
-            if matched_key:
-                used_keys.add(matched_key)
-    
+        found = ranked_index.match(trail['name'])
+        if not found:
+            continue
+        match = found.item
+        matches.append({"trail": trail['name'], "ranking": match['name'], "score": found.score, "kind": found.kind})
+
+        trail['popularity_rank'] = match.get('rank')
+        trail['alltrails_url'] = match.get('url')
+        trail['alltrails_rating'] = match.get('rating')
+        trail['alltrails_review_count'] = match.get('review_count')
+        trail['alltrails_difficulty'] = match.get('difficulty')
+        trail['alltrails_length_miles'] = match.get('length_miles')
+        trail['alltrails_elevation_gain_ft'] = match.get('elevation_gain_ft')
+        trail['alltrails_estimated_time_hours'] = _normalize_time_string(match.get('estimated_time_hours')) if match.get('estimated_time_hours') else None
+        trail['alltrails_reviews_url'] = match.get('reviews_url')
+
+        if not trail.get('difficulty') and match.get('difficulty'):
+            trail['difficulty'] = match.get('difficulty')
+        if not trail.get('length_miles') and match.get('length_miles'):
+            trail['length_miles'] = match.get('length_miles')
+        if not trail.get('elevation_gain_ft') and match.get('elevation_gain_ft'):
+            trail['elevation_gain_ft'] = match.get('elevation_gain_ft')
+            trail['elevation_gain_ft_source'] = 'alltrails'
+        if not trail.get('estimated_time_hours') and match.get('estimated_time_hours'):
+            trail['estimated_time_hours'] = _normalize_time_string(match.get('estimated_time_hours'))
+
+        merged_count += 1
+        used_keys.add(trail_name_key(match['name']))
+
     # Append unmatched AllTrails-only rankings as minimal trail records
     for r_name, r_data in ranked_map.items():
         if r_name in used_keys:
@@ -314,17 +288,92 @@ def merge_rankings_for_park(park_code: str, rankings: List[Dict], progress_callb
             new_trail['elevation_gain_ft_source'] = 'alltrails'
         local_trails.append(new_trail)
         appended_count += 1
+
+    return {"merged": merged_count, "appended": appended_count, "matches": matches}
+
+
+def merge_rankings_for_park(park_code: str, rankings: List[Dict], progress_callback=None, output_dir: str = OUTPUT_DIR) -> int:
+    """
+    Merges AllTrails rankings with existing trails_v2.json for a park.
+    
+    Args:
+        park_code: The park code (e.g., "BRCA")
+        rankings: List of ranking dictionaries from scrape_rankings_for_park
+        progress_callback: Optional callback function(current, total, message)
+        output_dir: Base directory for fixture data
+        
+    Returns:
+        Number of trails merged
+        
+    Raises:
+        FileNotFoundError: If trails_v2.json doesn't exist
+    """
+    park_code = park_code.upper()
+    
+    if not rankings:
+        return 0
+    
+    trails_file = f"{output_dir}/{park_code}/trails_v2.json"
+    if not os.path.exists(trails_file):
+        raise FileNotFoundError(f"{trails_file} not found. Run trail enrichment first.")
+    
+    with open(trails_file, "r") as f:
+        original = f.read()
+    local_trails = json.loads(original)
+    
+    if progress_callback:
+        progress_callback(0, len(rankings), "Merging rankings with local data...")
+    
+    result = merge_rankings_into_trails(local_trails, rankings)
+    merged_count, appended_count = result["merged"], result["appended"]
+
+    partial = [m for m in result["matches"] if m["kind"] != "exact"]
+    for m in partial:
+        print(f"   ~ '{m['trail']}' -> '{m['ranking']}' (score {m['score']:.2f})")
     
-    with open(trails_file, "w") as f:
-        json.dump(local_trails, f, indent=2)
+    # Only rewrite the file when the merge changed something
+    output = json.dumps(local_trails, indent=2)
+    if output != original:
+        with open(trails_file, "w") as f:
+            f.write(output)
     
     if progress_callback:
         progress_callback(merged_count + appended_count, merged_count + appended_count, 
-                         f"Merged {merged_count}, appended {appended_count} trails")
+                         f"Merged {merged_count} ({len(partial)} partial name matches), appended {appended_count} trails")
     
     return merged_count + appended_count
 
 
+def merge_rankings_batch(park_codes: Optional[List[str]] = None, output_dir: str = OUTPUT_DIR) -> Dict[str, Any]:
+    """
+    Re-merges the saved rankings.json into trails_v2.json for many parks (no scraping).
+
+    Args:
+        park_codes: Parks to process; None = every park with both files
+
+    Returns:
+        {park_code: trails affected, or {"error": str}}
+    """
+    if park_codes is None:
+        park_codes = sorted(
+            d for d in os.listdir(output_dir)
+            if os.path.exists(f"{output_dir}/{d}/rankings.json") and os.path.exists(f"{output_dir}/{d}/trails_v2.json")
+        )
+
+    start = time.perf_counter()
+    summary = {}
+    for park_code in park_codes:
+        park_code = park_code.upper()
+        try:
+            with open(f"{output_dir}/{park_code}/rankings.json", "r") as f:
+                rankings = json.load(f)
+            summary[park_code] = merge_rankings_for_park(park_code, rankings, output_dir=output_dir)
+        except (FileNotFoundError, ValueError) as e:
+            summary[park_code] = {"error": str(e)}
+    print(f"⏱️ Merged rankings for {len(park_codes)} parks in {time.perf_counter() - start:.2f}s")
+    return summary
+
+
 def fetch_and_merge_rankings(park_code: str, progress_callback=None) -> int:
     """
     Convenience function: scrape rankings and merge in one call.
@@ -366,6 +415,11 @@ if __name__ == "__main__":
     def cli_progress(current, total, message):
         print(f"[{current}/{total}] {message}")
     
+    # --merge-only: re-merge every park's saved rankings.json without scraping
+    if "--merge-only" in sys.argv:
+        print(merge_rankings_batch())
+        sys.exit(0)
+    
     try:
         print(f"🚀 Fetching AllTrails rankings for {park_code}...")
         count = fetch_and_merge_rankings(park_code, progress_callback=cli_progress)
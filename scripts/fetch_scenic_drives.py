@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import requests
 import time
@@ -6,6 +7,11 @@ from typing import List, Optional, Dict, Any
 from dotenv import load_dotenv
 from pydantic import BaseModel
 
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from app.utils.rate_limiter import throttle
+
 # Load environment variables
 load_dotenv()
 
@@ -51,6 +57,7 @@ def _search_blogs(park_name: str, serper_key: str) -> List[str]:
     })
     headers = {'X-API-KEY': serper_key, 'Content-Type': 'application/json'}
     try:
+        throttle("serper")
         response = requests.post(url, headers=headers, data=payload)
         response.raise_for_status()
         return [x['link'] for x in response.json().get("organic", [])]
@@ -118,6 +125,7 @@ def fetch_scenic_drives_for_park(park_code: str, progress_callback=None) -> List
             progress_callback(i + 1, 5, f"Scraping: {url[:50]}...")
         
         try:
+            throttle("firecrawl")
             res = app.scrape(url=url, formats=['markdown'])
             
             md = ""
@@ -165,6 +173,7 @@ def fetch_scenic_drives_for_park(park_code: str, progress_callback=None) -> List
                 {md[:50000]}
                 """
                 
+                throttle("gemini")
                 response = client.models.generate_content(
                     model=gemini_model,
                     contents=prompt,
@@ -49,86 +49,21 @@ def save_json(data, park_code, filename, is_raw=False):
     except Exception as e:
         logger.error(f"Failed to save {filename}: {e}")
 
-import re
+from app.utils.keyword_classifier import classify_place
 
 def classify_places(places_raw_data):
     """
     Splits raw NPS places data into 'trails' (candidates) and 'things' based on broad recall logic.
     Stage 1: Broad Recall - separate likely hike candidates from obvious infrastructure.
+    Keyword signals are matched by the shared precompiled classifier (app.utils.keyword_classifier).
     """
     items = places_raw_data.get("data", [])
     
-    # Positive Signals: implies hiking context
-    HIKE_KEYWORDS = [
-        "trail", "trailhead", "hike", "hiking", "route", "walk", "loop", "path", 
-        "canyon", "rim", "overlook", "point", "junction", "narrows", "landing", 
-        "bridge", "mesa", "wash", "access"
-    ]
-    
-    # Negative Signals: implies non-hike infrastructure
-    INFRASTRUCTURE_KEYWORDS = [
-        "visitor center", "museum", "gift shop", "campground", "lodging", 
-        "picnic", "restroom", "amphitheater", "station", "office", "entrance", 
-        "exhibit", "wayside", "marker", "shuttle stop", "bus stop", "parking",
-        "residence", "village", "hotel", "store", "school", "church"
-    ]
-
-    # Content Signals: words in description that strongly suggest a hike description
-    CONTENT_INDICATORS = ["miles", "km", "elevation", "round-trip", "strenuous", "moderate", "easy", "climb", "hike"]
-
-    def contains_whole_word(text, keyword):
-        pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-        return bool(re.search(pattern, text.lower()))
-
     trails_candidates = []
     things = []
     
     for item in items:
-        title = item.get("title", "")
-        # Unified Description: Handle schema differences between Places (listingDescription) and ThingsToDo (longDescription)
-        desc_parts = [
-            item.get("listingDescription") or "",
-            item.get("bodyText") or "",
-            item.get("shortDescription") or "",
-            item.get("longDescription") or ""
-        ]
-        desc = " ".join(desc_parts)
-        title_lower = title.lower()
-        desc_lower = desc.lower()
-
-        # 1. Check Negative Signals first (fast reject)
-        is_infrastructure = any(contains_whole_word(title_lower, kw) for kw in INFRASTRUCTURE_KEYWORDS)
-        
-        # 2. Check Positive Signals
-        has_hike_keyword = any(contains_whole_word(title_lower, kw) for kw in HIKE_KEYWORDS)
-        
-        # 3. Content Rescue: Even if it looks like infrastructure (e.g. "Glacier Point"), 
-        # is it actually describing a hike starting there?
-        has_content_indicators = sum(1 for w in CONTENT_INDICATORS if w in desc_lower) >= 2
-
-        # LOGIC:
-        is_trail = False
-        
-        if is_infrastructure:
-            # If it's explicitly named "Visitor Center", it's a thing. 
-            # Unless it's "Visitor Center Trailhead" - but usually "Visitor Center" is the building.
-            # We'll be strict on infrastructure words in title.
-             is_trail = False
-        elif has_hike_keyword:
-             is_trail = True
-        elif has_content_indicators:
-             # Even if title is generic, if description talks about miles and elevation, it's a trail candidate
-             is_trail = True
-             
-        # Ambiguity Handling: "Overlook" or "Point"
-        if contains_whole_word(title_lower, "overlook") or contains_whole_word(title_lower, "point"):
-             # Relaxed Rule: If description says "trail" or "hike", keep it.
-             # Or if it has at least 1 content indicator (miles, moderate, etc)
-             is_hike_desc = "trail" in desc_lower or "hike" in desc_lower
-             if not has_content_indicators and not is_hike_desc:
-                 is_trail = False
-
-        if is_trail:
+        if classify_place(item)["is_trail"]:
             trails_candidates.append(item)
         else:
             things.append(item)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Batch Onboarding: bring many parks online in one run.
+
+Runs ParkDataFetcher.ensure_park_data for each park in a process pool. Every
+worker shares one global rate limit per external API (NPS, Serper, Firecrawl,
+Gemini, Open-Elevation), so N workers never exceed the budget of one. Parks whose
+fixtures already exist are skipped stage by stage, so an interrupted run can
+simply be started again.
+
+Usage:
+    python -m scripts.onboard --parks all --workers 4
+    python -m scripts.onboard --parks ZION,BRCA --skip photo_spots,scenic_drives
+    python -m scripts.onboard --parks all --rate gemini=2 --rate nps=0.5 --summary onboarding_summary.json
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Any
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from dotenv import load_dotenv
+
+from app.utils.geospatial import PARK_CENTROIDS
+from app.utils.rate_limiter import SharedRateLimiter, set_api_limiter, api_call_counts
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(processName)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Onboard")
+
+# Global requests/second per API, shared by all workers
+# (NPS allows 1,000 requests/hour per key; the rest are conservative free-tier defaults)
+DEFAULT_API_RATES = {
+    "nps": 0.25,
+    "serper": 2.0,
+    "firecrawl": 0.5,
+    "gemini": 1.0,
+    "elevation": 1.0,
+}
+
+# Stages that can be left out with --skip (mapped to ensure_park_data flags)
+SKIPPABLE_STAGES = {
+    "trails": "include_trails",
+    "rankings": "include_rankings",
+    "photo_spots": "include_photo_spots",
+    "scenic_drives": "include_scenic_drives",
+    "amenities": "include_amenities",
+}
+
+
+def _init_worker(limiters: Dict[str, SharedRateLimiter]):
+    """Pool initializer: route this process's API calls through the shared limiters."""
+    load_dotenv()
+    for api, limiter in limiters.items():
+        set_api_limiter(api, limiter)
+
+
+def onboard_park(park_code: str, options: Dict[str, Any], stage_workers: int) -> Dict[str, Any]:
+    """
+    Runs ensure_park_data for one park inside a worker process.
+
+    Returns:
+        Summary row: park_code, status (ok/partial/failed), duration_sec,
+        critical_path_sec, api_calls, failures, error
+    """
+    from app.services.registry import get_services
+
+    start = time.monotonic()
+    calls_before = api_call_counts()
+    row = {"park_code": park_code, "status": "ok", "failures": [], "error": None, "critical_path_sec": 0.0}
+
+    try:
+        # Shared by every park this worker process onboards
+        fetcher = get_services().park_fetcher
+
+        def progress(current, total, message):
+            logger.info(f"[{park_code}] {message}")
+
+        result = fetcher.ensure_park_data(park_code, progress_callback=progress, max_workers=stage_workers, **options)
+        row["critical_path_sec"] = result.get("critical_path_sec", 0.0)
+        row["failures"] = [
+            name for name, op in result.get("operations", {}).items()
+            if isinstance(op, dict) and "error" in op
+        ]
+        if row["failures"]:
+            row["status"] = "partial"
+    except Exception as e:
+        row["status"] = "failed"
+        row["error"] = str(e)
+        logger.error(f"❌ {park_code} failed: {e}")
+
+    calls_after = api_call_counts()
+    row["api_calls"] = {
+        api: calls_after[api] - calls_before.get(api, 0)
+        for api in calls_after if calls_after[api] - calls_before.get(api, 0)
+    }
+    row["duration_sec"] = round(time.monotonic() - start, 1)
+    return row
+
+
+def parse_parks(value: str) -> List[str]:
+    if value.strip().lower() == "all":
+        return sorted(PARK_CENTROIDS)
+    parks = [p.strip().upper() for p in value.split(",") if p.strip()]
+    unknown = [p for p in parks if p not in PARK_CENTROIDS]
+    if unknown:
+        logger.warning(f"⚠️ Not in PARK_CENTROIDS (will still try): {unknown}")
+    return parks
+
+
+def parse_rates(overrides: List[str]) -> Dict[str, float]:
+    rates = dict(DEFAULT_API_RATES)
+    for item in overrides or []:
+        api, _, value = item.partition("=")
+        if not value:
+            raise ValueError(f"--rate expects api=requests_per_second, got '{item}'")
+        rates[api.strip().lower()] = float(value)
+    return rates
+
+
+def print_summary(rows: List[Dict[str, Any]], elapsed: float):
+    apis = sorted({api for row in rows for api in row["api_calls"]})
+    header = f"{'Park':<6} {'Status':<8} {'Time':>8} {'Crit.':>7}  " + " ".join(f"{api:>9}" for api in apis) + "  Failures"
+    print("\n" + header)
+    print("-" * len(header))
+    for row in sorted(rows, key=lambda r: r["park_code"]):
+        calls = " ".join(f"{row['api_calls'].get(api, 0):>9}" for api in apis)
+        failures = row["error"] or ", ".join(row["failures"]) or "-"
+        print(f"{row['park_code']:<6} {row['status']:<8} {row['duration_sec']:>7.0f}s {row['critical_path_sec']:>6.0f}s  {calls}  {failures}")
+    print("-" * len(header))
+    totals = " ".join(f"{sum(r['api_calls'].get(api, 0) for r in rows):>9}" for api in apis)
+    counts = {s: sum(1 for r in rows if r["status"] == s) for s in ("ok", "partial", "failed")}
+    print(f"{'TOTAL':<6} {'':<8} {elapsed:>7.0f}s {'':>7}  {totals}  "
+          f"ok={counts['ok']} partial={counts['partial']} failed={counts['failed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Onboard many parks with a process pool")
+    parser.add_argument("--parks", default="all", help="'all' (every PARK_CENTROIDS code) or comma-separated codes")
+    parser.add_argument("--workers", type=int, default=4, help="Parks processed in parallel")
+    parser.add_argument("--stage-workers", type=int, default=3, help="Stages run in parallel within a park")
+    parser.add_argument("--skip", default="", help=f"Comma-separated stages to skip: {', '.join(SKIPPABLE_STAGES)}")
+    parser.add_argument("--rate", action="append", default=[], metavar="API=RPS",
+                        help=f"Override a global API rate (defaults: {DEFAULT_API_RATES})")
+    parser.add_argument("--summary", help="Also write the summary rows to this JSON file")
+    args = parser.parse_args()
+
+    parks = parse_parks(args.parks)
+    skip = [s.strip() for s in args.skip.split(",") if s.strip()]
+    unknown_skip = [s for s in skip if s not in SKIPPABLE_STAGES]
+    if unknown_skip:
+        parser.error(f"Unknown --skip stage(s): {unknown_skip}")
+    options = {flag: stage not in skip for stage, flag in SKIPPABLE_STAGES.items()}
+
+    ctx = multiprocessing.get_context("spawn")
+    limiters = {api: SharedRateLimiter(rps, name=api, ctx=ctx) for api, rps in parse_rates(args.rate).items()}
+
+    logger.info(f"🚀 Onboarding {len(parks)} parks with {args.workers} workers "
+                f"(rates: {', '.join(f'{a}={l.rate}/s' for a, l in limiters.items())})")
+
+    start = time.monotonic()
+    rows = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers), mp_context=ctx,
+                             initializer=_init_worker, initargs=(limiters,)) as pool:
+        futures = {pool.submit(onboard_park, park, options, args.stage_workers): park for park in parks}
+        for done, future in enumerate(as_completed(futures), start=1):
+            park = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                # Worker process crashed
+                row = {"park_code": park, "status": "failed", "duration_sec": 0.0, "critical_path_sec": 0.0,
+                       "api_calls": {}, "failures": [], "error": str(e)}
+            rows.append(row)
+            logger.info(f"[{done}/{len(parks)}] {park}: {row['status']} in {row['duration_sec']:.0f}s")
+
+    print_summary(rows, time.monotonic() - start)
+
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(sorted(rows, key=lambda r: r["park_code"]), f, indent=2)
+        logger.info(f"📂 Saved summary to {args.summary}")
+
+    sys.exit(1 if any(r["status"] == "failed" for r in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
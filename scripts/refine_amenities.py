@@ -1,8 +1,18 @@
 import os
+import sys
 import json
+import time
 import logging
-import math
-from typing import Dict, List, Any
+import argparse
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from app.clients.external_client import place_key
+from app.utils.geospatial import haversine_miles
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -11,6 +21,8 @@ logger = logging.getLogger(__name__)
 # Constants
 DATA_DIR = "data_samples/ui_fixtures"
 TARGET_PARKS = ["YOSE", "ZION", "GRCA"]
+INDEX_FILENAME = "amenity_index.json"
+TOP_N_PER_CATEGORY = 5
 
 # NEW: Mapping matches your updated admin_fetch_amenities.py TASKS
 CATEGORY_MAP = {
@@ -22,149 +34,277 @@ CATEGORY_MAP = {
     "lodging OR hotel OR motel OR campground": "Lodging"
 }
 
-def calculate_haversine(lat1, lon1, lat2, lon2):
-    """Calculates distance in miles between two lat/lon points."""
-    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
-        return 9999.9
-    try:
-        R = 3958.8  # Earth radius in miles
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        a = (math.sin(dlat / 2) ** 2 +
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return round(R * c, 2)
-    except (ValueError, TypeError):
-        return 9999.9
-
-def get_hub_coords(park_code: str, hub_name_query: str) -> tuple:
-    """Finds lat/lon for a named hub (VC/Entrance) in the park's static data."""
-    park_dir = os.path.join(DATA_DIR, park_code)
-    source_files = ["visitor_centers.json", "places.json"]
-    
-    hub_query_clean = hub_name_query.lower().replace(" ", "").replace("_", "")
-    
-    for fname in source_files:
+# Fields kept per place in the compact index (plus category, hub, distance_miles)
+INDEX_FIELDS = [
+    "name", "type", "address", "latitude", "longitude", "rating", "rating_count",
+    "website", "phone", "google_maps_url"
+]
+
+
+def _clean_name(name: str) -> str:
+    return name.lower().replace(" ", "").replace("_", "")
+
+def load_hub_candidates(park_dir: str) -> List[Tuple[str, float, float]]:
+    """
+    Loads (clean_name, lat, lon) for every visitor center / place with coordinates,
+    once per park, in lookup priority order.
+    """
+    candidates = []
+    for fname in ["visitor_centers.json", "places.json"]:
         fpath = os.path.join(park_dir, fname)
         if not os.path.exists(fpath):
             continue
-            
         try:
             with open(fpath, 'r') as f:
                 data = json.load(f)
-                
-            for item in data:
-                item_name = item.get("title") or item.get("name") or ""
-                item_name_clean = item_name.lower().replace(" ", "").replace("_", "")
-                
-                if hub_query_clean in item_name_clean or item_name_clean in hub_query_clean:
-                    lat = item.get("latitude")
-                    lon = item.get("longitude")
-                    
-                    if not lat and "location" in item:
-                        lat = item["location"].get("lat")
-                        lon = item["location"].get("lon")
-                        
-                    if lat and lon:
-                        return float(lat), float(lon)
         except Exception:
             continue
-            
+
+        for item in data:
+            lat = item.get("latitude")
+            lon = item.get("longitude")
+            if not lat and "location" in item:
+                lat = item["location"].get("lat")
+                lon = item["location"].get("lon")
+            if not (lat and lon):
+                continue
+            try:
+                candidates.append((_clean_name(item.get("title") or item.get("name") or ""), float(lat), float(lon)))
+            except (TypeError, ValueError):
+                continue
+    return candidates
+
+def match_hub_coords(hub_name_query: str, candidates: List[Tuple[str, float, float]]) -> tuple:
+    """Finds lat/lon for a named hub (VC/Entrance) among the park's hub candidates."""
+    hub_query_clean = _clean_name(hub_name_query)
+    for item_name_clean, lat, lon in candidates:
+        if hub_query_clean in item_name_clean or item_name_clean in hub_query_clean:
+            return lat, lon
     return None, None
 
-def process_items(items, hub_lat, hub_lon):
-    """Calculates distance and sorts a list of items."""
-    processed = []
-    for item in items:
-        new_item = item.copy()
-        dist = 0.0
-        if hub_lat and item.get("latitude"):
-            dist = calculate_haversine(hub_lat, hub_lon, float(item["latitude"]), float(item["longitude"]))
-        new_item["distance_miles"] = dist
-        processed.append(new_item)
-    
-    processed.sort(key=lambda x: x["distance_miles"])
-    return processed[:5]
+def hub_display_name(slug: str) -> str:
+    """Hub key used in amenities_consolidated.json (from the amenities_<slug>.json file name)."""
+    return slug.replace("_", " ").title()
+
+def clean_category(raw_cat: str) -> str:
+    return CATEGORY_MAP.get(raw_cat) or raw_cat.replace(" OR ", "/").title()
+
+def _to_float(value) -> float:
+    try:
+        return float(value) if value else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def consolidate_park(park_code: str, hubs: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Consolidation engine: distances for every item of every hub in one vectorized pass.
+
+    Args:
+        park_code: The park code
+        hubs: [{"name": display name, "lat": float|None, "lon": float|None,
+                "amenities": {raw query category: [place dicts]}}]
+
+    Returns:
+        (consolidated, index)
+        consolidated: {"park_code", "hubs": {name: {"location", "amenities": {category: 5 closest}}}}
+        index: {"park_code", "hubs": {name: {"lat", "lon"}}, "rows": [...]} - one row per unique
+            place and category (at its nearest hub), sorted by distance, unknown distances (None) last
+        Items with unknown distances keep 0.0 in the consolidated file, as before.
+    """
+    # 1. Flatten into (hub, category) groups, dropping repeats within a group
+    groups: List[Tuple[int, str]] = []
+    items: List[Dict[str, Any]] = []
+    item_group: List[int] = []
+    item_hub: List[int] = []
+    for h, hub in enumerate(hubs):
+        for raw_cat, raw_items in hub["amenities"].items():
+            g = len(groups)
+            groups.append((h, clean_category(raw_cat)))
+            seen = set()
+            for item in raw_items:
+                key = place_key(item)
+                if key in seen:
+                    continue
+                seen.add(key)
+                items.append(item)
+                item_group.append(g)
+                item_hub.append(h)
+
+    # 2. Haversine for all items against their own hub
+    hub_lats = np.array([_to_float(hub["lat"]) for hub in hubs] or [np.nan], dtype=np.float64)
+    hub_lons = np.array([_to_float(hub["lon"]) for hub in hubs] or [np.nan], dtype=np.float64)
+    item_hub_arr = np.array(item_hub, dtype=np.int64)
+    lats = np.array([_to_float(item.get("latitude")) for item in items], dtype=np.float64)
+    lons = np.array([_to_float(item.get("longitude")) for item in items], dtype=np.float64)
+    h_lat, h_lon = hub_lats[item_hub_arr], hub_lons[item_hub_arr]
+
+    valid = ~(np.isnan(lats) | np.isnan(lons) | np.isnan(h_lat) | np.isnan(h_lon))
+    with np.errstate(invalid="ignore"):
+        dist = np.where(valid, np.round(haversine_miles(h_lat, h_lon, lats, lons), 2), 0.0)
+
+    # 3. Per group: closest N (stable, so Serper's order breaks ties)
+    group_arr = np.array(item_group, dtype=np.int64)
+    order = np.lexsort((dist, group_arr))
+    dist_list = dist.tolist()
+
+    consolidated = {"park_code": park_code.upper(), "hubs": {}}
+    for hub in hubs:
+        consolidated["hubs"][hub["name"]] = {
+            "location": {"lat": hub["lat"], "lon": hub["lon"]},
+            "amenities": {}
+        }
+    for h, category in groups:
+        consolidated["hubs"][hubs[h]["name"]]["amenities"][category] = []
+
+    for i in order.tolist():
+        h, category = groups[item_group[i]]
+        bucket = consolidated["hubs"][hubs[h]["name"]]["amenities"][category]
+        if len(bucket) < TOP_N_PER_CATEGORY:
+            new_item = items[i].copy()
+            new_item["distance_miles"] = dist_list[i]
+            bucket.append(new_item)
+
+    # 4. Compact index: each place once per category, at its nearest hub. Unknown distances
+    # (hub or place without coordinates) sort last and are written as None, not 0.0
+    rows = []
+    indexed = set()
+    index_dist = np.where(valid, dist, np.inf)
+    for i in np.argsort(index_dist, kind="stable").tolist():
+        h, category = groups[item_group[i]]
+        key = (category, place_key(items[i]))
+        if key in indexed:
+            continue
+        indexed.add(key)
+        row = {field: items[i].get(field) for field in INDEX_FIELDS}
+        row.update({"category": category, "hub": hubs[h]["name"],
+                    "distance_miles": dist_list[i] if valid[i] else None})
+        rows.append(row)
+
+    index = {
+        "park_code": park_code.upper(),
+        "hubs": {hub["name"]: {"lat": hub["lat"], "lon": hub["lon"]} for hub in hubs},
+        "rows": rows
+    }
+    return consolidated, index
+
+
+def save_consolidated_amenities(
+    park_consolidated_data: Dict[str, Any],
+    data_dir: str = DATA_DIR,
+    index: Optional[Dict[str, Any]] = None
+) -> str:
+    """Writes amenities_consolidated.json (and the compact index, if given) for the park and returns its path."""
+    park_code = park_consolidated_data["park_code"]
+    park_dir = os.path.join(data_dir, park_code)
+    os.makedirs(park_dir, exist_ok=True)
+
+    # Serialize in one call rather than json.dump's many small writes; the compact
+    # index (no indent) also gets the C encoder
+    output_path = os.path.join(park_dir, "amenities_consolidated.json")
+    with open(output_path, 'w') as f:
+        f.write(json.dumps(park_consolidated_data, indent=2))
+
+    if index is not None:
+        with open(os.path.join(park_dir, INDEX_FILENAME), 'w') as f:
+            f.write(json.dumps(index, separators=(",", ":")))
+
+    logger.info(f"✅ Saved consolidated data for {park_code} to {output_path}")
+    return output_path
+
+def _amenity_files(park_dir: str) -> List[str]:
+    return sorted(
+        f for f in os.listdir(park_dir)
+        if f.startswith("amenities_") and f.endswith(".json") and "consolidated" not in f
+    )
 
 def refine_amenities_for_park(park_code: str, data_dir: str = DATA_DIR) -> Dict[str, Any]:
     """
     Programmatic entry point for amenity consolidation for a single park.
-    
+
     Args:
         park_code: The park code (e.g., "BRCA")
         data_dir: Base directory for fixture data
-        
+
     Returns:
         Consolidated amenities data structure
-        
+
     Raises:
         FileNotFoundError: If park directory doesn't exist
     """
     park_dir = os.path.join(data_dir, park_code.upper())
-    
+
     if not os.path.exists(park_dir):
         raise FileNotFoundError(f"Park directory not found: {park_dir}")
-    
-    amenity_files = [
-        f for f in os.listdir(park_dir) 
-        if f.startswith("amenities_") and f.endswith(".json") and "consolidated" not in f
-    ]
-    
+
+    amenity_files = _amenity_files(park_dir)
+
     if not amenity_files:
         logger.warning(f"No amenity files found for {park_code}")
         return {"park_code": park_code.upper(), "hubs": {}}
-    
-    park_consolidated_data = {
-        "park_code": park_code.upper(),
-        "hubs": {}
-    }
-    
+
+    # Load every hub file and the hub coordinate sources once
+    candidates = load_hub_candidates(park_dir)
+    hubs = []
     for filename in amenity_files:
         slug = filename.replace("amenities_", "").replace(".json", "")
-        display_name = slug.replace("_", " ").title()
-        
-        hub_lat, hub_lon = get_hub_coords(park_code.upper(), slug)
-        
+        display_name = hub_display_name(slug)
+
+        hub_lat, hub_lon = match_hub_coords(slug, candidates)
         if not hub_lat:
-            logger.warning(f"⚠️  Coords not found for hub '{display_name}'. Distances will be 0.")
-        
-        filepath = os.path.join(park_dir, filename)
-        with open(filepath, 'r') as f:
-            raw_data = json.load(f)
-        
-        processed_amenities = {}
-        
-        for raw_cat, items in raw_data.items():
-            clean_cat = CATEGORY_MAP.get(raw_cat)
-            if not clean_cat:
-                clean_cat = raw_cat.replace(" OR ", "/").title()
-            processed_amenities[clean_cat] = process_items(items, hub_lat, hub_lon)
-        
-        park_consolidated_data["hubs"][display_name] = {
-            "location": {"lat": hub_lat, "lon": hub_lon},
-            "amenities": processed_amenities
-        }
-    
-    # Save consolidated file
-    output_path = os.path.join(park_dir, "amenities_consolidated.json")
-    with open(output_path, 'w') as f:
-        json.dump(park_consolidated_data, f, indent=2)
-    
-    logger.info(f"✅ Saved consolidated data for {park_code} to {output_path}")
-    return park_consolidated_data
+            logger.warning(f"⚠️  Coords not found for hub '{display_name}'. Its distances will be unknown.")
 
+        with open(os.path.join(park_dir, filename), 'r') as f:
+            hubs.append({"name": display_name, "lat": hub_lat, "lon": hub_lon, "amenities": json.load(f)})
 
-def refine_amenities():
-    """Original function for batch processing - loops over TARGET_PARKS."""
-    for park_code in TARGET_PARKS:
-        logger.info(f"Processing {park_code}...")
+    consolidated, index = consolidate_park(park_code, hubs)
+    save_consolidated_amenities(consolidated, data_dir, index)
+    return consolidated
+
+
+def refine_amenities_batch(park_codes: Optional[List[str]] = None, data_dir: str = DATA_DIR) -> Dict[str, Any]:
+    """
+    Consolidates many parks in one run.
+
+    Args:
+        park_codes: Parks to process; None = every park directory with amenity files
+        data_dir: Base directory for fixture data
+
+    Returns:
+        {park_code: number of hubs, or {"error": str}}
+    """
+    if park_codes is None:
+        park_codes = sorted(
+            d for d in os.listdir(data_dir)
+            if os.path.isdir(os.path.join(data_dir, d)) and _amenity_files(os.path.join(data_dir, d))
+        )
+
+    start = time.perf_counter()
+    summary = {}
+    for park_code in park_codes:
         try:
-            refine_amenities_for_park(park_code)
+            summary[park_code.upper()] = len(refine_amenities_for_park(park_code, data_dir)["hubs"])
         except FileNotFoundError as e:
             logger.warning(f"Skipping {park_code}: {e}")
-            continue
+            summary[park_code.upper()] = {"error": str(e)}
+    logger.info(f"⏱️ Consolidated amenities for {len(park_codes)} parks in {time.perf_counter() - start:.2f}s")
+    return summary
+
+
+def refine_amenities():
+    """Original function for batch processing - loops over TARGET_PARKS."""
+    refine_amenities_batch(TARGET_PARKS)
 
 
 if __name__ == "__main__":
-    refine_amenities()
+    parser = argparse.ArgumentParser(description="Consolidate pre-fetched park amenities")
+    parser.add_argument("parks", nargs="*", help=f"Park codes, or 'all' (default: {' '.join(TARGET_PARKS)})")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args()
 
+    if not args.parks:
+        refine_amenities_batch(TARGET_PARKS, args.data_dir)
+    elif [p.lower() for p in args.parks] == ["all"]:
+        refine_amenities_batch(None, args.data_dir)
+    else:
+        refine_amenities_batch(args.parks, args.data_dir)
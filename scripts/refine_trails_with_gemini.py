@@ -1,13 +1,21 @@
 import os
+import sys
 import json
-import time
 import re
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from google import genai
 
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from app.utils.rate_limiter import AdaptiveRateLimiter, is_rate_limit_error, throttle
+from app.utils.fuzzy_match import TrailNameIndex
+
 # Load environment variables
 load_dotenv()
 
@@ -19,6 +27,23 @@ INPUT_FILE = f"data_samples/nps/raw/{PARK_CODE}/raw_trails.json"
 OUTPUT_DIR = f"data_samples/ui_fixtures/{PARK_CODE}"
 OUTPUT_FILE = f"{OUTPUT_DIR}/trails_v2.json"
 
+# Concurrency: bounded in-flight Gemini calls, paced by an adaptive (AIMD) rate limiter
+MAX_IN_FLIGHT = int(os.getenv("REFINE_MAX_IN_FLIGHT", "8"))
+GEMINI_START_RPS = float(os.getenv("GEMINI_START_RPS", "2"))
+GEMINI_MAX_RPS = float(os.getenv("GEMINI_MAX_RPS", "10"))
+MAX_RATE_LIMIT_RETRIES = 5
+
+# Batching: several candidates per request, sized by a rough token estimate (1 = one prompt per trail)
+MAX_BATCH_SIZE = int(os.getenv("REFINE_BATCH_SIZE", "8"))
+MAX_BATCH_INPUT_TOKENS = int(os.getenv("REFINE_BATCH_TOKENS", "8000"))
+CHARS_PER_TOKEN = 4
+MAX_CONTEXT_CHARS = 4000
+
+# Returned by the extractors when the request itself failed (timeout, 5xx, retries used up,
+# unparseable answer), as opposed to None = "not a hiking trail". Failed candidates are
+# retried on the next run and keep their existing trails_v2.json record.
+EXTRACTION_FAILED = object()
+
 # --- Models ---
 class TrailStats(BaseModel):
     is_valid_hiking_trail: bool = Field(False, description="Set to True ONLY if this is clearly a hiking trail/route/walk. Set False for overlooks, shuttle stops, or buildings unless they are explicitly describing a hike starting there.")
@@ -32,6 +57,12 @@ class TrailStats(BaseModel):
     is_pet_friendly: bool = Field(False, description="True if pets are allowed on the trail (including leashed pets). Look for 'pets allowed', 'dogs allowed', 'leashed pets', or similar. False if description explicitly says 'no pets' or 'pets not allowed'.")
     clean_description: Optional[str] = Field(None, description="A concise, 1-2 sentence description of the actual hike. Exclude hours, rules, regulations, getting there, accessibility info, and HTML. Focus only on what makes this trail unique and what you'll see/do.")
 
+class BatchTrailStats(TrailStats):
+    id: str = Field(..., description="The ID of the trail candidate these stats belong to, copied exactly")
+
+class TrailStatsBatch(BaseModel):
+    trails: List[BatchTrailStats] = Field(default_factory=list, description="One entry per trail candidate, in any order")
+
 # --- Helpers: cleaning HTML / truncation
 def strip_html_and_truncate(text: Optional[str], max_sentences: int = 2) -> Optional[str]:
     if not text:
@@ -108,10 +139,37 @@ def infer_difficulty_from_metrics(length_miles: Optional[float], elevation_gain_
     else:
         return "Strenuous"
 
+# --- Prompt (shared instructions for every extraction request) ---
+EXTRACTION_INSTRUCTIONS = (
+    "Instructions:\n"
+    "1. DECIDE: Is this a SPECIFIC hiking trail or walking path? (True/False)\n"
+    "   - RETURN FALSE if it is a 'Day Use Area', 'Campground', 'Visitor Center', 'Parking Area'.\n"
+    "   - RETURN FALSE if it is a DRIVE-UP Overlook or Viewpoint (e.g. 'Sunset Point', 'Yovimpa Point') unless it explicitly describes a significant hike *starting* from there.\n"
+    "   - RETURN FALSE if it is a Ranger Program, Event, or Tour (e.g. 'Full Moon Hike', 'Rim Walk with a Ranger').\n"
+    "   - RETURN FALSE if it is a geological feature or point of interest without describing the trail to get there (e.g. 'Thor\\'s Hammer').\n"
+    "   - RETURN FALSE if it is a collection of routes (e.g. 'Southwest Area Winter Routes').\n"
+    "   - RETURN TRUE ONLY for specific, named hiking trails or defined walking loops.\n"
+    "2. IF TRUE, extract metrics:\n"
+    "   - 'difficulty' (Easy, Moderate, or Strenuous; can be null if not explicitly stated)\n"
+    "   - 'length_miles' (numeric)\n"
+    "   - 'elevation_gain_ft' (numeric)\n"
+    "   - 'route_type'\n"
+    "   - 'estimated_time_hours'\n"
+    "   - 'is_wheelchair_accessible': Look for 'wheelchair', 'paved', 'accessible', 'ADA'.\n"
+    "   - 'is_kid_friendly': Look for 'easy', 'family', 'kids', 'flat', 'short'.\n"
+    "   - 'is_pet_friendly': Look for 'pets allowed', 'dogs allowed', 'leashed pets', or 'Pets Allowed' in amenities. Set False if description says 'pets not allowed' or 'no pets' or 'no dogs'.\n"
+    "   - 'clean_description': Write a concise, 1-2 sentence description of the hike itself. Focus on what makes it unique and what hikers will see/do. EXCLUDE: hours of operation, rules/regulations, how to get there, accessibility requirements, parking info, permit requirements, HTML tags, and extra sections.\n"
+)
+
+# Any change to the instructions or model invalidates previously enriched candidates
+PROMPT_VERSION = hashlib.sha1(f"{GEMINI_MODEL}\n{EXTRACTION_INSTRUCTIONS}".encode()).hexdigest()[:12]
+
+# Fields refine_trails derives from the raw NPS candidate (refreshed even when Gemini is skipped)
+RAW_DERIVED_FIELDS = ["name", "location", "images", "nps_url", "raw_listing_description", "raw_body_text"]
+
 # --- Extraction Logic ---
-def extract_trail_stats(trail_item: Dict[str, Any], client: genai.Client) -> Optional[TrailStats]:
-    title = trail_item.get("title", "")
-    
+def build_trail_context(trail_item: Dict[str, Any]) -> str:
+    """Collects the text Gemini sees for a candidate: descriptions, amenities and image captions."""
     # Normalize description from various NPS schemas (Places vs Things To Do)
     desc_parts = [
         strip_html_and_truncate(trail_item.get("listingDescription") or "") or "",
@@ -144,6 +202,155 @@ def extract_trail_stats(trail_item: Dict[str, Any], client: genai.Client) -> Opt
             # unique text only to save context
             unique_img_text = ". ".join(sorted(set(image_texts)))
             desc_context += f"\n\nImage Info: {unique_img_text}"
+
+    return desc_context
+
+
+def postprocess_stats(stats: Optional[TrailStats], trail_item: Dict[str, Any]) -> Optional[TrailStats]:
+    """Fills gaps in Gemini's answer from metrics and raw NPS fields."""
+    # If Gemini didn't extract difficulty but we have metrics, infer it
+    if stats and stats.is_valid_hiking_trail and stats.difficulty is None:
+        inferred = infer_difficulty_from_metrics(
+            stats.length_miles,
+            stats.elevation_gain_ft,
+            stats.estimated_time_hours
+        )
+        if inferred:
+            stats.difficulty = inferred
+
+    # If LLM didn't provide a clean_description, try to use cleaned listing/body text as fallback
+    if stats and not stats.clean_description:
+        candidate = strip_html_and_truncate(trail_item.get('listingDescription') or trail_item.get('bodyText') or '')
+        if candidate and len(candidate) > 30:
+            stats.clean_description = candidate
+    
+    # Post-process: Check amenities for pet-related info if LLM result is ambiguous
+    if stats and stats.is_valid_hiking_trail:
+        amenities = trail_item.get("amenities", [])
+        amenities_str = " ".join(amenities).lower()
+        if "pets allowed" in amenities_str:
+            stats.is_pet_friendly = True
+        elif "pets not allowed" in amenities_str or "no pets" in amenities_str:
+            stats.is_pet_friendly = False
+    
+    return stats
+
+
+def candidate_key(trail_item: Dict[str, Any]) -> str:
+    return str(trail_item.get("id") or trail_item.get("title", ""))
+
+
+def candidate_hash(trail_item: Dict[str, Any]) -> str:
+    """
+    Content hash of everything the extraction prompt sees (title, descriptions,
+    amenities, image captions) plus the prompt version.
+    """
+    payload = f"{PROMPT_VERSION}\n{trail_item.get('title', '')}\n{build_trail_context(trail_item)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def generate_with_backoff(client: genai.Client, limiter: Optional[AdaptiveRateLimiter], **kwargs):
+    """
+    client.models.generate_content paced by the limiter.
+    429s slow the limiter down and are retried; other errors propagate.
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        if limiter:
+            limiter.acquire()
+        try:
+            throttle("gemini")
+            response = client.models.generate_content(**kwargs)
+            if limiter:
+                limiter.on_success()
+            return response
+        except Exception as e:
+            if limiter and is_rate_limit_error(e) and attempt < MAX_RATE_LIMIT_RETRIES:
+                limiter.on_rate_limited()
+                continue
+            raise
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def build_batches(trail_items: List[Dict[str, Any]],
+                  max_size: int = MAX_BATCH_SIZE,
+                  max_tokens: int = MAX_BATCH_INPUT_TOKENS) -> List[List[Dict[str, Any]]]:
+    """
+    Greedily packs candidates into batches of at most max_size items and roughly
+    max_tokens of trail context. An oversized candidate gets a batch of its own.
+    """
+    batches, current, current_tokens = [], [], 0
+    for item in trail_items:
+        tokens = estimate_tokens(item.get("title", "") + build_trail_context(item)[:MAX_CONTEXT_CHARS])
+        if current and (len(current) >= max_size or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(trail_items: List[Dict[str, Any]]) -> str:
+    """One prompt for several candidates; the instructions are sent once per batch."""
+    blocks = [
+        f"--- ID: {candidate_key(item)}\n"
+        f"Title: '{item.get('title', '')}'\n"
+        f"Description: {build_trail_context(item)[:MAX_CONTEXT_CHARS]}"
+        for item in trail_items
+    ]
+    return (
+        f"You are a National Park expert. Analyze each of the following {len(trail_items)} places "
+        f"to see if it is a Hiking Trail.\n\n"
+        + "\n\n".join(blocks)
+        + "\n\nApply these instructions to EACH place independently and return one entry per place, "
+        "with 'id' set to the place's ID exactly as given.\n"
+        + EXTRACTION_INSTRUCTIONS
+    )
+
+
+def extract_batch_stats(trail_items: List[Dict[str, Any]], client: genai.Client,
+                        limiter: Optional[AdaptiveRateLimiter] = None) -> List[Optional[TrailStats]]:
+    """
+    Extracts stats for several candidates in one structured-output request.
+    Candidates the batch answer misses (or a failed batch) are retried one by one.
+    
+    Returns:
+        TrailStats, None (not a trail) or EXTRACTION_FAILED per input item, in input order
+    """
+    if len(trail_items) == 1:
+        return [extract_trail_stats(trail_items[0], client, limiter)]
+    
+    by_id: Dict[str, TrailStats] = {}
+    try:
+        response = generate_with_backoff(
+            client, limiter,
+            model=GEMINI_MODEL,
+            contents=build_batch_prompt(trail_items),
+            config={'response_mime_type': 'application/json', 'response_schema': TrailStatsBatch}
+        )
+        batch = response.parsed
+        for entry in (batch.trails if batch else []):
+            by_id[entry.id.strip()] = TrailStats(**entry.model_dump(exclude={"id"}))
+    except Exception as e:
+        print(f"Batch extraction failed for {len(trail_items)} trails, retrying individually: {e}")
+    
+    results = []
+    for item in trail_items:
+        stats = by_id.get(candidate_key(item))
+        if stats is not None:
+            results.append(postprocess_stats(stats, item))
+        else:
+            results.append(extract_trail_stats(item, client, limiter))
+    return results
+
+
+def extract_trail_stats(trail_item: Dict[str, Any], client: genai.Client, limiter: Optional[AdaptiveRateLimiter] = None) -> Optional[TrailStats]:
+    title = trail_item.get("title", "")
+    desc_context = build_trail_context(trail_item)
     
     # Pre-Computation Heuristic:
     if len(desc_context) < 50:
@@ -153,71 +360,85 @@ def extract_trail_stats(trail_item: Dict[str, Any], client: genai.Client) -> Opt
         f"You are a National Park expert. Analyze this place to see if it is a Hiking Trail.\n\n"
         f"Title: '{title}'\n"
         f"Description: {desc_context[:4000]}\n\n"
-        "Instructions:\n"
-        "1. DECIDE: Is this a SPECIFIC hiking trail or walking path? (True/False)\n"
-        "   - RETURN FALSE if it is a 'Day Use Area', 'Campground', 'Visitor Center', 'Parking Area'.\n"
-        "   - RETURN FALSE if it is a DRIVE-UP Overlook or Viewpoint (e.g. 'Sunset Point', 'Yovimpa Point') unless it explicitly describes a significant hike *starting* from there.\n"
-        "   - RETURN FALSE if it is a Ranger Program, Event, or Tour (e.g. 'Full Moon Hike', 'Rim Walk with a Ranger').\n"
-        "   - RETURN FALSE if it is a geological feature or point of interest without describing the trail to get there (e.g. 'Thor\\'s Hammer').\n"
-        "   - RETURN FALSE if it is a collection of routes (e.g. 'Southwest Area Winter Routes').\n"
-        "   - RETURN TRUE ONLY for specific, named hiking trails or defined walking loops.\n"
-        "2. IF TRUE, extract metrics:\n"
-        "   - 'difficulty' (Easy, Moderate, or Strenuous; can be null if not explicitly stated)\n"
-        "   - 'length_miles' (numeric)\n"
-        "   - 'elevation_gain_ft' (numeric)\n"
-        "   - 'route_type'\n"
-        "   - 'estimated_time_hours'\n"
-        "   - 'is_wheelchair_accessible': Look for 'wheelchair', 'paved', 'accessible', 'ADA'.\n"
-        "   - 'is_kid_friendly': Look for 'easy', 'family', 'kids', 'flat', 'short'.\n"
-        "   - 'is_pet_friendly': Look for 'pets allowed', 'dogs allowed', 'leashed pets', or 'Pets Allowed' in amenities. Set False if description says 'pets not allowed' or 'no pets' or 'no dogs'.\n"
-        "   - 'clean_description': Write a concise, 1-2 sentence description of the hike itself. Focus on what makes it unique and what hikers will see/do. EXCLUDE: hours of operation, rules/regulations, how to get there, accessibility requirements, parking info, permit requirements, HTML tags, and extra sections.\n"
+        + EXTRACTION_INSTRUCTIONS
     )
 
     try:
-        response = client.models.generate_content(
+        response = generate_with_backoff(
+            client, limiter,
             model=GEMINI_MODEL,
             contents=prompt,
             config={'response_mime_type': 'application/json', 'response_schema': TrailStats}
         )
-        stats = response.parsed
-        
-        # If Gemini didn't extract difficulty but we have metrics, infer it
-        if stats and stats.is_valid_hiking_trail and stats.difficulty is None:
-            inferred = infer_difficulty_from_metrics(
-                stats.length_miles,
-                stats.elevation_gain_ft,
-                stats.estimated_time_hours
-            )
-            if inferred:
-                stats.difficulty = inferred
-
-        # If LLM didn't provide a clean_description, try to use cleaned listing/body text as fallback
-        if stats and not stats.clean_description:
-            candidate = strip_html_and_truncate(trail_item.get('listingDescription') or trail_item.get('bodyText') or '')
-            if candidate and len(candidate) > 30:
-                stats.clean_description = candidate
-        
-        # Post-process: Check amenities for pet-related info if LLM result is ambiguous
-        if stats and stats.is_valid_hiking_trail:
-            amenities = trail_item.get("amenities", [])
-            amenities_str = " ".join(amenities).lower()
-            if "pets allowed" in amenities_str:
-                stats.is_pet_friendly = True
-            elif "pets not allowed" in amenities_str or "no pets" in amenities_str:
-                stats.is_pet_friendly = False
-        
-        return stats
+        if response.parsed is None:
+            print(f"Unparseable answer for {title}, will retry next run")
+            return EXTRACTION_FAILED
+        return postprocess_stats(response.parsed, trail_item)
     except Exception as e:
-        print(f"Error extracting for {title}: {e}")
-        return None
+        print(f"Error extracting for {title}, will retry next run: {e}")
+        return EXTRACTION_FAILED
+
+def build_enriched_trail(trail: Dict[str, Any], stats: Optional[TrailStats], source_hash: str) -> Dict[str, Any]:
+    """trails_v2.json record for a candidate. stats=None builds only the raw-derived fields."""
+    title = trail.get("title", "Unknown")
+    record = {
+        "id": trail.get("id"),
+        "name": title,
+        "location": {
+            # Handle both formats: location.lat/lon OR direct latitude/longitude fields
+            "lat": float(trail.get("location", {}).get("lat", 0) or trail.get("latitude", 0) or 0),
+            "lon": float(trail.get("location", {}).get("lon", 0) or trail.get("longitude", 0) or 0)
+        },
+        "images": trail.get("images", []),
+        "nps_url": trail.get("url"),
+        "raw_listing_description": strip_html_and_truncate(trail.get("listingDescription")),
+        "raw_body_text": strip_html_and_truncate(trail.get("bodyText")),
+        "source_hash": source_hash
+    }
+    if stats:
+        record.update({
+            "description": stats.clean_description or strip_html_and_truncate(trail.get("listingDescription") or trail.get("bodyText")) or title,
+            "difficulty": stats.difficulty,
+            "length_miles": stats.length_miles,
+            "elevation_gain_ft": stats.elevation_gain_ft,
+            "route_type": stats.route_type,
+            "estimated_time_hours": stats.estimated_time_hours,
+            "is_wheelchair_accessible": stats.is_wheelchair_accessible,
+            "is_kid_friendly": stats.is_kid_friendly,
+            "is_pet_friendly": stats.is_pet_friendly,
+            "last_enriched": datetime.now().isoformat()
+        })
+    return record
 
-def refine_trails(park_code: str, progress_callback=None) -> List[Dict]:
+
+def _load_refine_state(state_file: str) -> Dict[str, Dict[str, Any]]:
+    """candidate key -> {"hash", "valid"} from the previous run."""
+    if not os.path.exists(state_file):
+        return {}
+    try:
+        with open(state_file, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable refine state {state_file}: {e}")
+        return {}
+
+
+def _save_refine_state(state_file: str, state: Dict[str, Dict[str, Any]]):
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    with open(state_file, "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def refine_trails(park_code: str, progress_callback=None, full_refresh: bool = False) -> List[Dict]:
     """
     Programmatic entry point for trail refinement.
+    Incremental by default: candidates whose content hash is unchanged since the last
+    run are not sent to Gemini, and the existing trails_v2.json is merged, not replaced.
     
     Args:
         park_code: The park code (e.g., "BRCA")
         progress_callback: Optional callback function(current, total, message) for progress updates
+        full_refresh: Re-enrich every candidate and rebuild trails_v2.json from scratch
         
     Returns:
         List of enriched trail dictionaries
@@ -235,6 +456,7 @@ def refine_trails(park_code: str, progress_callback=None) -> List[Dict]:
     input_file = f"data_samples/nps/raw/{park_code.upper()}/raw_trails.json"
     output_dir = f"data_samples/ui_fixtures/{park_code.upper()}"
     output_file = f"{output_dir}/trails_v2.json"
+    state_file = f"data_samples/nps/raw/{park_code.upper()}/refine_state.json"
     
     if not os.path.exists(input_file):
         raise FileNotFoundError(f"Input file {input_file} not found")
@@ -249,58 +471,96 @@ def refine_trails(park_code: str, progress_callback=None) -> List[Dict]:
         else:
             trail_candidates = input_data
     
-    results = []
-    total = len(trail_candidates)
+    # Incremental mode: only candidates whose content hash changed go to Gemini
+    existing = []
+    if not full_refresh and os.path.exists(output_file):
+        with open(output_file, "r") as f:
+            existing = json.load(f)
+    existing_by_key = {str(t.get("id")): t for t in existing if t.get("id")}
     
-    if progress_callback:
-        progress_callback(0, total, f"Starting enrichment of {total} trail candidates...")
+    # The state only describes records in the output file: without it, every candidate is new
+    output_missing = not os.path.exists(output_file)
+    if output_missing and os.path.exists(state_file) and not full_refresh:
+        print(f"{output_file} is missing; ignoring {state_file} and re-enriching every candidate")
+    refine_state = {} if full_refresh or output_missing else _load_refine_state(state_file)
+    hashes = {candidate_key(t): candidate_hash(t) for t in trail_candidates}
+    pending = [t for t in trail_candidates
+               if refine_state.get(candidate_key(t), {}).get("hash") != hashes[candidate_key(t)]]
     
-    for i, trail in enumerate(trail_candidates):
-        title = trail.get("title", "Unknown")
-        
-        if progress_callback:
-            progress_callback(i, total, f"Processing: {title}")
-        
-        stats = extract_trail_stats(trail, client)
-        
-        if stats and stats.is_valid_hiking_trail:
-            enriched_trail = {
-                "id": trail.get("id"),
-                "name": title,
-                "description": stats.clean_description or strip_html_and_truncate(trail.get("listingDescription") or trail.get("bodyText")) or title,
-                "location": {
-                    # Handle both formats: location.lat/lon OR direct latitude/longitude fields
-                    "lat": float(trail.get("location", {}).get("lat", 0) or trail.get("latitude", 0) or 0),
-                    "lon": float(trail.get("location", {}).get("lon", 0) or trail.get("longitude", 0) or 0)
-                },
-                "images": trail.get("images", []),
-                "nps_url": trail.get("url"),
-                "difficulty": stats.difficulty,
-                "length_miles": stats.length_miles,
-                "elevation_gain_ft": stats.elevation_gain_ft,
-                "route_type": stats.route_type,
-                "estimated_time_hours": stats.estimated_time_hours,
-                "is_wheelchair_accessible": stats.is_wheelchair_accessible,
-                "is_kid_friendly": stats.is_kid_friendly,
-                "is_pet_friendly": stats.is_pet_friendly,
-                "raw_listing_description": strip_html_and_truncate(trail.get("listingDescription")),
-                "raw_body_text": strip_html_and_truncate(trail.get("bodyText")),
-                "last_enriched": datetime.now().isoformat()
-            }
-            results.append(enriched_trail)
-        
-        # Pacing to avoid rate limits
-        time.sleep(0.5)
+    total = len(pending)
+    
+    if progress_callback:
+        skipped = len(trail_candidates) - total
+        progress_callback(0, total, f"Starting enrichment of {total} trail candidates ({skipped} unchanged)...")
+    
+    # Concurrent batched extraction: bounded in-flight requests paced by a shared adaptive limiter.
+    # Results are keyed by candidate so output order matches the input.
+    limiter = AdaptiveRateLimiter(rate_per_sec=GEMINI_START_RPS, max_rate=GEMINI_MAX_RPS, name="Gemini")
+    stats_by_key: Dict[str, Optional[TrailStats]] = {}
+    
+    # Candidates with too little text are rejected without a request (same heuristic as extract_trail_stats)
+    extractable = [t for t in pending if len(build_trail_context(t)) >= 50]
+    batches = build_batches(extractable)
+    done = total - len(extractable)
+    
+    with ThreadPoolExecutor(max_workers=max(1, MAX_IN_FLIGHT)) as executor:
+        futures = {executor.submit(extract_batch_stats, batch, client, limiter): batch for batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            for trail, stats in zip(batch, future.result()):
+                stats_by_key[candidate_key(trail)] = stats
+            done += len(batch)
+            if progress_callback:
+                names = ", ".join(t.get("title", "Unknown") for t in batch)
+                progress_callback(done, total, f"Processed: {names}")
+    
+    stats_by_index = [stats_by_key.get(candidate_key(t)) for t in pending]
+    
+    refined, failed = {}, set()
+    for trail, stats in zip(pending, stats_by_index):
+        key = candidate_key(trail)
+        if stats is EXTRACTION_FAILED:
+            # No state entry for this hash, so the next run retries it
+            failed.add(key)
+            continue
+        is_valid = bool(stats and stats.is_valid_hiking_trail)
+        refine_state[key] = {"hash": hashes[key], "valid": is_valid}
+        if is_valid:
+            refined[key] = build_enriched_trail(trail, stats, hashes[key])
+    
+    # Merge: changed candidates take the new record (keeping fields added by later stages,
+    # e.g. rankings/reviews); unchanged ones keep their existing record with raw fields refreshed;
+    # failed extractions keep their existing record untouched.
+    results = []
+    for trail in trail_candidates:
+        key = candidate_key(trail)
+        previous = existing_by_key.get(key)
+        if key in refined:
+            results.append({**(previous or {}), **refined[key]})
+        elif key in failed:
+            if previous:
+                results.append(previous)
+        elif previous and refine_state.get(key, {}).get("valid"):
+            fresh = build_enriched_trail(trail, None, hashes[key])
+            previous.update({k: fresh[k] for k in RAW_DERIVED_FIELDS})
+            previous["source_hash"] = hashes[key]
+            results.append(previous)
     
     # Deduplicate trails with similar names (e.g., "X Trail" vs "X Trailhead")
     results = deduplicate_trails(results)
     
+    # Keep records no refine candidate produced (e.g. AllTrails-only trails appended by fetch_rankings)
+    candidate_keys = set(hashes)
+    results.extend(t for t in existing if "source_hash" not in t and str(t.get("id")) not in candidate_keys)
+    
     # Save results
     with open(output_file, "w") as f:
         json.dump(results, f, indent=2)
+    _save_refine_state(state_file, refine_state)
     
     if progress_callback:
-        progress_callback(total, total, f"Completed. Found {len(results)} valid trails.")
+        progress_callback(total, total, f"Completed. Found {len(results)} valid trails "
+                                        f"({total - len(failed)} re-enriched, {len(failed)} failed).")
     
     return results
 
@@ -311,8 +571,6 @@ def deduplicate_trails(trails: List[Dict]) -> List[Dict]:
     Also removes promotional program entries (e.g., "X Hike the Hoodoos").
     Keeps the entry with more complete data.
     """
-    from collections import defaultdict
-    
     def normalize_name(name: str) -> str:
         """Normalize trail name for comparison."""
         name = name.lower()
@@ -347,10 +605,7 @@ def deduplicate_trails(trails: List[Dict]) -> List[Dict]:
             trail['difficulty'] = 'Strenuous'
     
     # Group by normalized name
-    groups = defaultdict(list)
-    for trail in trails:
-        norm = normalize_name(trail.get('name', ''))
-        groups[norm].append(trail)
+    groups = TrailNameIndex(trails, key_fn=normalize_name).groups()
     
     # For each group, keep the best one
     deduped = []
@@ -391,6 +646,8 @@ def main():
     
     # Allow overriding PARK_CODE via env var for quick testing
     park_code = os.getenv("PARK_CODE", PARK_CODE)
+    # REFINE_FULL=1 re-enriches every candidate instead of only changed ones
+    full_refresh = os.getenv("REFINE_FULL", "").lower() in ("1", "true", "yes")
     
     def cli_progress(current, total, message):
         if current == 0:
@@ -401,7 +658,7 @@ def main():
             print(f"\n✨ {message}")
     
     try:
-        results = refine_trails(park_code, progress_callback=cli_progress)
+        results = refine_trails(park_code, progress_callback=cli_progress, full_refresh=full_refresh)
         print(f"📂 Saved {len(results)} trails to data_samples/ui_fixtures/{park_code.upper()}/trails_v2.json")
     except FileNotFoundError as e:
         print(f"Error: {e}")
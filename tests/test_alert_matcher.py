@@ -0,0 +1,88 @@
+import sys
+import os
+import tempfile
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models import Alert
+from app.services.data_manager import DataManager
+from app.utils.alert_matcher import AlertIndex, get_alert_index, get_alert_matches
+
+MOCK_ALERTS = [
+    Alert(id="1", parkCode="brca", title="Navajo Loop Closed", category="Park Closure",
+          description="The Navajo Loop is closed due to rockfall.", url="https://nps.gov/a1", lastIndexedDate=""),
+    Alert(id="2", parkCode="glac", title="Going-to-the-Sun Road Seasonal Closure", category="Information",
+          description="Vehicle access is limited.", lastIndexedDate=""),
+    # Raw dict alerts (as loaded from the daily cache) are supported too
+    {"id": "3", "title": "Wall Street detour", "category": "Caution",
+     "description": "Use Queens Garden instead.", "url": None},
+]
+
+
+def test_core_name_and_phrase_matching():
+    index = AlertIndex(MOCK_ALERTS)
+
+    hit = index.match("Navajo Loop Trailhead")
+    assert hit == {"title": "Navajo Loop Closed", "category": "Park Closure", "url": "https://nps.gov/a1"}
+
+    # Two-word phrase inside a hyphenated compound
+    assert index.match("Going to the Sun Road")["title"] == "Going-to-the-Sun Road Seasonal Closure"
+    # Any two-word phrase of a longer name is enough
+    assert index.match("Wall Street and Queens Garden Loop Trail")["category"] == "Caution"
+
+
+    # Slash- and comma-joined names are separate words
+    joined = AlertIndex([{"id": "4", "title": "Mist Trail/Vernal Fall closed", "category": "Park Closure",
+                          "description": "Also affects Angels Landing,West Rim."}])
+    assert joined.match("Vernal Fall")["title"] == "Mist Trail/Vernal Fall closed"
+    assert joined.match("Mist Trail") is not None
+    assert joined.match("Angels Landing") is not None and joined.match("West Rim Trail") is not None
+
+
+def test_no_false_positives():
+    index = AlertIndex(MOCK_ALERTS)
+    # Single shared words are not enough ("loop", "road")
+    assert index.match("Fairyland Loop") is None
+    assert index.match("Tioga Road") is None
+    # Names made only of generic/short words never match
+    assert index.match("The Trail") is None
+    assert index.match("") is None
+    assert AlertIndex([]).match("Navajo Loop") is None
+
+
+def test_match_all_and_shared_index():
+    index = get_alert_index(MOCK_ALERTS)
+    assert get_alert_index(list(MOCK_ALERTS)) is index
+
+    matches = index.match_all(["Navajo Loop", "Fairyland Loop", "Queens Garden Trail"])
+    assert sorted(matches) == ["Navajo Loop", "Queens Garden Trail"]
+
+
+def test_cached_matches_follow_fixture_changes():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            dm = DataManager(base_dir=tmp_dir)
+            dm.save_fixture("BRCA", "trails_v2.json", [{"name": "Fairyland Loop"}])
+            assert get_alert_matches("BRCA", MOCK_ALERTS, dm)["trails"] == {}
+
+            # Trails refined after the day's matches were cached: rebuilt, not served stale
+            dm.save_fixture("BRCA", "trails_v2.json", [{"name": "Fairyland Loop"}, {"name": "Navajo Loop Trail"}])
+            assert list(get_alert_matches("BRCA", MOCK_ALERTS, dm)["trails"]) == ["Navajo Loop Trail"]
+            assert list(dm.load_daily_cache("BRCA", "alert_matches")["trails"]) == ["Navajo Loop Trail"]
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    try:
+        test_core_name_and_phrase_matching()
+        test_no_false_positives()
+        test_match_all_and_shared_index()
+        test_cached_matches_follow_fixture_changes()
+        print("✅ ALL ALERT MATCHER TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
@@ -0,0 +1,162 @@
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models import Amenity
+from app.clients.external_client import ExternalClient, dedupe_amenities
+from app.services.data_manager import DataManager
+from app.utils.rate_limiter import AdaptiveRateLimiter
+import scripts.admin_fetch_amenities as admin_fetch_amenities
+from scripts.refine_amenities import consolidate_park
+
+# --- MOCK DATA ---
+MOCK_ENTRANCES = [
+    {"name": "South Entrance", "lat": 37.5071, "lon": -119.6323},
+    {"name": "Arch Rock Entrance", "lat": 37.6861, "lon": -119.7310},
+]
+
+SHARED_GAS = Amenity(name="El Portal Market", type="Gas station", address="El Portal, CA",
+                     latitude=37.6746, longitude=-119.7838,
+                     google_maps_url="https://www.google.com/maps/place/?q=place_id:1")
+
+
+def mock_place(name, lat, lon):
+    return Amenity(name=name, address="Somewhere", latitude=lat, longitude=lon)
+
+
+class MockExternalClient(ExternalClient):
+    """Serves canned results instead of calling Serper, recording each request."""
+    def __init__(self, delay=0.0):
+        super().__init__(serper_key="test-key")
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _post_maps(self, query, lat, lon, zoom):
+        with self._lock:
+            self.requests.append((query, round(lat, 4), round(lon, 4), zoom))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if query == "gas station":
+            # Both hubs see the same station
+            return [SHARED_GAS, mock_place(f"Gas near {lat}", lat + 0.01, lon)]
+        return [mock_place(f"{query} near {lat}", lat + 0.02, lon)]
+
+
+class MockNPSClient:
+    def get_places(self, park_code):
+        return []
+
+    def get_visitor_centers(self, park_code):
+        return []
+
+
+def test_dedupe_amenities_by_place_id_or_coordinates():
+    duplicate_by_coords = mock_place("Cafe", 37.50001, -119.6)
+    amenities = [SHARED_GAS, mock_place("Cafe", 37.5, -119.6), SHARED_GAS, duplicate_by_coords]
+    assert [a.name for a in dedupe_amenities(amenities)] == ["El Portal Market", "Cafe"]
+
+
+def test_bulk_search_runs_concurrently_and_shares_identical_requests():
+    client = MockExternalClient(delay=0.05)
+    searches = [
+        ("restaurant", 37.5071, -119.6323, "11z"),
+        ("restaurant", 37.50711, -119.63231, "11z"),  # same request after rounding
+        ("gas station", 37.5071, -119.6323, "11z"),
+        ("grocery store", 37.6861, -119.7310, "11z"),
+    ]
+    results = client.search_maps_bulk(searches, max_workers=4, limiter=AdaptiveRateLimiter(rate_per_sec=100))
+
+    assert len(results) == 4
+    assert [a.name for a in results[0]] == [a.name for a in results[1]]
+    assert len(client.requests) == 3
+    assert client.max_in_flight > 1
+
+
+def test_fetch_writes_consolidated_and_reuses_cache():
+    original_mine_entrances = admin_fetch_amenities.mine_entrances
+    admin_fetch_amenities.mine_entrances = lambda park_code, places, vcs: MOCK_ENTRANCES
+    saved_env = {key: os.environ.get(key) for key in ("NPS_API_KEY", "SERPER_API_KEY")}
+    os.environ.update({key: value or "test-key" for key, value in saved_env.items()})
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dm = DataManager(base_dir=tmp_dir)
+            client = MockExternalClient()
+            result = admin_fetch_amenities.fetch_amenities_for_park(
+                "yose", nps_client=MockNPSClient(), external_client=client, data_manager=dm
+            )
+
+            assert len(client.requests) == len(MOCK_ENTRANCES) * len(admin_fetch_amenities.TASKS)
+            with open(os.path.join(tmp_dir, "YOSE", "amenities_consolidated.json")) as f:
+                consolidated = json.load(f)
+            assert consolidated == result["consolidated"]
+            assert set(consolidated["hubs"]) == {"South Entrance", "Arch Rock Entrance"}
+            gas = consolidated["hubs"]["Arch Rock Entrance"]["amenities"]["Gas Station"]
+            # Sorted by distance from the hub
+            assert gas[0]["distance_miles"] <= gas[1]["distance_miles"]
+            assert dm.load_amenities("YOSE", "South Entrance")["gas station"][0]["name"] == "El Portal Market"
+
+            # Second run: every category is cached, no Serper requests
+            client.requests.clear()
+            admin_fetch_amenities.fetch_amenities_for_park(
+                "YOSE", nps_client=MockNPSClient(), external_client=client, data_manager=dm
+            )
+            assert client.requests == []
+    finally:
+        admin_fetch_amenities.mine_entrances = original_mine_entrances
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+
+
+def test_consolidate_park_sorts_dedupes_and_indexes():
+    shared = SHARED_GAS.model_dump()
+    near_south = mock_place("South Gas", 37.5171, -119.6323).model_dump()
+    far = [mock_place(f"Far Gas {i}", 38.0 + i * 0.1, -119.6323).model_dump() for i in range(6)]
+    hubs = [
+        {"name": "South Entrance", "lat": 37.5071, "lon": -119.6323,
+         "amenities": {"gas station": far + [shared, near_south, dict(near_south)]}},
+        {"name": "Arch Rock Entrance", "lat": 37.6861, "lon": -119.7310,
+         "amenities": {"gas station": [shared]}},
+        {"name": "Unknown Hub", "lat": None, "lon": None,
+         "amenities": {"restaurant": [near_south], "gas station": [shared]}},
+    ]
+    consolidated, index = consolidate_park("yose", hubs)
+
+    south = consolidated["hubs"]["South Entrance"]["amenities"]["Gas Station"]
+    assert [i["name"] for i in south[:2]] == ["South Gas", "El Portal Market"]  # nearest first, repeat dropped
+    assert len(south) == 5
+    assert consolidated["hubs"]["Unknown Hub"]["amenities"]["Food"][0]["distance_miles"] == 0.0
+
+    # Index: the shared station appears once, at its nearest hub
+    # (not at the hub without coordinates, whose distance is unknown)
+    shared_rows = [r for r in index["rows"] if r["name"] == "El Portal Market"]
+    assert len(shared_rows) == 1 and shared_rows[0]["hub"] == "Arch Rock Entrance"
+    assert shared_rows[0]["distance_miles"] > 0
+    distances = [r["distance_miles"] for r in index["rows"]]
+    assert distances[-1] is None and distances[:-1] == sorted(distances[:-1])
+    assert index["rows"][-1]["hub"] == "Unknown Hub"
+    assert len(index["rows"]) == 1 + 1 + 6 + 1  # shared, south gas, far x6, food
+
+
+if __name__ == "__main__":
+    try:
+        test_dedupe_amenities_by_place_id_or_coordinates()
+        test_bulk_search_runs_concurrently_and_shares_identical_requests()
+        test_fetch_writes_consolidated_and_reuses_cache()
+        test_consolidate_park_sorts_dedupes_and_indexes()
+        print("✅ ALL AMENITY FETCH TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
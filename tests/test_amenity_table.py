@@ -0,0 +1,123 @@
+import sys
+import os
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.engine.amenity_table import AmenityTable, ENTRANCE_CATEGORY
+from app.services.data_manager import DataManager
+
+FIXTURES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data_samples', 'ui_fixtures'))
+
+# --- MOCK DATA (amenities_consolidated.json shape) ---
+SHARED_GAS = {"name": "El Portal Market", "type": "Gas station", "address": "El Portal, CA",
+              "latitude": 37.6746, "longitude": -119.7838,
+              "google_maps_url": "https://www.google.com/maps/place/?q=place_id:1"}
+
+MOCK_CONSOLIDATED = {
+    "park_code": "YOSE",
+    "hubs": {
+        "Arch Rock Entrance": {
+            "location": {"lat": 37.6861, "lon": -119.7310},
+            "amenities": {
+                "Gas Station": [{**SHARED_GAS, "distance_miles": 2.9}],
+                "Food": [{"name": "Cedar House", "address": "El Portal", "latitude": 37.67,
+                          "longitude": -119.78, "distance_miles": 3.1}],
+            }
+        },
+        "South Entrance": {
+            "location": {"lat": 37.5071, "lon": -119.6323},
+            "amenities": {
+                "Gas Station": [
+                    {"name": "Wawona Gas", "address": "Wawona", "latitude": 37.5369,
+                     "longitude": -119.6553, "distance_miles": 2.4},
+                    {**SHARED_GAS, "distance_miles": 13.5},
+                ],
+            }
+        },
+    }
+}
+
+
+def test_hub_view_includes_entrances_and_is_not_mutable():
+    table = AmenityTable.from_consolidated("yose", MOCK_CONSOLIDATED)
+    view = table.hub_view()
+
+    assert list(view["Arch Rock Entrance"]) == ["Gas Station", "Food", ENTRANCE_CATEGORY]
+    assert view["South Entrance"][ENTRANCE_CATEGORY][0]["type"] == "entrance"
+    # Source data is left alone
+    assert ENTRANCE_CATEGORY not in MOCK_CONSOLIDATED["hubs"]["South Entrance"]["amenities"]
+
+    view["South Entrance"]["Gas Station"].clear()
+    view["South Entrance"][ENTRANCE_CATEGORY].append({"name": "Extra"})
+    again = table.hub_view()
+    assert len(again["South Entrance"]["Gas Station"]) == 2
+    assert len(again["South Entrance"][ENTRANCE_CATEGORY]) == 1
+
+
+def test_rows_dedupe_across_hubs_and_lookups():
+    table = AmenityTable.from_consolidated("YOSE", MOCK_CONSOLIDATED)
+
+    gas = table.lookup(category="gas station")
+    assert [(r.amenity.name, r.hub) for r in gas] == [
+        ("Wawona Gas", "South Entrance"), ("El Portal Market", "Arch Rock Entrance")
+    ]
+    assert [r.amenity.name for r in table.lookup(max_distance_miles=2.5)] == [
+        "Arch Rock Entrance", "South Entrance", "Wawona Gas"
+    ]
+
+    # Radius around Wawona: its gas station and the South Entrance, nearest first
+    nearby = table.within(37.5369, -119.6553, 3.0)
+    assert [row.amenity.name for row, _ in nearby] == ["Wawona Gas", "South Entrance"]
+    assert table.within(37.5369, -119.6553, 3.0, category="Food") == []
+
+    names = [a.name for a in table.chat_amenities]
+    assert names.count("El Portal Market") == 1
+    assert len(names) == 2 + 3  # entrances + unique places
+
+
+def test_hub_without_location_does_not_claim_places():
+    consolidated = {**MOCK_CONSOLIDATED, "hubs": {
+        **MOCK_CONSOLIDATED["hubs"],
+        # Older consolidated files store 0.0 for items of a hub without coordinates
+        "Unknown Hub": {"location": {"lat": None, "lon": None},
+                        "amenities": {"Gas Station": [{**SHARED_GAS, "distance_miles": 0.0}]}},
+    }}
+    table = AmenityTable.from_consolidated("YOSE", consolidated)
+    shared = [r for r in table.lookup(category="Gas Station") if r.amenity.name == "El Portal Market"]
+    assert [(r.hub, r.distance_miles) for r in shared] == [("Arch Rock Entrance", 2.9)]
+    assert "El Portal Market" not in [r.amenity.name for r in table.lookup(max_distance_miles=1.0)]
+
+
+def test_committed_indexes_have_no_zero_distances_at_unlocated_hubs():
+    dm = DataManager(base_dir=FIXTURES_DIR)
+    for park_code in sorted(os.listdir(FIXTURES_DIR)):
+        index = dm.load_amenity_index(park_code)
+        if not index:
+            continue
+        unlocated = {name for name, loc in index["hubs"].items() if loc.get("lat") is None or loc.get("lon") is None}
+        bad = [r["name"] for r in index["rows"] if r["hub"] in unlocated and r["distance_miles"] is not None]
+        assert bad == [], f"{park_code}: {len(bad)} rows with a distance from a hub without coordinates"
+
+
+def test_index_rows_are_used_when_present():
+    index = {"park_code": "YOSE", "hubs": {}, "rows": [
+        {"name": "Far Diner", "address": "Oakhurst", "latitude": 37.33, "longitude": -119.65,
+         "category": "Food", "hub": "South Entrance", "distance_miles": 12.0},
+    ]}
+    table = AmenityTable.from_consolidated("YOSE", MOCK_CONSOLIDATED, index)
+    assert [r.amenity.name for r in table.lookup(category="Food")] == ["Far Diner"]
+    assert table.categories() == [ENTRANCE_CATEGORY, "Food"]
+
+
+if __name__ == "__main__":
+    try:
+        test_hub_view_includes_entrances_and_is_not_mutable()
+        test_rows_dedupe_across_hubs_and_lookups()
+        test_hub_without_location_does_not_claim_places()
+        test_committed_indexes_have_no_zero_distances_at_unlocated_hubs()
+        test_index_rows_are_used_when_present()
+        print("✅ ALL AMENITY TABLE TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
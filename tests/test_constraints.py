@@ -0,0 +1,98 @@
+import sys
+import os
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models import TrailSummary, Alert
+from app.engine.constraints import ConstraintEngine, UserPreference, SearchWeights
+
+MOCK_TRAILS = [
+    TrailSummary(name="Valley Loop", parkCode="yose", difficulty="easy", length_miles=2.0,
+                 average_rating=4.5, features=["Dog Friendly", "Kid Friendly"]),
+    TrailSummary(name="Mist Trail", parkCode="yose", difficulty="hard", length_miles=6.0,
+                 average_rating=4.9, features=["No Dogs Allowed"]),
+    TrailSummary(name="Lower Falls", parkCode="yose", difficulty="Moderate", length_miles=1.0,
+                 average_rating=3.0, features=["Wheelchair Accessible", "dogs on leash"]),
+    TrailSummary(name="Unrated Path", parkCode="yose", difficulty="Strenuous", length_miles=25.0),
+    TrailSummary(name="Mixed Signals", parkCode="yose", difficulty="easy", length_miles=1.5,
+                 average_rating=4.0, features=["dog friendly", "no dogs in summer"]),
+]
+
+
+def _names(trails):
+    return [t.name for t in trails]
+
+
+def test_filter_defaults_keep_order():
+    """Default preferences only drop trails over the length cap."""
+    engine = ConstraintEngine()
+    result = engine.filter_trails(MOCK_TRAILS, UserPreference())
+    assert _names(result) == ["Valley Loop", "Mist Trail", "Lower Falls", "Mixed Signals"]
+
+
+def test_filter_difficulty_and_rating():
+    engine = ConstraintEngine()
+    prefs = UserPreference(max_difficulty="moderate", min_rating=3.5)
+    assert _names(engine.filter_trails(MOCK_TRAILS, prefs)) == ["Valley Loop", "Mixed Signals"]
+
+
+def test_filter_feature_flags():
+    engine = ConstraintEngine()
+    assert _names(engine.filter_trails(MOCK_TRAILS, UserPreference(dog_friendly=True))) == ["Valley Loop", "Lower Falls"]
+    assert _names(engine.filter_trails(MOCK_TRAILS, UserPreference(kid_friendly=True))) == ["Valley Loop"]
+    assert _names(engine.filter_trails(MOCK_TRAILS, UserPreference(wheelchair_accessible=True))) == ["Lower Falls"]
+
+
+def test_cached_index_is_reused():
+    engine = ConstraintEngine()
+    index = engine.index_trails("yose", MOCK_TRAILS)
+    assert engine._get_index(MOCK_TRAILS) is index
+    # A different list (e.g. a re-fetch) never reuses a stale index
+    assert engine._get_index(list(MOCK_TRAILS)) is not index
+    assert engine.filter_trails([], UserPreference()) == []
+
+
+def test_search_trails_ranking():
+    """Higher rating/popularity wins; alerts and bad zone weather push trails down."""
+    engine = ConstraintEngine()
+    trails = [
+        TrailSummary(name="Angels Landing", parkCode="zion", average_rating=4.9, popularity_rank=1, weather_zone="Canyon"),
+        TrailSummary(name="Emerald Pools", parkCode="zion", average_rating=4.5, popularity_rank=3, weather_zone="Canyon"),
+        TrailSummary(name="Kolob Arch", parkCode="zion", average_rating=4.6, popularity_rank=2, weather_zone="Kolob"),
+        TrailSummary(name="Pa'rus Trail", parkCode="zion", average_rating=4.0),
+    ]
+
+    top = engine.search_trails(trails, top_k=2)
+    assert [m.trail.name for m in top] == ["Angels Landing", "Kolob Arch"]
+    assert top[0].score >= top[1].score
+
+    alerts = [Alert(id="1", parkCode="zion", title="Angels Landing permits required",
+                    description="", category="Information", lastIndexedDate="")]
+    zone_weather = {"Kolob": {"zone_name": "Kolob", "elevation_ft": 7000,
+                              "current_temp_f": 20.0, "current_condition": "Heavy snow"}}
+    top = engine.search_trails(trails, alerts=alerts, zone_weather=zone_weather, top_k=2)
+    assert [m.trail.name for m in top] == ["Emerald Pools", "Pa'rus Trail"]
+
+
+def test_search_trails_filters_and_length():
+    engine = ConstraintEngine()
+    weights = SearchWeights(rating=0.0, popularity=0.0, length=1.0)
+    top = engine.search_trails(MOCK_TRAILS, UserPreference(max_difficulty="moderate"),
+                               weights=weights, target_length_miles=1.2, top_k=5)
+    assert [m.trail.name for m in top] == ["Lower Falls", "Mixed Signals", "Valley Loop"]
+    assert engine.search_trails(MOCK_TRAILS, top_k=0) == []
+
+
+if __name__ == "__main__":
+    try:
+        test_filter_defaults_keep_order()
+        test_filter_difficulty_and_rating()
+        test_filter_feature_flags()
+        test_cached_index_is_reused()
+        test_search_trails_ranking()
+        test_search_trails_filters_and_length()
+        print("✅ ALL CONSTRAINT TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
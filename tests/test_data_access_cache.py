@@ -0,0 +1,161 @@
+import sys
+import os
+import json
+import tempfile
+import logging
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models import Alert
+from app.services.data_manager import DataManager
+from app.services.registry import ServiceRegistry, get_services, set_services
+from app.ui import data_access
+
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+MOCK_CAMPGROUNDS = [{"id": "1", "name": "Watchman Campground", "description": "Near the South Entrance."}]
+
+
+class CountingDataManager(DataManager):
+    """Counts fixture reads."""
+    def __init__(self, base_dir):
+        super().__init__(base_dir=base_dir)
+        self.loads = 0
+
+    def load_fixture(self, park_code, filename):
+        self.loads += 1
+        return super().load_fixture(park_code, filename)
+
+
+def test_static_data_is_cached_until_files_change_or_invalidated():
+    original = get_services()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dm = CountingDataManager(tmp_dir)
+        set_services(ServiceRegistry(base_dir=tmp_dir, overrides={"data_manager": dm}))
+        try:
+            data_access.invalidate_park_data()
+            dm.save_fixture("TEST", "campgrounds.json", MOCK_CAMPGROUNDS)
+
+            first = data_access.get_park_static_data("TEST")
+            reads = dm.loads
+            assert reads > 0 and first["campgrounds"][0].name == "Watchman Campground"
+
+            # Rerun with nothing changed: no fixture reads
+            again = data_access.get_park_static_data("TEST")
+            assert dm.loads == reads
+            assert again["campgrounds"][0].name == "Watchman Campground"
+
+            # A new fixture file changes the park's signature
+            dm.save_fixture("TEST", "webcams.json", [])
+            data_access.get_park_static_data("TEST")
+            assert dm.loads == 2 * reads
+
+            # Explicit invalidation
+            data_access.invalidate_park_data("test")
+            data_access.get_park_static_data("TEST")
+            assert dm.loads == 3 * reads
+        finally:
+            set_services(original)
+            data_access.invalidate_park_data()
+
+
+class MockNPSClient:
+    def __init__(self):
+        self.alert_calls = 0
+
+    def get_alerts(self, park_code):
+        self.alert_calls += 1
+        return [Alert(id="1", parkCode="test", title="Watchman Campground closed", category="Park Closure",
+                      description="", lastIndexedDate="")]
+
+    def get_events(self, park_code):
+        return []
+
+
+def test_cold_day_load_is_not_repeated_after_its_own_writes():
+    original, cwd = get_services(), os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        dm = CountingDataManager(tmp_dir)
+        set_services(ServiceRegistry(base_dir=tmp_dir, overrides={"data_manager": dm}))
+        try:
+            data_access.clear_volatile_cache()
+            dm.save_fixture("TEST", "campgrounds.json", MOCK_CAMPGROUNDS)
+            orchestrator = type("MockOrchestrator", (), {"nps": MockNPSClient(), "weather": None})()
+
+            first = data_access.get_volatile_data("TEST", orchestrator)
+            assert orchestrator.nps.alert_calls == 1
+            assert list(first["alert_matches"]["campgrounds"]) == ["Watchman Campground"]
+            loads = dm.loads
+
+            # The loader wrote alerts.json/alert_matches.json/events.json itself: the rerun is a memory hit
+            assert data_access.get_volatile_data("TEST", orchestrator) is not None
+            assert dm.loads == loads
+
+            # Someone else rewrites today's cache: reloaded from disk, not refetched
+            dm.save_daily_cache("TEST", "events", [{"title": "Star Party", "description": "", "date_start": "2026-07-04"}])
+            assert [e.title for e in data_access.get_volatile_data("TEST", orchestrator)["events"]] == ["Star Party"]
+            assert dm.loads > loads and orchestrator.nps.alert_calls == 1
+        finally:
+            data_access.clear_volatile_cache()
+            set_services(original)
+            os.chdir(cwd)
+
+
+class FlakyNPSClient(MockNPSClient):
+    """Alerts API fails on the first call."""
+    def get_alerts(self, park_code):
+        if self.alert_calls == 0:
+            self.alert_calls += 1
+            raise ConnectionError("NPS API unavailable")
+        return super().get_alerts(park_code)
+
+
+def test_failed_fetch_is_retried_on_next_rerun():
+    original, cwd = get_services(), os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        dm = CountingDataManager(tmp_dir)
+        set_services(ServiceRegistry(base_dir=tmp_dir, overrides={"data_manager": dm}))
+        try:
+            data_access.clear_volatile_cache()
+            dm.save_fixture("TEST", "campgrounds.json", MOCK_CAMPGROUNDS)
+            orchestrator = type("MockOrchestrator", (), {"nps": FlakyNPSClient(), "weather": None})()
+
+            assert data_access.get_volatile_data("TEST", orchestrator)["alerts"] == []
+            # The partial result wasn't cached: the next rerun fetches the alerts again
+            assert len(data_access.get_volatile_data("TEST", orchestrator)["alerts"]) == 1
+            assert orchestrator.nps.alert_calls == 2
+
+            # Complete now, so cached
+            data_access.get_volatile_data("TEST", orchestrator)
+            assert orchestrator.nps.alert_calls == 2
+        finally:
+            data_access.clear_volatile_cache()
+            set_services(original)
+            os.chdir(cwd)
+
+
+def test_fixtures_signature_tracks_json_files():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dm = DataManager(base_dir=tmp_dir)
+        assert dm.fixtures_signature("ZION") == ()
+        dm.save_fixture("ZION", "alerts.json", [])
+        signature = dm.fixtures_signature("ZION")
+        assert [entry[0] for entry in signature] == ["alerts.json"]
+        with open(os.path.join(tmp_dir, "ZION", "alerts.json"), "w") as f:
+            json.dump([{"id": "a"}], f)
+        assert dm.fixtures_signature("ZION") != signature
+
+
+if __name__ == "__main__":
+    try:
+        test_static_data_is_cached_until_files_change_or_invalidated()
+        test_cold_day_load_is_not_repeated_after_its_own_writes()
+        test_failed_fetch_is_retried_on_next_rerun()
+        test_fixtures_signature_tracks_json_files()
+        print("✅ ALL DATA ACCESS CACHE TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
@@ -0,0 +1,105 @@
+import sys
+import os
+import tempfile
+from datetime import date
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models import Event
+from app.engine.event_index import EventIndex, dedupe_events, parse_event_date
+from app.orchestrator import OutdoorConciergeOrchestrator
+from app.services.data_manager import DataManager
+
+# --- MOCK DATA (NPS recurring events arrive as one instance per occurrence) ---
+ALL_DATES = ["2026-07-01", "2026-07-03", "2026-07-05"]
+MOCK_EVENTS = [
+    Event(title="Ranger Talk", description="Geology", date_start="2026-07-01", dates=ALL_DATES),
+    Event(title="Ranger Talk", description="Geology", date_start="2026-07-03", dates=ALL_DATES,
+          images=[{"url": "https://example.com/talk.jpg"}]),
+    Event(title="Star Party", description="Telescopes", date_start="2026-07-04", dates=["2026-07-04"],
+          images=[{"url": "https://example.com/stars.jpg"}]),
+    Event(title="Art Exhibit", description="All summer", date_start="2026-06-15", date_end="2026-08-15"),
+    Event(title="Mystery", description="No dates", date_start="TBD"),
+]
+
+
+class MockNPSClient:
+    def __init__(self):
+        self.calls = 0
+
+    def get_events(self, park_code):
+        self.calls += 1
+        return MOCK_EVENTS
+
+
+def test_dedupe_merges_dates_without_mutating():
+    merged = dedupe_events(MOCK_EVENTS + [{"title": "Star Party", "description": "x", "date_start": "2026-07-11",
+                                           "dates": ["2026-07-11"]}])
+    assert [e.title for e in merged] == ["Ranger Talk", "Star Party", "Art Exhibit", "Mystery"]
+    assert merged[1].dates == ["2026-07-04", "2026-07-11"]
+    assert merged[0].images[0].url == "https://example.com/talk.jpg"
+    # Cached instances are left alone
+    assert MOCK_EVENTS[0].images == [] and MOCK_EVENTS[2].dates == ["2026-07-04"]
+
+
+def test_calendar_lookups():
+    index = EventIndex(MOCK_EVENTS)
+    assert len(index) == 4
+    assert index.dates_by_event["Ranger Talk"] == [date(2026, 7, 1), date(2026, 7, 3), date(2026, 7, 5)]
+    assert [e.title for e in index.events_by_date[date(2026, 7, 4)]] == ["Star Party"]
+
+    # Same-day ties keep first-seen order
+    assert [e.title for e in index.on("2026-07-03")] == ["Ranger Talk", "Art Exhibit"]
+    # Ordered by first occurrence in the window (the exhibit is already running on the 2nd)
+    assert [e.title for e in index.between("2026-07-02", "2026-07-04")] == ["Art Exhibit", "Ranger Talk", "Star Party"]
+    assert [e.title for e in index.for_visit("2026-07-04", duration_days=2)] == ["Star Party", "Art Exhibit", "Ranger Talk"]
+    assert index.on("2026-09-01") == []
+    assert index.between("next week") == []
+
+    assert [e.title for e in index.upcoming("2026-07-04")] == ["Star Party", "Art Exhibit", "Ranger Talk"]
+    assert index.upcoming("2026-09-01") == []
+    assert EventIndex([]).upcoming() == []
+
+    assert parse_event_date("2026-07-04T10:00:00") == date(2026, 7, 4)
+    assert parse_event_date("") is None
+
+
+def test_orchestrator_event_index_is_cached_deduplicated():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            nps = MockNPSClient()
+            dm = DataManager(base_dir=tmp_dir)
+            orch = OutdoorConciergeOrchestrator(
+                llm_service=None, nps_client=nps, weather_client=None, external_client=None,
+                data_manager=dm, review_scraper=object(), park_fetcher=object()
+            )
+            index = orch.get_event_index("zion")
+            assert len(dm.load_daily_cache("ZION", "events")) == 4
+
+            # Same cache file: same index, no refetch
+            assert orch.get_event_index("ZION") is index
+            assert nps.calls == 1
+
+            # A fresh orchestrator reads the deduplicated cache
+            other = OutdoorConciergeOrchestrator(
+                llm_service=None, nps_client=nps, weather_client=None, external_client=None,
+                data_manager=dm, review_scraper=object(), park_fetcher=object()
+            )
+            assert [e.title for e in other.get_event_index("ZION").on("2026-07-05")] == ["Ranger Talk", "Art Exhibit"]
+            assert nps.calls == 1
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    try:
+        test_dedupe_merges_dates_without_mutating()
+        test_calendar_lookups()
+        test_orchestrator_event_index_is_cached_deduplicated()
+        print("✅ ALL EVENT INDEX TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
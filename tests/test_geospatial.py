@@ -0,0 +1,99 @@
+import sys
+import os
+import tempfile
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models import Campground, GeoLocation
+from app.orchestrator import OutdoorConciergeOrchestrator
+from app.services.data_manager import DataManager
+from app.utils.geospatial import SpatialIndex, calculate_distance, haversine_miles, mine_entrances
+
+MOCK_POINTS = [
+    {"name": "Zion Lodge", "latitude": "37.2507", "longitude": "-112.9563"},
+    {"name": "Grotto", "location": {"lat": 37.2591, "lon": -112.9509}},
+    {"name": "Springdale", "latitude": 37.1889, "longitude": -112.9985},
+    {"name": "Kolob Canyons VC", "latitude": 37.4537, "longitude": -113.2252},
+    {"name": "No Coords", "latitude": "", "longitude": ""},
+]
+
+
+def test_haversine_matches_scalar():
+    d = haversine_miles(37.2507, -112.9563, [37.1889, 37.4537], [-112.9985, -113.2252])
+    assert abs(d[0] - calculate_distance(37.2507, -112.9563, 37.1889, -112.9985)) < 1e-6
+    assert abs(d[1] - calculate_distance(37.2507, -112.9563, 37.4537, -113.2252)) < 1e-6
+
+
+def test_within_and_nearest():
+    index = SpatialIndex.from_items(MOCK_POINTS)
+    assert len(index) == 4  # item without coordinates skipped
+
+    near = index.within(37.2507, -112.9563, 5.0)
+    assert [item["name"] for item, _ in near] == ["Zion Lodge", "Grotto", "Springdale"]
+    assert near[0][1] == 0.0
+
+    nearest = index.nearest(37.46, -113.22, k=2)
+    assert [item["name"] for item, _ in nearest] == ["Kolob Canyons VC", "Grotto"]
+    assert index.nearest(37.46, -113.22, k=2, max_radius_miles=1.0)[0][0]["name"] == "Kolob Canyons VC"
+    assert len(index.nearest(37.46, -113.22, k=2, max_radius_miles=1.0)) == 1
+
+
+def test_models_are_indexed():
+    camp = Campground(id="1", name="Watchman", parkCode="zion", description="",
+                      location=GeoLocation(lat=37.1988, lon=-112.9870))
+    index = SpatialIndex.from_items([camp])
+    assert index.any_within(37.1889, -112.9985, 1.5)
+    assert not index.any_within(37.4537, -113.2252, 5.0)
+
+
+def test_incremental_adds_past_initial_capacity():
+    index = SpatialIndex()
+    for i in range(40):
+        assert not index.any_within(37.0 + i * 0.01, -112.9, 0.5)
+        index.add(37.0 + i * 0.01, -112.9, i)
+    assert len(index) == 40 and len(index.lats) == 40
+    assert [item for item, _ in index.within(37.25, -112.9, 0.8)] == [25, 24, 26]
+    assert index.nearest(37.391, -112.9, k=1)[0][0] == 39
+
+
+def test_orchestrator_index_follows_moved_places():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dm = DataManager(base_dir=tmp_dir)
+        orch = OutdoorConciergeOrchestrator(
+            llm_service=None, nps_client=None, weather_client=None, external_client=None,
+            data_manager=dm, review_scraper=object(), park_fetcher=object()
+        )
+        dm.save_fixture("ZION", "places.json", [{"title": "Grotto", "latitude": 37.2591, "longitude": -112.9509}])
+        index = orch._get_spatial_index("ZION", [], [], [])
+        assert orch._get_spatial_index("ZION", [], [], []) is index
+
+        # Same number of places, new coordinates: rebuilt
+        dm.save_fixture("ZION", "places.json", [{"title": "Grotto", "latitude": 37.2600, "longitude": -112.9500}])
+        moved = orch._get_spatial_index("ZION", [], [], [])
+        assert moved is not index and moved.items[0]["lat"] == 37.26
+
+
+def test_mine_entrances_dedupe():
+    places = [
+        {"title": "South Entrance", "latitude": 37.2000, "longitude": -112.9870},
+        {"title": "South Entrance Station", "latitude": 37.2010, "longitude": -112.9860},
+        {"title": "East Entrance", "latitude": 37.2346, "longitude": -112.8768},
+    ]
+    vcs = [{"name": "Zion Canyon Visitor Center", "latitude": 37.2002, "longitude": -112.9869}]
+    hubs = mine_entrances("ZION", places, vcs)
+    assert [h["name"] for h in hubs] == ["South Entrance", "East Entrance"]
+
+
+if __name__ == "__main__":
+    try:
+        test_haversine_matches_scalar()
+        test_within_and_nearest()
+        test_models_are_indexed()
+        test_incremental_adds_past_initial_capacity()
+        test_orchestrator_index_follows_moved_places()
+        test_mine_entrances_dedupe()
+        print("✅ ALL GEOSPATIAL TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
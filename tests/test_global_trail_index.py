@@ -0,0 +1,82 @@
+import sys
+import os
+import json
+import tempfile
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.engine.constraints import UserPreference
+from app.engine.global_trail_index import GlobalTrailIndex
+from app.services.data_manager import DataManager
+
+MOCK_PARKS = {
+    "ZION": [
+        {"name": "Lower Emerald Pool Trail", "difficulty": "Easy", "length_miles": 1.2,
+         "description": "Short walk to a seasonal waterfall.", "location": {"lat": 37.2509, "lon": -112.9576}},
+        {"name": "Angels Landing", "difficulty": "Strenuous", "length_miles": 5.4,
+         "location": {"lat": 37.2594, "lon": -112.9507}},
+    ],
+    "YOSE": [
+        {"name": "Lower Yosemite Fall Trailhead", "difficulty": "Easy", "length_miles": 1.0,
+         "location": {"lat": 37.7489, "lon": -119.5965}},
+        {"name": "Mystery Trail", "difficulty": "Easy", "length_miles": 2.0, "location": {"lat": None, "lon": None}},
+    ],
+}
+
+
+def _write_park(base_dir, park, trails):
+    os.makedirs(os.path.join(base_dir, park), exist_ok=True)
+    with open(os.path.join(base_dir, park, "trails_v2.json"), "w") as f:
+        json.dump(trails, f)
+
+
+def _make_index():
+    base_dir = tempfile.mkdtemp()
+    for park, trails in MOCK_PARKS.items():
+        _write_park(base_dir, park, trails)
+    return base_dir, GlobalTrailIndex(DataManager(base_dir=base_dir))
+
+
+def test_search_across_parks():
+    _, index = _make_index()
+    assert index.refresh() == ["yose", "zion"]
+    assert len(index) == 4
+
+    hits = index.search(UserPreference(max_difficulty="easy", max_length_miles=3.0), keywords=["waterfall", "fall"])
+    assert [(h.park_code, h.trail.name) for h in hits] == [
+        ("yose", "Lower Yosemite Fall Trailhead"),
+        ("zion", "Lower Emerald Pool Trail"),
+    ]
+
+
+def test_radius_query():
+    _, index = _make_index()
+    index.refresh()
+    hits = index.search(center=(37.2982, -113.0263), radius_miles=10.0)
+    assert {h.trail.name for h in hits} == {"Lower Emerald Pool Trail", "Angels Landing"}
+    distances = [h.distance_miles for h in hits]
+    assert distances == sorted(distances) and distances[-1] < 10.0
+
+
+def test_incremental_refresh():
+    base_dir, index = _make_index()
+    index.refresh()
+    assert index.refresh() == []
+
+    # Only the changed park is rebuilt
+    _write_park(base_dir, "ZION", MOCK_PARKS["ZION"][:1])
+    os.utime(os.path.join(base_dir, "ZION", "trails_v2.json"), ns=(1, 1))
+    assert index.refresh() == ["zion"]
+    assert len(index) == 3
+
+
+if __name__ == "__main__":
+    try:
+        test_search_across_parks()
+        test_radius_query()
+        test_incremental_refresh()
+        print("✅ ALL GLOBAL TRAIL INDEX TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
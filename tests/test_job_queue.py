@@ -0,0 +1,80 @@
+import sys
+import os
+import time
+import sqlite3
+import tempfile
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.job_queue import JobQueue, COMPLETED, FAILED, QUEUED, RUNNING, STALE_AFTER_SEC
+
+
+def test_submit_dedupes_active_jobs_per_park():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = JobQueue(os.path.join(tmp_dir, "jobs.sqlite3"))
+        first = queue.submit("zion", include_trails=True)
+        again = queue.submit("ZION", include_trails=False)
+        other = queue.submit("BRCA")
+
+        assert again["id"] == first["id"]
+        assert first["options"] == {"include_trails": True}
+        assert other["id"] != first["id"]
+        assert [j["park_code"] for j in queue.list_jobs([QUEUED])] == ["ZION", "BRCA"]
+
+
+def test_claim_progress_and_complete():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = JobQueue(os.path.join(tmp_dir, "jobs.sqlite3"))
+        submitted = queue.submit("ZION")
+        queue.submit("BRCA")
+
+        job = queue.claim_next("worker-1")
+        assert job["id"] == submitted["id"] and job["status"] == RUNNING  # FIFO
+        assert queue.claim_next("worker-2")["park_code"] == "BRCA"
+        assert queue.claim_next("worker-3") is None
+
+        queue.update_progress(job["id"], 2, 7, "[trails] Processed: Angels Landing")
+        polled = queue.latest_job("zion")
+        assert (polled["progress_current"], polled["progress_total"]) == (2, 7)
+        assert polled["message"].startswith("[trails]")
+
+        queue.complete(job["id"], {"operations": {"trails": {"count": 12}}})
+        done = queue.get(job["id"])
+        assert done["status"] == COMPLETED
+        assert done["result"]["operations"]["trails"] == {"count": 12}
+
+        # Finished jobs no longer block a new request for the park
+        assert queue.submit("ZION")["id"] != job["id"]
+
+
+def test_stale_running_job_is_requeued():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "jobs.sqlite3")
+        queue = JobQueue(db_path)
+        queue.submit("GLAC")
+        job = queue.claim_next("worker-1")
+
+        # Simulate a worker that died without reporting
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time() - STALE_AFTER_SEC - 1, job["id"]))
+        conn.commit()
+        conn.close()
+
+        reclaimed = queue.claim_next("worker-2")
+        assert reclaimed["id"] == job["id"]
+        assert reclaimed["attempts"] == 2
+
+        queue.fail(reclaimed["id"], "boom")
+        assert queue.latest_job("GLAC")["status"] == FAILED
+
+
+if __name__ == "__main__":
+    try:
+        test_submit_dedupes_active_jobs_per_park()
+        test_claim_progress_and_complete()
+        test_stale_running_job_is_requeued()
+        print("✅ ALL JOB QUEUE TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
@@ -0,0 +1,82 @@
+import sys
+import os
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models import Place
+from app.utils.keyword_classifier import KeywordMatcher, CategoryClassifier, classify_place, classify_essentials
+
+MOCK_ITEMS = [
+    {"title": "Navajo Loop Trailhead", "listingDescription": "Descend into the canyon."},
+    {"title": "Bryce Canyon Visitor Center", "bodyText": "A 1 mile hike, easy and flat."},
+    {"title": "Queen's Garden", "longDescription": "1.8 miles round-trip, moderate climb."},
+    {"title": "Sunset Point", "listingDescription": "A drive-up viewpoint with parking."},
+    {"title": "Inspiration Point", "listingDescription": "Walk the rim trail to the upper viewpoint."},
+    {"title": "Lodge Dining Room", "listingDescription": "Breakfast and dinner."},
+]
+
+
+def test_whole_word_matching():
+    matcher = KeywordMatcher(["trail", "trailhead", "visitor center", "rim"])
+    assert matcher.find("Navajo Loop Trailhead") == ["trailhead"]
+    assert matcher.find("Rim Trail near the Visitor Center") == ["trail", "visitor center", "rim"]
+    assert matcher.find("Trimble Road") == []  # no partial-word hits
+    assert not matcher.search("")
+
+
+def test_substring_matching():
+    matcher = KeywordMatcher(["miles", "km", "hike"], whole_word=False)
+    assert matcher.find("3.2kmiles of hiked routes") == ["miles", "km", "hike"]
+
+
+def test_classify_place_reasons():
+    results = [classify_place(item) for item in MOCK_ITEMS]
+    assert [r["is_trail"] for r in results] == [True, False, True, False, True, False]
+    assert [r["reason"] for r in results] == [
+        "hike_keyword", "infrastructure", "content_indicators", "hike_keyword", "hike_keyword", "no_match"
+    ]
+    assert results[1]["infrastructure_keywords"] == ["visitor center"]
+    assert results[2]["content_indicators"] == ["miles", "round-trip", "moderate", "climb"]
+
+
+def test_custom_description_fields():
+    item = {"title": "Fairyland", "activityDescription": "5 miles, strenuous"}
+    assert not classify_place(item)["is_trail"]
+    assert classify_place(item, desc_fields=["activityDescription"])["is_trail"]
+
+
+def test_classify_essentials():
+    assert classify_essentials(["Water - Bottle-Filling Station", "Restroom - Seasonal", "Shuttle Stop"]) == [
+        "Restroom", "Water", "Shuttle"
+    ]
+    # Exclusions apply per amenity string: storage lockers aren't Food, a snack bar is
+    assert classify_essentials(["Food Storage Lockers"]) == []
+    assert classify_essentials(["Food Storage Lockers", "Food/Drink - Snacks"]) == ["Food"]
+    assert classify_essentials([]) == []
+
+    classifier = CategoryClassifier({"Camp": {"keywords": ["camp"], "exclude_keywords": ["camp store"]}})
+    assert classifier.classify(["Campground", "CAMP STORE"]) == ["Camp"]
+    assert classifier.amenity_categories("camp store") == frozenset()
+
+
+def test_place_carries_essentials_categories():
+    place = Place(id="1", title="Zion Lodge", amenities=["Restroom", "Food/Drink - Restaurant", "Picnic Table"])
+    assert place.essentials_categories == ["Restroom", "Food", "Picnic"]
+    # Recomputed from the amenities, not trusted from a stored fixture
+    stale = Place(id="2", title="Bus Stop", amenities=["Shuttle Stop"], essentials_categories=["Medical"])
+    assert stale.essentials_categories == ["Shuttle"]
+
+
+if __name__ == "__main__":
+    try:
+        test_whole_word_matching()
+        test_substring_matching()
+        test_classify_place_reasons()
+        test_custom_description_fields()
+        test_classify_essentials()
+        test_place_carries_essentials_categories()
+        print("✅ ALL KEYWORD CLASSIFIER TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
@@ -0,0 +1,99 @@
+import sys
+import os
+import tempfile
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import folium
+from folium.plugins import MarkerCluster
+
+from app.services.data_manager import DataManager
+from app.services.registry import ServiceRegistry, get_services, set_services
+from app.ui.map_cache import CLUSTER_THRESHOLD, get_map_html, marker_layer
+from app.ui.trail_table import build_trail_frame
+from app.ui.views.park_explorer_trails import build_trail_map
+
+# --- MOCK DATA ---
+MOCK_TRAILS = [
+    {"name": f"Trail {i}", "difficulty": "Easy" if i % 2 else "Strenuous", "length_miles": 1.0 + i,
+     "location": {"lat": 37.2 + i * 0.001, "lon": -112.9}}
+    for i in range(CLUSTER_THRESHOLD * 2 + 4)
+]
+
+
+class CountingBuilder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        m = folium.Map(location=[37.2, -112.9], zoom_start=11)
+        folium.Marker([37.2, -112.9], tooltip=f"build {self.calls}").add_to(m)
+        return m
+
+
+def test_marker_layer_clusters_dense_categories():
+    assert isinstance(marker_layer("Food", CLUSTER_THRESHOLD + 1), MarkerCluster)
+    layer = marker_layer("Water", CLUSTER_THRESHOLD)
+    assert isinstance(layer, folium.FeatureGroup)
+
+
+def test_get_map_html_caches_in_memory_and_on_disk():
+    previous_registry, cwd = get_services(), os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        set_services(ServiceRegistry(overrides={"data_manager": DataManager(base_dir=tmp_dir)}))
+        get_map_html.clear()
+        try:
+            build = CountingBuilder()
+            html = get_map_html("zion", "trails", ("v1",), _build=build)
+            assert "build 1" in html
+            assert get_map_html("zion", "trails", ("v1",), _build=build) == html
+            assert build.calls == 1
+
+            # A fresh process (empty memory cache) reads the page back from disk
+            get_map_html.clear()
+            assert get_map_html("zion", "trails", ("v1",), _build=build) == html
+            assert build.calls == 1
+
+            # New data version: rebuilt, and the old page is removed
+            assert "build 2" in get_map_html("zion", "trails", ("v2",), _build=build)
+            assert len(os.listdir(os.path.join("data_cache", "ZION", "maps"))) == 1
+
+            # Filter variants stay in memory only
+            get_map_html("zion", "trails", ("v2", "filtered"), persist=False, _build=build)
+            assert build.calls == 3
+            assert len(os.listdir(os.path.join("data_cache", "ZION", "maps"))) == 1
+
+            assert get_map_html("zion", "empty", ("v1",), _build=lambda: None) is None
+        finally:
+            get_map_html.clear()
+            set_services(previous_registry)
+            os.chdir(cwd)
+
+
+def test_trail_map_has_a_layer_per_difficulty():
+    m = build_trail_map(build_trail_frame(MOCK_TRAILS, alert_matches={}))
+    layers = [child for child in m._children.values() if isinstance(child, (folium.FeatureGroup, MarkerCluster))]
+    assert len(layers) == 4
+    # Easy and Strenuous each hold more than CLUSTER_THRESHOLD trails
+    assert sum(isinstance(layer, MarkerCluster) for layer in layers) == 2
+    assert "Trail 3" in m.get_root().render()
+    assert all(layer.show for layer in layers)
+
+    # The Difficulty filter decides which layers start switched on
+    m = build_trail_map(build_trail_frame(MOCK_TRAILS, alert_matches={}), ["Easy"])
+    layers = [child for child in m._children.values() if isinstance(child, (folium.FeatureGroup, MarkerCluster))]
+    assert [layer.show for layer in layers] == [True, False, False, False]
+
+
+if __name__ == "__main__":
+    try:
+        test_marker_layer_clusters_dense_categories()
+        test_get_map_html_caches_in_memory_and_on_disk()
+        test_trail_map_has_a_layer_per_difficulty()
+        print("✅ ALL MAP CACHE TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
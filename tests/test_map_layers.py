@@ -0,0 +1,129 @@
+import sys
+import os
+import json
+import tempfile
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models import Place
+from app.services.data_manager import DataManager
+from app.engine.map_layers import (
+    hub_services_features, in_park_features, trail_features, split_by, load_park_layer,
+    IN_PARK_LAYER, TRAILS_LAYER
+)
+from scripts.export_map_layers import export_park_layers
+
+# --- MOCK DATA ---
+MOCK_HUBS = {
+    "South Entrance": {
+        "Gas Station": [{"name": "Wawona Gas", "address": "Wawona", "latitude": 37.5369123, "longitude": -119.6553456}],
+        "Park Entrance": [{"name": "South Entrance", "address": "N/A", "latitude": 37.5071, "longitude": -119.6323}],
+        "Food": [{"name": "No Coords Cafe", "address": "Somewhere", "latitude": None, "longitude": None}],
+    }
+}
+
+MOCK_PLACES = [
+    {"id": "p1", "title": "Zion Lodge", "location": {"lat": 37.25, "lon": -112.95},
+     "amenities": ["Restroom", "Food/Drink - Restaurant", "Water - Bottle-Filling Station"],
+     "bodyText": '<a href="https://example.com/lodge">Lodge</a>'},
+    {"id": "p2", "title": "Bear Box Site", "location": {"lat": 37.3, "lon": -112.9},
+     "amenities": ["Food Storage Lockers"]},
+    {"id": "p3", "title": "Nowhere", "amenities": ["Restroom"]},
+]
+
+MOCK_CAMPGROUNDS = [
+    {"id": "c1", "name": "Watchman", "description": "Near the south entrance.", "location": {"lat": 37.2, "lon": -112.98}},
+]
+
+MOCK_TRAILS = [
+    {"name": "Angels Landing", "difficulty": "moderately strenuous", "length_miles": 5.4,
+     "location": {"lat": 37.2694, "lon": -112.9508}, "alltrails_rating": 4.9, "alltrails_review_count": 1200,
+     "alltrails_url": "https://www.alltrails.com/trail/angels-landing"},
+    {"name": "Canyon Overlook", "difficulty": "Easy", "length_miles": None, "location": {"lat": 37.2131, "lon": -112.9406},
+     "nps_url": "https://www.nps.gov/thingstodo/canyon-overlook.htm"},
+    {"name": "Unmapped", "difficulty": "Easy", "location": {"lat": 0.0, "lon": 0.0}},
+]
+
+
+def test_hub_services_features():
+    collection = hub_services_features(MOCK_HUBS)
+    assert [f["properties"]["name"] for f in collection["features"]] == ["Wawona Gas", "South Entrance"]
+
+    gas = collection["features"][0]
+    assert gas["geometry"]["coordinates"] == [-119.65535, 37.53691]  # [lon, lat], rounded
+    assert gas["properties"]["icon"] == "gas-pump" and gas["properties"]["hub"] == "South Entrance"
+    assert "Wawona ↗" in gas["properties"]["popup"]
+    assert "View on Maps" in collection["features"][1]["properties"]["popup"]
+
+
+def test_in_park_features_categories_and_offsets():
+    places = [Place(**p) for p in MOCK_PLACES]
+    collection = in_park_features(places, MOCK_CAMPGROUNDS)
+
+    categories = [(f["properties"]["name"], f["properties"]["category"]) for f in collection["features"]]
+    # Food storage lockers are excluded from Food; places without a location are skipped
+    assert categories == [("Watchman", "Camping"), ("Zion Lodge", "Restroom"), ("Zion Lodge", "Water"), ("Zion Lodge", "Food")]
+    water = collection["features"][2]
+    assert water["geometry"]["coordinates"] == [-112.95, 37.2504]
+    assert "https://example.com/lodge" in water["properties"]["popup"]
+
+    layers = split_by(collection, "category", ["Food", "Water"])
+    assert list(layers) == ["Food", "Water", "Camping", "Restroom"]
+
+
+def test_trail_features_popups():
+    rows = [
+        {"name": "Angels Landing", "difficulty": "moderately strenuous", "length": 5.4, "lat": 37.2694, "lon": -112.9508,
+         "rating": 4.9, "reviews": 1200.0, "url_at": "https://at/angels", "url_nps": float("nan"),
+         "weather": {"temp": 71.4, "condition": "Sunny"}},
+        {"name": "Canyon Overlook", "difficulty": "Easy", "length": float("nan"), "lat": 37.2131, "lon": -112.9406,
+         "rating": float("nan"), "reviews": float("nan"), "url_at": None, "url_nps": "https://nps/overlook", "weather": None},
+        {"name": "Unmapped", "difficulty": "Easy", "length": 1.0, "lat": 0.0, "lon": 0.0},
+    ]
+    features = trail_features(rows)["features"]
+    assert len(features) == 2
+
+    angels = features[0]["properties"]
+    assert (angels["layer"], angels["color"]) == ("Strenuous", "orange")
+    assert "Latest Reviews (1200)" in angels["popup"] and "71°F (Sunny)" in angels["popup"]
+    assert "href='https://at/angels'" in angels["popup"]
+
+    overlook = features[1]["properties"]
+    assert overlook["length_miles"] is None and "? mi" in overlook["popup"] and "Rating: N/A" in overlook["popup"]
+    assert "https://nps/overlook" in overlook["popup"]
+
+
+def test_export_park_layers_round_trip():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dm = DataManager(base_dir=tmp_dir)
+        dm.save_fixture("ZION", "places.json", MOCK_PLACES)
+        dm.save_fixture("ZION", "campgrounds.json", MOCK_CAMPGROUNDS)
+        dm.save_fixture("ZION", "trails_v2.json", MOCK_TRAILS)
+        signature = dm.fixtures_signature("ZION")
+
+        counts = export_park_layers("zion", dm)
+        assert counts == {IN_PARK_LAYER: 4, TRAILS_LAYER: 2}
+        # Exporting leaves the fixture signature alone
+        assert dm.fixtures_signature("ZION") == signature
+
+        with open(os.path.join(tmp_dir, "ZION", "layers", "trails.geojson")) as f:
+            assert json.load(f)["type"] == "FeatureCollection"
+        assert len(load_park_layer(dm, "ZION", TRAILS_LAYER)["features"]) == 2
+
+        # Fixtures changed since the export: the layer is stale
+        dm.save_fixture("ZION", "trails_v2.json", MOCK_TRAILS[:1])
+        assert load_park_layer(dm, "ZION", TRAILS_LAYER) is None
+        assert load_park_layer(dm, "YOSE", TRAILS_LAYER) is None
+
+
+if __name__ == "__main__":
+    try:
+        test_hub_services_features()
+        test_in_park_features_categories_and_offsets()
+        test_trail_features_popups()
+        test_export_park_layers_round_trip()
+        print("✅ ALL MAP LAYER TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
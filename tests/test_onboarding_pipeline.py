@@ -0,0 +1,121 @@
+import sys
+import os
+import json
+import time
+import tempfile
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.onboarding_pipeline import ALREADY_EXISTS, OnboardingPipeline, PipelineStage
+
+
+def make_stage(tmp_dir, name, depends_on=None, sleep=0.0, fail=False, calls=None, intermediate=False):
+    path = os.path.join(tmp_dir, f"{name}.json")
+
+    def run(progress_callback):
+        if calls is not None:
+            calls.append(name)
+        if progress_callback:
+            progress_callback(0, 1, f"working on {name}")
+        time.sleep(sleep)
+        if fail:
+            raise RuntimeError(f"{name} exploded")
+        with open(path, "w") as f:
+            json.dump([name], f)
+        return [name]
+
+    return PipelineStage(name, run=run, outputs=[path], depends_on=depends_on,
+                         summarize=lambda result: {"count": len(result)}, intermediate=intermediate)
+
+
+def test_independent_stages_run_in_parallel():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stages = [
+            make_stage(tmp_dir, "nps_data", sleep=0.1),
+            make_stage(tmp_dir, "trails", depends_on=["nps_data"], sleep=0.1),
+            make_stage(tmp_dir, "photo_spots", sleep=0.2),
+            make_stage(tmp_dir, "scenic_drives", sleep=0.2),
+        ]
+        messages = []
+        report = OnboardingPipeline(stages, max_workers=4).run(lambda c, t, m: messages.append(m))
+
+        assert report["operations"]["trails"] == {"count": 1}
+        assert set(report["timings"]) == {"nps_data", "trails", "photo_spots", "scenic_drives"}
+        # Wall clock follows the critical path (0.2s), not the sum (0.6s)
+        assert report["elapsed_sec"] < 0.45
+        assert 0.18 <= report["critical_path_sec"] < 0.45
+        assert "[trails] working on trails" in messages
+
+
+def test_failure_blocks_dependents_and_resumes():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state_file = os.path.join(tmp_dir, "state.json")
+        calls = []
+        stages = [
+            make_stage(tmp_dir, "nps_data", calls=calls),
+            make_stage(tmp_dir, "trails", depends_on=["nps_data"], fail=True, calls=calls),
+            make_stage(tmp_dir, "rankings", depends_on=["trails"], calls=calls),
+            make_stage(tmp_dir, "amenities", calls=calls),
+        ]
+        report = OnboardingPipeline(stages, state_file=state_file).run()
+
+        assert "error" in report["operations"]["trails"]
+        assert report["operations"]["rankings"]["error"].startswith("skipped")
+        assert report["operations"]["amenities"] == {"count": 1}  # independent branch kept going
+        with open(state_file) as f:
+            assert json.load(f)["trails"]["status"] == "failed"
+
+        # Second run: completed stages are skipped, the failed branch is retried
+        calls.clear()
+        stages[1] = make_stage(tmp_dir, "trails", depends_on=["nps_data"], calls=calls)
+        report = OnboardingPipeline(stages, state_file=state_file).run()
+        assert sorted(calls) == ["rankings", "trails"]
+        assert report["operations"]["nps_data"] == ALREADY_EXISTS
+
+
+def test_intermediate_stage_only_runs_when_needed():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        candidates = make_stage(tmp_dir, "trail_candidates", intermediate=True)
+        trails = make_stage(tmp_dir, "trails", depends_on=["trail_candidates"])
+        pipeline = OnboardingPipeline([candidates, trails])
+        assert pipeline.plan() == ["trail_candidates", "trails"]
+
+        # trails exists -> its candidates aren't rebuilt
+        with open(trails.outputs[0], "w") as f:
+            json.dump([], f)
+        assert pipeline.plan() == []
+
+
+def test_missing_or_stale_output_reruns_its_intermediate_inputs():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calls = []
+        candidates = make_stage(tmp_dir, "trail_candidates", intermediate=True, calls=calls)
+        trails = make_stage(tmp_dir, "trails", depends_on=["trail_candidates"], calls=calls)
+        trails.inputs = list(candidates.outputs)
+        pipeline = OnboardingPipeline([candidates, trails])
+
+        # Candidates left over from an earlier run, trails deleted: candidates are refetched too
+        with open(candidates.outputs[0], "w") as f:
+            json.dump([], f)
+        assert pipeline.plan() == ["trail_candidates", "trails"]
+        pipeline.run()
+        assert calls == ["trail_candidates", "trails"]
+        assert pipeline.plan() == []
+
+        # Candidates changed after trails were built: trails are out of date
+        newer = os.path.getmtime(trails.outputs[0]) + 10
+        os.utime(candidates.outputs[0], (newer, newer))
+        assert pipeline.plan() == ["trail_candidates", "trails"]
+
+
+if __name__ == "__main__":
+    try:
+        test_independent_stages_run_in_parallel()
+        test_failure_blocks_dependents_and_resumes()
+        test_intermediate_stage_only_runs_when_needed()
+        test_missing_or_stale_output_reruns_its_intermediate_inputs()
+        print("✅ ALL ONBOARDING PIPELINE TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
@@ -0,0 +1,79 @@
+import sys
+import os
+import time
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.rate_limiter import (
+    AdaptiveRateLimiter, SharedRateLimiter, api_call_counts, is_rate_limit_error, set_api_limiter, throttle
+)
+
+
+class MockApiError(Exception):
+    def __init__(self, code, message=""):
+        super().__init__(message)
+        self.code = code
+
+
+def test_rate_limit_detection():
+    assert is_rate_limit_error(MockApiError(429))
+    assert is_rate_limit_error(Exception("429 RESOURCE_EXHAUSTED. Quota exceeded"))
+    assert not is_rate_limit_error(MockApiError(500, "Internal error"))
+    assert not is_rate_limit_error(ValueError("bad json"))
+
+
+def test_aimd_adjustments():
+    limiter = AdaptiveRateLimiter(rate_per_sec=4.0, min_rate=1.0, max_rate=5.0, increase_step=0.5, cooldown_sec=0.0)
+    limiter.on_success()
+    assert limiter.rate == 4.5
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.rate == 5.0  # capped at max_rate
+
+    limiter.on_rate_limited()
+    assert limiter.rate == 2.5
+    limiter.on_rate_limited()
+    limiter.on_rate_limited()
+    assert limiter.rate == 1.0  # floored at min_rate
+
+
+def test_acquire_paces_requests():
+    limiter = AdaptiveRateLimiter(rate_per_sec=50.0)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # 6 slots at 50 req/s -> at least 5 intervals of 20ms
+    assert time.monotonic() - start >= 0.09
+
+
+def test_shared_limiter_and_throttle_counts():
+    limiter = SharedRateLimiter(rate_per_sec=50.0, name="test_api")
+    set_api_limiter("test_api", limiter)
+    try:
+        before = api_call_counts().get("test_api", 0)
+        start = time.monotonic()
+        for _ in range(6):
+            throttle("test_api")
+        assert time.monotonic() - start >= 0.09
+        assert api_call_counts()["test_api"] - before == 6
+    finally:
+        set_api_limiter("test_api", None)
+
+    # Without a registered limiter, throttle only counts
+    start = time.monotonic()
+    for _ in range(100):
+        throttle("test_api")
+    assert time.monotonic() - start < 0.05
+
+
+if __name__ == "__main__":
+    try:
+        test_rate_limit_detection()
+        test_aimd_adjustments()
+        test_acquire_paces_requests()
+        test_shared_limiter_and_throttle_counts()
+        print("✅ ALL RATE LIMITER TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
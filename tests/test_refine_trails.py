@@ -0,0 +1,190 @@
+import sys
+import os
+import json
+import tempfile
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import scripts.refine_trails_with_gemini as refine_module
+from scripts.refine_trails_with_gemini import (
+    BatchTrailStats, TrailStats, TrailStatsBatch,
+    build_batches, build_enriched_trail, candidate_hash, candidate_key, extract_batch_stats, refine_trails
+)
+
+MOCK_CANDIDATE = {
+    "id": "abc-123",
+    "title": "Navajo Loop Trail",
+    "listingDescription": "<p>A steep descent into the hoodoos via Wall Street.</p>",
+    "bodyText": "Distance: 1.3 miles round trip. Elevation change: 550 feet.",
+    "url": "https://www.nps.gov/places/navajo-loop.htm",
+    "latitude": "37.6230",
+    "longitude": "-112.1660",
+}
+
+
+def test_candidate_hash_tracks_prompt_content():
+    base = candidate_hash(MOCK_CANDIDATE)
+    assert candidate_hash(dict(MOCK_CANDIDATE)) == base
+
+    # Fields the prompt does not see don't trigger re-enrichment
+    assert candidate_hash({**MOCK_CANDIDATE, "url": "https://example.com"}) == base
+    # Changed descriptions do
+    assert candidate_hash({**MOCK_CANDIDATE, "bodyText": "Distance: 1.5 miles."}) != base
+    assert candidate_hash({**MOCK_CANDIDATE, "title": "Navajo Loop"}) != base
+
+
+def test_candidate_key_and_raw_record():
+    assert candidate_key(MOCK_CANDIDATE) == "abc-123"
+    assert candidate_key({"title": "No Id Trail"}) == "No Id Trail"
+
+    record = build_enriched_trail(MOCK_CANDIDATE, None, "h1")
+    assert record["location"] == {"lat": 37.623, "lon": -112.166}
+    assert record["source_hash"] == "h1"
+    assert "difficulty" not in record  # Gemini fields only when stats are given
+
+
+class MockModels:
+    """Answers batch prompts for every ID except the last; single prompts as 'not a trail'."""
+    def __init__(self):
+        self.schemas = []
+
+    def generate_content(self, model, contents, config):
+        schema = config['response_schema']
+        self.schemas.append(schema)
+        if schema is TrailStatsBatch:
+            ids = [line[len("--- ID: "):] for line in contents.splitlines() if line.startswith("--- ID: ")]
+            parsed = TrailStatsBatch(trails=[
+                BatchTrailStats(id=i, is_valid_hiking_trail=True, length_miles=1.3, elevation_gain_ft=550)
+                for i in ids[:-1]
+            ])
+        else:
+            parsed = TrailStats(is_valid_hiking_trail=False)
+        return type("MockResponse", (), {"parsed": parsed})()
+
+
+class MockClient:
+    def __init__(self):
+        self.models = MockModels()
+
+
+def test_build_batches_respects_size_and_tokens():
+    items = [{**MOCK_CANDIDATE, "id": f"t{i}"} for i in range(10)]
+    assert [len(b) for b in build_batches(items, max_size=4, max_tokens=100_000)] == [4, 4, 2]
+    # A tiny token budget still makes progress, one candidate per batch
+    assert [len(b) for b in build_batches(items, max_size=4, max_tokens=1)] == [1] * 10
+
+
+def test_batch_extraction_falls_back_per_item():
+    client = MockClient()
+    items = [{**MOCK_CANDIDATE, "id": f"t{i}"} for i in range(3)]
+    results = extract_batch_stats(items, client)
+
+    # One batch request, then a single retry for the ID the batch answer missed
+    assert client.models.schemas == [TrailStatsBatch, TrailStats]
+    assert [s.is_valid_hiking_trail for s in results] == [True, True, False]
+    assert results[0].difficulty == "Easy"  # post-processing still applies
+
+
+class FailingModels:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, model, contents, config):
+        self.calls += 1
+        raise TimeoutError("Gemini timed out")
+
+
+class ValidModels(FailingModels):
+    def generate_content(self, model, contents, config):
+        self.calls += 1
+        return type("MockResponse", (), {"parsed": TrailStats(is_valid_hiking_trail=True, difficulty="Strenuous")})()
+
+
+def test_failed_extraction_keeps_record_and_retries():
+    cwd, original_client = os.getcwd(), refine_module.genai.Client
+    original_key = os.environ.get("GEMINI_API_KEY")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        os.environ["GEMINI_API_KEY"] = "test-key"
+        try:
+            raw_dir, out_dir = "data_samples/nps/raw/BRCA", "data_samples/ui_fixtures/BRCA"
+            os.makedirs(raw_dir)
+            os.makedirs(out_dir)
+            with open(f"{raw_dir}/raw_trails.json", "w") as f:
+                json.dump([MOCK_CANDIDATE], f)
+            # Enriched on an earlier run, before the NPS text changed; later stages added reviews
+            previous = {**build_enriched_trail(MOCK_CANDIDATE, None, "old-hash"), "difficulty": "Moderate",
+                        "alltrails_rating": 4.7, "recent_reviews": [{"text": "Great hike"}]}
+            with open(f"{out_dir}/trails_v2.json", "w") as f:
+                json.dump([previous], f)
+            with open(f"{raw_dir}/refine_state.json", "w") as f:
+                json.dump({"abc-123": {"hash": "old-hash", "valid": True}}, f)
+
+            failing = type("MockClient", (), {"models": FailingModels()})()
+            refine_module.genai.Client = lambda api_key: failing
+            assert refine_trails("brca") == [previous]
+            assert failing.models.calls == 1
+            with open(f"{raw_dir}/refine_state.json") as f:
+                assert json.load(f) == {"abc-123": {"hash": "old-hash", "valid": True}}
+
+            # The next run retries the candidate and keeps the fields added by later stages
+            working = type("MockClient", (), {"models": ValidModels()})()
+            refine_module.genai.Client = lambda api_key: working
+            results = refine_trails("brca")
+            assert working.models.calls == 1
+            assert results[0]["difficulty"] == "Strenuous" and results[0]["alltrails_rating"] == 4.7
+            with open(f"{raw_dir}/refine_state.json") as f:
+                assert json.load(f)["abc-123"] == {"hash": candidate_hash(MOCK_CANDIDATE), "valid": True}
+        finally:
+            refine_module.genai.Client = original_client
+            if original_key is None:
+                os.environ.pop("GEMINI_API_KEY", None)
+            else:
+                os.environ["GEMINI_API_KEY"] = original_key
+            os.chdir(cwd)
+
+
+def test_missing_output_ignores_refine_state():
+    cwd, original_client = os.getcwd(), refine_module.genai.Client
+    original_key = os.environ.get("GEMINI_API_KEY")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        os.environ["GEMINI_API_KEY"] = "test-key"
+        try:
+            raw_dir = "data_samples/nps/raw/BRCA"
+            os.makedirs(raw_dir)
+            with open(f"{raw_dir}/raw_trails.json", "w") as f:
+                json.dump([MOCK_CANDIDATE], f)
+            # State from an earlier run, but trails_v2.json was deleted since
+            with open(f"{raw_dir}/refine_state.json", "w") as f:
+                json.dump({"abc-123": {"hash": candidate_hash(MOCK_CANDIDATE), "valid": True}}, f)
+
+            working = type("MockClient", (), {"models": ValidModels()})()
+            refine_module.genai.Client = lambda api_key: working
+            results = refine_trails("brca")
+            assert working.models.calls == 1
+            assert [t["name"] for t in results] == ["Navajo Loop Trail"]
+            with open("data_samples/ui_fixtures/BRCA/trails_v2.json") as f:
+                assert len(json.load(f)) == 1
+        finally:
+            refine_module.genai.Client = original_client
+            if original_key is None:
+                os.environ.pop("GEMINI_API_KEY", None)
+            else:
+                os.environ["GEMINI_API_KEY"] = original_key
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    try:
+        test_candidate_hash_tracks_prompt_content()
+        test_candidate_key_and_raw_record()
+        test_build_batches_respects_size_and_tokens()
+        test_batch_extraction_falls_back_per_item()
+        test_failed_extraction_keeps_record_and_retries()
+        test_missing_output_ignores_refine_state()
+        print("✅ ALL REFINE TRAILS TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
@@ -0,0 +1,116 @@
+import sys
+import os
+from datetime import date
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.adapters.alltrails_adapter import parse_review_markdown
+
+# --- MOCK DATA (Firecrawl markdown of an AllTrails trail page) ---
+MOCK_PAGE = """# Angels Landing Trail
+
+4.9
+
+(37,513 reviews)
+
+Hard • 4.4 mi • Est. 4h
+
+## Reviews
+
+[Sahil Mishra](https://www.alltrails.com/members/sahil-mishra)
+
+Dec 24, 2025·Hiking
+
+Rated 5 out of 5
+
+Easy to parkNot crowdedGreat views
+
+You can do this. Just hold the rails.
+
+We started early and had the chains to ourselves.
+
+Difficulty:Hard
+
+![Photo 1 of 2](https://images.alltrails.com/photo-1.jpg)
+
+![Photo 2 of 2](https://images.alltrails.com/photo-2.jpg)
+
+[Show activity](https://www.alltrails.com/explore/recording/abc)
+
+[Joe Monteiro](https://www.alltrails.com/members/joe-monteiro)
+
+Yesterday·Hiking
+
+★★★★
+
+Great conditions
+
+Rangers were stationed at Scout Lookout checking permits.
+
+[Donovan Swann](https://www.alltrails.com/members/donovan-swann)
+
+Dec 20, 2025
+
+5 stars
+
+Amazing
+
+## Hit the trail
+
+[Donovan Swann](https://www.alltrails.com/members/donovan-swann)
+"""
+
+
+def test_parses_reviews_without_llm():
+    page = parse_review_markdown(MOCK_PAGE, today=date(2025, 12, 27))
+
+    assert page["complete"] is True
+    assert page["average_rating"] == 4.9
+    assert page["total_reviews"] == 37513
+    assert "Hit the trail" not in page["section"]
+
+    # Most recent first
+    assert [r.author for r in page["reviews"]] == ["Joe Monteiro", "Sahil Mishra", "Donovan Swann"]
+    sahil = page["reviews"][1]
+    assert sahil.date == "Dec 24, 2025"
+    assert sahil.condition_tags == ["Easy to park", "Not crowded", "Great views"]
+    assert sahil.text == "You can do this. Just hold the rails.\n\nWe started early and had the chains to ourselves."
+    assert sahil.visible_image_urls == ["https://images.alltrails.com/photo-1.jpg", "https://images.alltrails.com/photo-2.jpg"]
+    assert sahil.rating == 5
+    assert page["reviews"][0].rating == 4
+
+    # A one-word review is text, not a condition tag
+    donovan = page["reviews"][2]
+    assert donovan.condition_tags == [] and donovan.text == "Amazing"
+
+
+def test_explicit_rating_and_incomplete_pages():
+    page = parse_review_markdown(MOCK_PAGE.replace("★★★★\n", "Rated 3 out of 5\n"), today=date(2025, 12, 27))
+    joe = page["reviews"][0]
+    assert joe.rating == 3 and joe.condition_tags == ["Great conditions"]
+
+    # A block that doesn't parse (no date line) sends the section to the LLM instead
+    broken = MOCK_PAGE.replace("Yesterday·Hiking", "")
+    page = parse_review_markdown(broken)
+    assert page["complete"] is False
+    assert page["section"].startswith("## Reviews")
+
+    # A review without its own rating doesn't get the page's: the LLM reads the section instead
+    unrated = parse_review_markdown(MOCK_PAGE.replace("★★★★\n\n", ""))
+    assert unrated["complete"] is False
+    assert "Joe Monteiro" not in [r.author for r in unrated["reviews"]]
+
+    # Without a page rating, reviews with their own ratings still parse
+    assert parse_review_markdown(MOCK_PAGE.replace("4.9\n", ""))["complete"] is True
+    assert parse_review_markdown("# Some other page")["section"] == ""
+
+
+if __name__ == "__main__":
+    try:
+        test_parses_reviews_without_llm()
+        test_explicit_rating_and_incomplete_pages()
+        print("✅ ALL REVIEW EXTRACTION TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
@@ -0,0 +1,68 @@
+import sys
+import os
+import tempfile
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.registry import ServiceRegistry, get_services, set_services
+
+
+def test_services_are_built_once_and_shared():
+    saved = os.environ.get("NPS_API_KEY")
+    os.environ["NPS_API_KEY"] = "test-key"
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            registry = ServiceRegistry(base_dir=tmp_dir)
+            fetcher = registry.park_fetcher
+
+            assert registry.park_fetcher is fetcher
+            assert fetcher.data_manager is registry.data_manager
+            assert fetcher.nps is registry.nps_client
+            assert fetcher.external is registry.external_client
+            assert registry.data_manager.base_dir == tmp_dir
+    finally:
+        if saved is None:
+            os.environ.pop("NPS_API_KEY", None)
+        else:
+            os.environ["NPS_API_KEY"] = saved
+
+
+def test_missing_keys_and_overrides():
+    saved = {key: os.environ.pop(key, None) for key in ("NPS_API_KEY", "WEATHER_API_KEY")}
+    try:
+        registry = ServiceRegistry()
+        assert registry.nps_client is None
+        assert registry.orchestrator is None
+
+        fake_weather = object()
+        registry.register("weather_client", fake_weather)
+        assert registry.weather_client is fake_weather
+        registry.reset()
+        assert registry.weather_client is None
+    finally:
+        for key, value in saved.items():
+            if value is not None:
+                os.environ[key] = value
+
+
+def test_process_registry_is_a_singleton():
+    original = get_services()
+    try:
+        assert get_services() is original
+        replacement = ServiceRegistry()
+        set_services(replacement)
+        assert get_services() is replacement
+    finally:
+        set_services(original)
+
+
+if __name__ == "__main__":
+    try:
+        test_services_are_built_once_and_shared()
+        test_missing_keys_and_overrides()
+        test_process_registry_is_a_singleton()
+        print("✅ ALL SERVICE REGISTRY TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
@@ -0,0 +1,146 @@
+import sys
+import os
+import tempfile
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.data_manager import DataManager
+from app.services.review_scraper import ReviewScraper
+from app.utils.fuzzy_match import TrailNameIndex, fuzzy_match_trail_name, trail_name_key, trail_name_tokens
+from scripts.fetch_rankings import merge_rankings_into_trails
+from scripts.refine_trails_with_gemini import deduplicate_trails
+
+# --- MOCK DATA ---
+MOCK_RANKINGS = [
+    {"rank": 1, "name": "Angels Landing Trail", "url": "https://www.alltrails.com/trail/us/utah/angels-landing-trail"},
+    {"rank": 6, "name": "The Zion Narrows Riverside Walk", "url": "https://www.alltrails.com/trail/us/utah/riverside-walk"},
+    {"rank": 8, "name": "Emerald Pools Trail", "url": "https://www.alltrails.com/trail/us/utah/emerald-pools-trail"},
+    {"rank": 15, "name": "Middle Emerald Pool", "url": "https://www.alltrails.com/poi/us/utah/middle-emerald-pool"},
+    {"rank": 20, "name": "Canyon Overlook Trail", "url": "https://www.alltrails.com/trail/us/utah/canyon-overlook-trail"},
+    {"rank": 30, "name": "Angels Landing", "url": "https://www.alltrails.com/trail/us/utah/angels-landing-duplicate"},
+]
+
+
+def test_keys_and_tokens():
+    assert trail_name_key("Emerald Pools Trailhead") == "emeraldpools"
+    assert trail_name_key("Lower Falls via River Trail") == "lowerfallriver"
+    assert trail_name_tokens("Angel's Landing Trail") == ["angel", "landing"]
+
+
+def test_match_exact_then_best_containment():
+    index = TrailNameIndex(MOCK_RANKINGS)
+
+    exact = index.match("Angels Landing Trailhead")
+    assert exact.kind == "exact" and exact.score == 1.0 and exact.item["rank"] == 1
+
+    # Both "Emerald Pools Trail" and "Middle Emerald Pool" are contained; the closer one wins
+    middle = index.match("Middle Emerald Pools Trail")
+    assert middle.item["rank"] == 15 and middle.kind == "contains" and 0.9 < middle.score < 1.0
+
+    assert index.match("Riverside Walk").item["rank"] == 6
+    assert index.match("Riverside Walk", min_score=0.6) is None
+    assert index.match("Observation Point") is None
+    # Only names sharing a word are considered
+    assert index.candidates("Canyon Overlook") == [4]
+
+
+def test_match_query_within_rejects_more_specific_queries():
+    index = TrailNameIndex(["Bristlecone Loop Trailhead", "Queens Garden Navajo Combination Loop"])
+    # Plain containment goes both ways
+    assert index.match("Upper Bristlecone Loop Trailhead", min_score=0.5).name == "Bristlecone Loop Trailhead"
+    assert index.match("Upper Bristlecone Loop Trailhead", min_score=0.5, query_within=True) is None
+    assert index.match("Queens Garden Navajo", min_score=0.5, query_within=True).kind == "contains"
+
+
+def test_fetch_reviews_does_not_borrow_a_generic_trails_reviews():
+    original_key = os.environ.pop("FIRECRAWL_API_KEY", None)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            dm = DataManager(base_dir=tmp_dir)
+            review = {"author": "Sam", "rating": 5, "date": "2026-07-01", "text": "Great loop"}
+            dm.save_fixture("BRCA", "trails_v2.json", [{"name": "Bristlecone Loop Trailhead", "recent_reviews": [review]}])
+            scraper = ReviewScraper(llm_service=None, data_manager=dm)
+
+            assert [r.author for r in scraper.fetch_reviews("BRCA", "Bristlecone Loop Trail")] == ["Sam"]
+            assert scraper.fetch_reviews("BRCA", "Upper Bristlecone Loop Trailhead") == []
+        finally:
+            if original_key is not None:
+                os.environ["FIRECRAWL_API_KEY"] = original_key
+
+
+MOCK_TRAILS = [
+    "Bridalveil Fall Trailhead", "Vernal Falls via Mist Trail", "Cathedral Lakes Trailhead",
+    "Lower Yosemite Fall Loop", "Mist Trail", "Angel's Landing",
+]
+
+
+def test_search_all_words_matches_fuzzy_semantics():
+    index = TrailNameIndex(MOCK_TRAILS)
+    queries = ["Bridalveil Falls trail", "Cathedral Lakes Trail", "falls", "Mist", "Angels Landing",
+               "Yosemite Falls", "Vernal", "loop", "Half Dome"]
+    for query in queries:
+        expected = {name for name in MOCK_TRAILS if fuzzy_match_trail_name(query, name)}
+        assert {m.name for m in index.search(query)} == expected, query
+
+    # Bridalveil Falls doesn't match Vernal Falls on the shared word alone
+    assert [m.name for m in index.search("Bridalveil Falls")] == ["Bridalveil Fall Trailhead"]
+    # The trail covering the most of its own name ranks first
+    assert [m.name for m in index.search("Mist")][:1] == ["Mist Trail"]
+    assert index.matching_names(["Cathedral Lakes", "Angels Landing"]) == {"Cathedral Lakes Trailhead", "Angel's Landing"}
+
+
+def test_search_any_words_and_mentions():
+    index = TrailNameIndex(MOCK_TRAILS)
+    ranked = index.search("Yosemite Falls", mode="any_words")
+    assert ranked[0].name == "Lower Yosemite Fall Loop" and ranked[0].score == 1.0
+    assert {m.name for m in ranked[1:]} == {"Bridalveil Fall Trailhead", "Vernal Falls via Mist Trail"}
+
+    assert index.mentioned_in("what is within 2 miles of the Mist Trail and Angels Landing") == {"Mist Trail", "Angel's Landing"}
+
+
+def test_merge_rankings_into_trails():
+    local = [
+        {"name": "Angels Landing Trail", "estimated_time_hours": "4–5 hr"},
+        {"name": "Middle Emerald Pools Trail"},
+        {"name": "Observation Point"},
+    ]
+    result = merge_rankings_into_trails(local, MOCK_RANKINGS)
+
+    assert result["merged"] == 2
+    assert local[0]["popularity_rank"] == 1 and local[0]["estimated_time_hours"] == "4-5 hr"
+    assert local[1]["alltrails_url"].endswith("middle-emerald-pool")
+    assert "popularity_rank" not in local[2]
+    assert [(m["trail"], m["kind"]) for m in result["matches"]] == [
+        ("Angels Landing Trail", "exact"), ("Middle Emerald Pools Trail", "contains")
+    ]
+    # Unmatched rankings are appended once per name
+    assert result["appended"] == 3
+    assert [t["name"] for t in local[3:]] == ["The Zion Narrows Riverside Walk", "Emerald Pools Trail", "Canyon Overlook Trail"]
+
+
+def test_deduplicate_trails_groups_by_name():
+    trails = [
+        {"name": "Navajo Loop Trailhead"},
+        {"name": "Navajo Loop Trail", "length_miles": 1.3, "difficulty": "Hard"},
+        {"name": "Queen's Garden Trail"},
+    ]
+    deduped = deduplicate_trails(trails)
+    assert [t["name"] for t in deduped] == ["Navajo Loop Trail", "Queen's Garden Trail"]
+    assert deduped[0]["difficulty"] == "Strenuous"
+
+
+if __name__ == "__main__":
+    try:
+        test_keys_and_tokens()
+        test_match_exact_then_best_containment()
+        test_match_query_within_rejects_more_specific_queries()
+        test_fetch_reviews_does_not_borrow_a_generic_trails_reviews()
+        test_search_all_words_matches_fuzzy_semantics()
+        test_search_any_words_and_mentions()
+        test_merge_rankings_into_trails()
+        test_deduplicate_trails_groups_by_name()
+        print("✅ ALL TRAIL NAME INDEX TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise
@@ -0,0 +1,89 @@
+import sys
+import os
+
+# Ensure app module is visible
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import app.ui.trail_table as trail_table
+from app.ui.trail_table import build_trail_frame, filter_mask
+
+# --- MOCK DATA (trails_v2.json shape) ---
+MOCK_TRAILS = [
+    {"name": "Angels Landing", "difficulty": "Strenuous", "length_miles": 5.4, "elevation_gain_ft": 1488,
+     "location": {"lat": 37.2694, "lon": -112.9508}, "weather_zone": "Canyon", "trailhead_elevation_ft": 4300,
+     "images": [{"url": "https://example.com/a.jpg", "altText": "Ridge", "caption": ""}]},
+    {"name": "Pa'rus Trail", "difficulty": "easy", "length_miles": 3.5, "location": {"lat": 37.2, "lon": -112.98},
+     "is_wheelchair_accessible": True, "is_kid_friendly": True, "is_pet_friendly": True},
+    {"name": "Observation Point", "difficulty": None, "length_miles": None, "location": {"lat": 0.0, "lon": 0.0},
+     "weather_zone": "Canyon", "trailhead_elevation_ft": 4300},
+]
+
+MOCK_ZONE_WEATHER = {
+    "Canyon": {"zone_name": "Canyon", "elevation_ft": 4000, "current_temp_f": 71.0, "current_condition": "Sunny"},
+    "Rim": {"zone_name": "Rim", "elevation_ft": 6500, "current_temp_f": 58.0, "current_condition": "Clear"},
+}
+
+MOCK_ALERT = {"title": "Angels Landing chains closed", "description": "Closed for repairs.", "category": "Closure"}
+
+
+def test_build_trail_frame_columns_and_weather():
+    calls = []
+    original = trail_table.get_trail_weather
+    trail_table.get_trail_weather = lambda weather, zone, elev, base: calls.append((zone, elev)) or {"zone": zone}
+    try:
+        df = build_trail_frame(MOCK_TRAILS, MOCK_ZONE_WEATHER, "Rim", alert_matches={})
+    finally:
+        trail_table.get_trail_weather = original
+
+    assert list(df["difficulty"]) == ["Strenuous", "easy", "Unknown"]
+    assert list(df["difficulty_layer"]) == ["Strenuous", "Easy", "Unknown"]
+    assert list(df["has_coords"]) == [True, True, False]
+    assert df.loc[0, "img"] == "https://example.com/a.jpg" and df.loc[0, "img_alt"] == "Ridge"
+    assert df.loc[0, "img_caption"] is None
+    # Pa'rus falls back to the base zone; the two Canyon trails share one weather lookup
+    assert [w["zone"] for w in df["weather"]] == ["Canyon", "Rim", "Canyon"]
+    assert sorted(calls, key=str) == [("Canyon", 4300), ("Rim", None)]
+
+
+def test_build_trail_frame_alerts():
+    matched = build_trail_frame(MOCK_TRAILS, alert_matches={"Angels Landing": MOCK_ALERT})
+    assert matched.loc[0, "trail_alert"] == MOCK_ALERT
+    assert matched.loc[1, "trail_alert"] is None
+
+    class StubIndex:
+        def match(self, name):
+            return MOCK_ALERT if name == "Observation Point" else None
+
+    original = trail_table.get_alert_index
+    trail_table.get_alert_index = lambda alerts: StubIndex()
+    try:
+        indexed = build_trail_frame(MOCK_TRAILS, alerts=[MOCK_ALERT])
+    finally:
+        trail_table.get_alert_index = original
+    assert list(indexed["trail_alert"].isna()) == [True, True, False]
+    assert indexed["weather"].isna().all()
+
+
+def test_filter_mask():
+    df = build_trail_frame(MOCK_TRAILS, alert_matches={})
+
+    assert filter_mask(df).all()
+    assert list(filter_mask(df, difficulties=["Strenuous", "Unknown"])) == [True, False, True]
+    # Trails without a length are kept by the length filter
+    assert list(filter_mask(df, min_length=4.0)) == [True, False, True]
+    assert list(filter_mask(df, wheelchair=True, kid_friendly=True, pet_friendly=True)) == [False, True, False]
+    # Layer names, matched like the map buckets trails: "easy" is on the Easy layer
+    assert list(filter_mask(df, difficulties=["Easy"])) == [False, True, False]
+    assert list(filter_mask(df, difficulties=["Easy"], min_length=4.0)) == [False, False, False]
+    assert len(filter_mask(build_trail_frame([]))) == 0
+
+
+if __name__ == "__main__":
+    try:
+        test_build_trail_frame_columns_and_weather()
+        test_build_trail_frame_alerts()
+        test_filter_mask()
+        print("✅ ALL TRAIL TABLE TESTS PASSED")
+    except Exception as e:
+        print(f"❌ TEST FAILED: {e}")
+        raise